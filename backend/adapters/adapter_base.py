@@ -1,7 +1,7 @@
 # backend/adapters/adapter_base.py
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any
 from sqlalchemy.orm import Session
 
 class NotSupportedError(Exception):
@@ -100,6 +100,16 @@ class MusicPlatformAdapter(ABC):
     def fetch_liked_tracks(self, limit: int = 50) -> List[Dict]:
         raise NotSupportedError("Fetching liked tracks not supported.")
 
+    def iter_liked_track_pages(self, page_size: int = 50) -> Iterator[List[Dict]]:
+        """
+        Liked tracks in pages, for the library sync. Defaults to one page of everything
+        fetch_liked_tracks returns. The pages must cover the whole library or raise: the
+        sync removes synced songs that are missing from them.
+        """
+        tracks = self.fetch_liked_tracks(limit=page_size)
+        if tracks:
+            yield tracks
+
     def add_current_to_favorites(self, db: Session, platform_account_id: int):
         raise NotSupportedError("Adding to favorites not supported.")
 
@@ -0,0 +1,78 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientPool(Generic[T]):
+    """
+    Process-level LRU of API clients keyed by platform account, so their HTTP
+    sessions (and the keep-alive connections inside them) survive across requests.
+
+    The factory is called with (access_token, account_id), so a client can be bound to
+    the one account it serves. An entry is only reused while the access token matches;
+    a rotated token replaces the client. Evicted clients are simply dropped: requests that are
+    still using them finish normally and the session is closed when it is collected.
+    """
+
+    def __init__(self, factory: Callable[[str, int | None], T], max_size: int = 64, name: str = "client"):
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._name = name
+        self._clients: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(access_token: str, account_id: int | None):
+        if account_id is not None:
+            return ("account", account_id)
+        # Callers without an account id are keyed by a digest of the token (never the raw token)
+        return ("token", hashlib.sha256(access_token.encode()).hexdigest())
+
+    def get(self, access_token: str, account_id: int | None = None) -> T:
+        key = self._key(access_token, account_id)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry and entry[0] == access_token:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry:
+                logger.info(f"{self._name} pool: access token rotated, replacing client")
+                self.evictions += 1
+
+            client = self._factory(access_token, account_id)
+            self._clients[key] = (access_token, client)
+            self._clients.move_to_end(key)
+            self.misses += 1
+
+            while len(self._clients) > self._max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def invalidate(self, account_id: int | None = None, access_token: str | None = None):
+        """Drops the client of an account (or token), e.g. after a 401."""
+        if account_id is None and access_token is None:
+            return
+        with self._lock:
+            self._clients.pop(self._key(access_token or "", account_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def stats(self) -> dict:
+        return {"size": len(self._clients), "max_size": self._max_size, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -1,20 +1,77 @@
 import os
 import requests
 import secrets
+import threading
 import hashlib
 import base64
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
+from itertools import islice
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from backend.adapters.adapter_base import MusicPlatformAdapter
 from backend.models.database_models import UserPlaylist, UserLikedSong, SearchCache
 from backend.utils.normalize_text import normalize_query
+from backend.services.library_sync_service import local_liked_songs, liked_at_now
 from backend.utils.fuzzy_utils import fuzzy_search_cache
+from backend.utils.metrics import record_search_cache, record_search_api_fallback
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# Applied to every SoundCloud call that does not pass its own timeout
+SOUNDCLOUD_CONNECT_TIMEOUT = float(os.getenv("SOUNDCLOUD_CONNECT_TIMEOUT_SECONDS", 3.05))
+SOUNDCLOUD_READ_TIMEOUT = float(os.getenv("SOUNDCLOUD_READ_TIMEOUT_SECONDS", 15))
+# Keep-alive connections kept per SoundCloud host (one per executor thread is plenty)
+SOUNDCLOUD_POOL_SIZE = int(os.getenv("SOUNDCLOUD_POOL_SIZE", 32))
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """Sends calls made without a timeout with the default SoundCloud (connect, read) timeouts."""
+
+    def send(self, request, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (SOUNDCLOUD_CONNECT_TIMEOUT, SOUNDCLOUD_READ_TIMEOUT)
+        return super().send(request, *args, **kwargs)
+
+
+def build_soundcloud_session() -> requests.Session:
+    """
+    Pooled session for the SoundCloud API. Failed connects are retried for any verb (nothing
+    was sent); read timeouts and 5xx only for idempotent ones, so a like or a new playlist is
+    never POSTed twice. The last 5xx is returned as is for raise_for_status().
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=3, connect=None, read=1, backoff_factor=0.5,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        status_forcelist=[500, 502, 503, 504], raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(max_retries=retries, pool_maxsize=SOUNDCLOUD_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Shared by all accounts: authentication is the bearer token, no cookie may carry over
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+_session: tuple[int, requests.Session] | None = None
+_session_lock = threading.Lock()
+
+
+def soundcloud_session() -> requests.Session:
+    """The process-wide SoundCloud session, rebuilt in forked workers so pools are never shared."""
+    global _session
+    current = _session
+    if current is None or current[0] != os.getpid():
+        with _session_lock:
+            if _session is None or _session[0] != os.getpid():
+                _session = (os.getpid(), build_soundcloud_session())
+            current = _session
+    return current[1]
+
 class SoundCloudAdapter(MusicPlatformAdapter):
     """
     SoundCloud music platform adapter.
@@ -32,7 +89,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
         "playlist_creation": True,       
         "voice_control": False,           
     }
-    BASE_API_URL = "https://api.soundcloud.com"
+    BASE_API_URL = os.getenv("SOUNDCLOUD_API_BASE", "https://api.soundcloud.com")
 
     def __init__(self, access_token: str = None, **kwargs):
         if not access_token:
@@ -51,7 +108,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
         Returns True if valid, False if 401/403.
         """
         try:
-            resp = requests.get(f"{self.BASE_API_URL}/me", headers=self._headers())
+            resp = soundcloud_session().get(f"{self.BASE_API_URL}/me", headers=self._headers())
             if resp.status_code in [401, 403]:
                 return False
             resp.raise_for_status()
@@ -103,12 +160,12 @@ class SoundCloudAdapter(MusicPlatformAdapter):
             "code_verifier": code_verifier
         }
 
-        token_resp = requests.post(token_url, data=payload)
+        token_resp = soundcloud_session().post(token_url, data=payload)
         token_resp.raise_for_status()
         token_data = token_resp.json()
 
         headers = {"Authorization": f"Bearer {token_data['access_token']}"}
-        me = requests.get("https://api.soundcloud.com/me", headers=headers).json()
+        me = soundcloud_session().get(f"{SoundCloudAdapter.BASE_API_URL}/me", headers=headers).json()
 
         # Calculate expiration
         expires_in = token_data.get("expires_in", 3600)
@@ -130,71 +187,76 @@ class SoundCloudAdapter(MusicPlatformAdapter):
     # ---------------- Library Management ----------------
 
 
+    def iter_liked_track_pages(self, page_size: int = 50) -> Iterator[List[dict]]:
+        """
+        Yields every liked track page by page, following next_href to the end. Errors are
+        raised rather than ending the walk early: the library sync removes songs that are
+        missing from these pages.
+        """
+        next_href = f"{self.BASE_API_URL}/me/likes/tracks"
+        params = {"limit": page_size}
+        visited = set()
+
+        while next_href and next_href not in visited:
+            visited.add(next_href)
+            logger.info(f"Fetching SoundCloud Liked Tracks Page {len(visited)}...")
+            resp = soundcloud_session().get(next_href, headers=self._headers(), params=params)
+            params = None
+            resp.raise_for_status()
+            data = resp.json()
+
+            if isinstance(data, list):
+                collection = data
+                next_href = None
+            elif isinstance(data, dict):
+                collection = data.get("collection", [])
+                next_href = data.get("next_href")
+            else:
+                raise ValueError(f"Unexpected SoundCloud response structure: {type(data)}")
+
+            if not collection:
+                return
+
+            tracks = []
+            for item in collection:
+                track = item.get("track", item)
+                user = track.get("user", {})
+
+                tracks.append({
+                    "uri": f"soundcloud:track:{track.get('id')}",
+                    "meta_data": {
+                        "title": track.get("title", "Unknown Title"),
+                        "artist": user.get("username", "Unknown Artist"),
+                        "duration_ms": track.get("duration", 0),
+                        "artwork": track.get("artwork_url") or user.get("avatar_url"),
+                        "permalink_url": track.get("permalink_url"),
+                        # Only a like wrapper carries the like date; a bare track's created_at is its upload date
+                        "added_at": self._iso_time(item.get("created_at")) if "track" in item else None,
+                    }
+                })
+            yield tracks
+
     def fetch_liked_tracks(self, limit: int = 50) -> List[dict]:
         """
         Fetches liked tracks, utilizing pagination to retrieve the full list.
         The 'limit' argument controls the batch size per request.
         """
         tracks = []
-        next_href = f"{self.BASE_API_URL}/me/likes/tracks"
-        params = {"limit": limit} 
-        
-        MAX_PAGES = 50 
-        page_count = 0
+        MAX_PAGES = 50
+
+        try:
+            for page in islice(self.iter_liked_track_pages(page_size=limit), MAX_PAGES):
+                tracks.extend(page)
+        except Exception as e:
+            logger.error(f"Error fetching SoundCloud likes after {len(tracks)} tracks: {e}")
 
-        while next_href and page_count < MAX_PAGES:
-            logger.info(f"Fetching SoundCloud Liked Tracks Page {page_count + 1}...")
-            
-            try:
-                if page_count == 0:
-                    resp = requests.get(next_href, headers=self._headers(), params=params)
-                else:
-                    resp = requests.get(next_href, headers=self._headers())
-                
-                resp.raise_for_status()
-                data = resp.json()
-                
-                collection = []
-                if isinstance(data, list):
-                    collection = data
-                    next_href = None 
-                elif isinstance(data, dict):
-                     collection = data.get("collection", [])
-                     next_href = data.get("next_href")
-                else:
-                    logger.warning(f"Unexpected SoundCloud response structure: {type(data)}")
-                    break
-
-                if not collection:
-                    break
-
-                for item in collection:
-                    track = item.get("track", item)
-                    user = track.get("user", {})
-                    
-                    tracks.append({
-                        "uri": f"soundcloud:track:{track.get('id')}",
-                        "meta_data": {
-                            "title": track.get("title", "Unknown Title"),
-                            "artist": user.get("username", "Unknown Artist"),
-                            "duration_ms": track.get("duration", 0),
-                            "artwork": track.get("artwork_url") or user.get("avatar_url"),
-                        }
-                    })
-                
-                page_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error fetching SoundCloud likes page {page_count}: {e}")
-                break
-                
         logger.info(f"Fetched total {len(tracks)} liked tracks from SoundCloud.")
         return tracks
 
     # ---------------- Playlists Management----------------
 
     def fetch_user_playlists(self) -> List[dict]:
-        resp = requests.get(
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/me/playlists",
             headers=self._headers()
         )
@@ -237,7 +299,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
             }
         }
 
-        resp = requests.post(
+        resp = soundcloud_session().post(
             f"{self.BASE_API_URL}/playlists",
             headers=self._headers(),
             json=payload
@@ -288,6 +350,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
             ).all()
 
             match, score = fuzzy_search_cache(norm_query, cache_records, threshold=75)
+            record_search_cache("soundcloud", "fuzzy", hit=bool(match))
             if match:
                 meta = match.meta_data or {}
                 logger.info("SoundCloud Fuzzy SearchCache hit: '%s' (score: %s)", query, score)
@@ -304,8 +367,9 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
         # 2. API Search Fallback
         logger.info("No SearchCache match for '%s'. Querying SoundCloud API.", query)
+        record_search_api_fallback("soundcloud")
         try:
-            resp = requests.get(
+            resp = soundcloud_session().get(
                 f"{self.BASE_API_URL}/tracks",
                 headers=self._headers(),
                 params={"q": query, "limit": limit}
@@ -386,7 +450,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
     def play_playlist_by_name(self, db: Session, platform_account_id: int, playlist_name: str):
         # 1. Search for playlist
-        resp = requests.get(
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/me/playlists",
             headers=self._headers()
         )
@@ -411,7 +475,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
              return f"Could not find playlist '{playlist_name}' to delete."
 
         # 2. Delete
-        resp = requests.delete(
+        resp = soundcloud_session().delete(
             f"{self.BASE_API_URL}/playlists/{playlist_id}",
             headers=self._headers()
         )
@@ -435,7 +499,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
     def resolve_playlist_id(self, db: Session, platform_account_id: int, playlist_name: str) -> Optional[str]:
         """Helper to find playlist ID by name."""
-        resp = requests.get(
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/me/playlists",
             headers=self._headers()
         )
@@ -457,7 +521,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
             return "Playlist ID is missing."
             
         # 1. Fetch current
-        resp = requests.get(
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/playlists/{playlist_id}",
             headers=self._headers()
         )
@@ -498,7 +562,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
         headers = self._headers()
         headers["Content-Type"] = "application/json"
 
-        resp = requests.put(
+        resp = soundcloud_session().put(
             f"{self.BASE_API_URL}/playlists/{playlist_id}",
             headers=headers,
             data=json.dumps(final_payload)
@@ -535,7 +599,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
             return "Playlist ID is missing."
             
         # 1. Fetch current
-        resp = requests.get(
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/playlists/{playlist_id}",
             headers=self._headers()
         )
@@ -585,7 +649,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
         headers = self._headers()
         headers["Content-Type"] = "application/json"
 
-        resp = requests.put(
+        resp = soundcloud_session().put(
             f"{self.BASE_API_URL}/playlists/{playlist_id}",
             headers=headers,
             data=json.dumps(final_payload)
@@ -614,11 +678,38 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
     # ---------------- Favorites ----------------
     
-    def play_liked_songs(self, db: Session, platform_account_id: int):
+    @staticmethod
+    def _iso_time(value: str | None) -> str | None:
+        """SoundCloud's "2024/01/31 18:00:00 +0000" as the ISO form liked songs are ordered by."""
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y/%m/%d %H:%M:%S %z").astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            return value
+
+    def play_liked_songs(self, db: Session, platform_account_id: int, shuffle: bool = False):
         """
-        Plays the user's liked songs (starts with the most recent one).
+        Plays the user's liked songs (starts with the most recent one, or a random one with `shuffle`).
+        Served from the synced library; /me/likes/tracks is only asked when it is empty or stale.
         """
-        resp = requests.get(
+        for track_uri, meta in local_liked_songs(db, platform_account_id, limit=1, shuffle=shuffle):
+            # Rows cached before permalink_url was stored cannot be played by the widget
+            if meta.get("permalink_url"):
+                title = meta.get("title") or meta.get("track_name")
+                return {
+                    "message": f"Playing your liked songs from SoundCloud. Starting with {title}.",
+                    "track_info": {
+                        "title": title,
+                        "subtitle": meta.get("artist"),
+                        "type": "song",
+                        "image": meta.get("artwork") or meta.get("image"),
+                        "permalink_url": meta["permalink_url"],
+                        "uri": track_uri
+                    }
+                }
+
+        resp = soundcloud_session().get(
             f"{self.BASE_API_URL}/me/likes/tracks",
             headers=self._headers(),
             params={"limit": 1}
@@ -653,7 +744,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
     def add_track_to_favorites(self, db: Session, platform_account_id: int, track_id: str):
         # Per PDF: POST https://api.soundcloud.com/likes/tracks/TRACK_ID
-        resp = requests.post(
+        resp = soundcloud_session().post(
             f"{self.BASE_API_URL}/likes/tracks/{track_id}",
             headers=self._headers()
         )
@@ -674,7 +765,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
 
         # Fetch metadata for cache
         try:
-            track_resp = requests.get(
+            track_resp = soundcloud_session().get(
                 f"{self.BASE_API_URL}/tracks/{track_id}",
                 headers=self._headers()
             )
@@ -691,7 +782,9 @@ class SoundCloudAdapter(MusicPlatformAdapter):
                     "artist": user.get("username", ""),
                     "album_name": "",
                     "duration_ms": track.get("duration", 0),
-                    "image": track.get("artwork_url")
+                    "image": track.get("artwork_url"),
+                    "permalink_url": track.get("permalink_url"),
+                    "added_at": liked_at_now()
                 }
             ))
             db.commit()
@@ -703,7 +796,7 @@ class SoundCloudAdapter(MusicPlatformAdapter):
         return "Added to Liked Songs."
 
     def remove_track_from_favorites(self, db: Session, platform_account_id: int, track_id: str):
-        resp = requests.delete(
+        resp = soundcloud_session().delete(
             f"{self.BASE_API_URL}/likes/tracks/{track_id}",
             headers=self._headers()
         )
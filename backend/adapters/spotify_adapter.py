@@ -1,32 +1,121 @@
 import os
 import time
+import random
 import logging
 import requests
+import redis
+import threading
+import contextvars
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterator, TypeVar
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyOAuth, SpotifyAuthBase
 from spotipy.exceptions import SpotifyException
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 from backend.adapters.adapter_base import MusicPlatformAdapter
+from backend.adapters.client_pool import ClientPool
 from backend.models.database_models import UserPlaylist, UserLikedSong, SearchCache
 from backend.utils.fuzzy_utils import fuzzy_db_match, fuzzy_search_cache
+from backend.utils.metrics import record_search_cache, record_search_api_fallback
+from backend.utils.tracing import span
 from backend.utils.normalize_text import normalize_query
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from backend.configurations.redis_client import redis_client
+from backend.services.profile_cache import get_spotify_profile
+from backend.services.library_sync_service import local_liked_songs, liked_at_now
+from backend.services.rate_limiter import spotify_rate_limiter, current_lane, RateLimited
+from backend.services.playback_snapshot import (
+    snapshot_from_playback, get_snapshot, store_snapshot, update_snapshot, invalidate_snapshot
+)
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Web API base; overridable so benchmarks can point the adapter at a local stand-in
+SPOTIFY_API_BASE = os.getenv("SPOTIFY_API_BASE", "https://api.spotify.com/v1/")
+
+# How long a resolved playback device is reused before asking /me/player/devices again.
+# Kept short: commands target this device explicitly, so a stale entry would pull playback back to it.
+DEVICE_CACHE_TTL_SECONDS = int(os.getenv("SPOTIFY_DEVICE_CACHE_TTL_SECONDS", 30))
+
+# After next/previous, current playback is polled until the track changes: first poll right away,
+# then at intervals doubling from TRACK_CHANGE_FIRST_INTERVAL up to TRACK_CHANGE_MAX_INTERVAL.
+TRACK_CHANGE_TIMEOUT_SECONDS = float(os.getenv("SPOTIFY_TRACK_CHANGE_TIMEOUT_SECONDS", 2.0))
+TRACK_CHANGE_FIRST_INTERVAL = 0.05
+TRACK_CHANGE_MAX_INTERVAL = 0.4
+
+# Web API maximum for /me/tracks
+LIKED_TRACKS_PAGE_SIZE = 50
+# Most URIs handed to start_playback in one call (liked songs)
+PLAY_URIS_LIMIT = int(os.getenv("SPOTIFY_PLAY_URIS_LIMIT", 100))
+# Spotify's per-request item limit for adding to / removing from a playlist
+PLAYLIST_WRITE_CHUNK = 100
+# Spotify searches run in parallel when resolving a multi-song playlist edit
+RESOLVE_CONCURRENCY = int(os.getenv("SPOTIFY_RESOLVE_CONCURRENCY", 8))
+# Saved-track pages fetched in parallel during a library sync
+LIKED_TRACKS_CONCURRENCY = int(os.getenv("SPOTIFY_LIKED_TRACKS_CONCURRENCY", 4))
+
+# Volume changes for an account within this window are merged into one trailing write
+VOLUME_COALESCE_SECONDS = float(os.getenv("SPOTIFY_VOLUME_COALESCE_SECONDS", 0.3))
+
+# Times a call is re-sent after a 429 once the shared Retry-After has passed
+RATE_LIMIT_RETRIES = int(os.getenv("SPOTIFY_RATE_LIMIT_RETRIES", 2))
+
+class RateLimitedHTTPAdapter(HTTPAdapter):
+    """
+    Sends every Web API call through the shared Spotify rate limiter. 429s are not retried
+    per process by urllib3: their Retry-After is published to all workers, and the call is
+    re-sent once the limiter lets it through again.
+    """
+
+    def send(self, request, *args, **kwargs):
+        lane = current_lane()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                spotify_rate_limiter.acquire(lane)
+            except RateLimited as e:
+                raise SpotifyException(
+                    429, -1, f"{request.url}:\n {e.message}", reason="RATE_LIMITED",
+                    headers={"Retry-After": str(max(1, round(e.retry_after)))},
+                )
+            response = super().send(request, *args, **kwargs)
+            if response.status_code != 429:
+                return response
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            logger.warning(f"Spotify returned 429 ({lane}), pausing all workers for {retry_after:g}s")
+            spotify_rate_limiter.block(retry_after)
+            if attempt < RATE_LIMIT_RETRIES:
+                response.close()
+        return response
+
+
+def build_spotify_session() -> requests.Session:
+    """The session spotipy sends API calls with (5xx retried locally, 429s via the limiter)."""
+    session = requests.Session()
+    retries = Retry(
+        total=3, connect=None, read=False, backoff_factor=1,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        status_forcelist=[500, 502, 503, 504],
+    )
+    adapter = RateLimitedHTTPAdapter(max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 class TokenAuthManager(SpotifyAuthBase):
     def __init__(self, token: str):
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        session.mount("https://", HTTPAdapter(max_retries=retries))
-        # The session must be passed to the parent constructor
-        super().__init__(session) 
+        # Never used for requests (the token is handed over as is); API calls go through build_spotify_session()
+        super().__init__(requests.Session())
         self.token = token
 
     def get_access_token(self, as_dict=False):
@@ -36,6 +125,83 @@ class NoActiveDeviceException(Exception):
     """Custom exception for when no active Spotify device is found."""
     pass
 
+class VolumeCoalescer:
+    """
+    Merges bursts of volume writes per account ("louder, louder, louder"): the first write
+    goes out immediately, later ones within `window` seconds only move the target, and a
+    single trailing write sends the final value when the window closes.
+    """
+
+    def __init__(self, window: float = VOLUME_COALESCE_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        # key -> {"target", "write", "last_write" (monotonic), "timer"}
+        self._state: dict = {}
+        self.writes = 0
+        self.merged = 0
+
+    def _active(self, entry: dict | None, now: float) -> bool:
+        return bool(entry) and (entry["timer"] is not None or now - entry["last_write"] < self.window)
+
+    def recent_target(self, key) -> int | None:
+        """The volume most recently asked for, while its window is open (Spotify may not show it yet)."""
+        with self._lock:
+            entry = self._state.get(key)
+            return entry["target"] if self._active(entry, time.monotonic()) else None
+
+    def submit(self, key, target: int, write: Callable[[int], None]) -> bool:
+        """
+        Returns True if `target` was written now, False if it was merged into the trailing write
+        (which has not happened yet). A failed leading write is raised to the caller.
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._state.get(key)
+            if not self._active(entry, now):
+                entry = self._state[key] = {"target": target, "write": write, "last_write": now, "timer": None}
+                self.writes += 1
+                leading = True
+            else:
+                entry["target"], entry["write"] = target, write
+                self.merged += 1
+                if entry["timer"] is None:
+                    entry["timer"] = threading.Timer(max(0.0, self.window - (now - entry["last_write"])), self._flush, args=(key,))
+                    entry["timer"].daemon = True
+                    entry["timer"].start()
+                leading = False
+        if leading:
+            try:
+                write(target)
+            except Exception:
+                self._forget(key, entry)
+                raise
+        return leading
+
+    def _forget(self, key, entry: dict):
+        """
+        Drops the state of a failed write, so the next relative change reads the real volume
+        instead of building on a target that was never applied. Kept if a newer change is pending.
+        """
+        with self._lock:
+            if self._state.get(key) is entry and entry["timer"] is None:
+                del self._state[key]
+
+    def _flush(self, key):
+        with self._lock:
+            entry = self._state.get(key)
+            if not entry:
+                return
+            target, write = entry["target"], entry["write"]
+            entry["timer"] = None
+            entry["last_write"] = time.monotonic()
+            self.writes += 1
+        try:
+            write(target)
+        except Exception as e:
+            # The turn has already answered ("Setting volume to ..."), so this can only be logged
+            logger.warning(f"Coalesced volume write of {target}% failed: {e}")
+            self._forget(key, entry)
+
 class SpotifyAdapter(MusicPlatformAdapter):
 
     CAPABILITIES = {
@@ -50,12 +216,27 @@ class SpotifyAdapter(MusicPlatformAdapter):
         "voice_control": True,
     }
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, platform_account_id: int | None = None):
         if not access_token:
             raise ValueError("SpotifyAdapter requires a valid user access_token.")
                 
         auth_manager = TokenAuthManager(access_token)
-        self.sp = Spotify(auth_manager=auth_manager, requests_timeout=15)
+        self.sp = Spotify(auth_manager=auth_manager, requests_session=build_spotify_session(), requests_timeout=15)
+        self.sp.prefix = SPOTIFY_API_BASE
+        # Enables the per-account device cache; fixed for the adapter's lifetime, since pooled
+        # adapters are shared between threads
+        self.platform_account_id = platform_account_id
+
+    @classmethod
+    def for_account(cls, access_token: str, platform_account_id: int | None = None) -> "SpotifyAdapter":
+        """
+        Returns the pooled adapter for this account/token, so the spotipy session and its
+        keep-alive connections are reused instead of re-handshaking on every action.
+        The pool is keyed by account, so an adapter only ever serves the account it was built for.
+        """
+        if not access_token:
+            raise ValueError("SpotifyAdapter requires a valid user access_token.")
+        return spotify_client_pool.get(access_token, platform_account_id)
 
     def _update_song_history(self, platform_account_id: int, song_uri: str):
         """
@@ -74,43 +255,109 @@ class SpotifyAdapter(MusicPlatformAdapter):
         redis_client.ltrim(key, 0, 1)
         logger.info(f"Updated song history for acc {platform_account_id}. History: {redis_client.lrange(key, 0, -1)}")
 
-    def _get_active_device_id(self) -> str:
+    # === Device resolution ===
+    def _device_cache_key(self) -> str | None:
+        if self.platform_account_id is None:
+            return None
+        return f"spotify:device:{self.platform_account_id}"
+
+    def _cached_device_id(self) -> str | None:
+        key = self._device_cache_key()
+        if not key:
+            return None
+        try:
+            device_id = redis_client.get(key)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Device cache read failed: {e}")
+            return None
+        if isinstance(device_id, bytes):
+            device_id = device_id.decode()
+        return device_id or None
+
+    def remember_device(self, device_id: str | None):
+        """Caches the account's playback device for DEVICE_CACHE_TTL_SECONDS."""
+        key = self._device_cache_key()
+        if not (key and device_id):
+            return
+        try:
+            redis_client.set(key, device_id, ex=DEVICE_CACHE_TTL_SECONDS)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Device cache write failed: {e}")
+
+    def invalidate_device(self):
+        key = self._device_cache_key()
+        if not key:
+            return
+        try:
+            redis_client.delete(key)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Device cache invalidation failed: {e}")
+
+    @staticmethod
+    def _pick_device(devices: list) -> dict | None:
+        """The first active device, else the first available one."""
+        if not devices:
+            return None
+        active_devices = [d for d in devices if d.get('is_active')]
+        return active_devices[0] if active_devices else devices[0]
+
+    def _get_active_device_id(self, use_cache: bool = True) -> str:
         """Finds an active device; raises NoActiveDeviceException if none are available."""
+        if use_cache:
+            cached = self._cached_device_id()
+            if cached:
+                return cached
+
         try:
             devices_info = self.sp.devices()
             devices = devices_info.get('devices', []) if devices_info else []
             if not devices:
                 raise NoActiveDeviceException("No Spotify devices are connected to this account.")
 
-            active_devices = [d for d in devices if d.get('is_active')]
-            if active_devices:
-                device = active_devices[0]
+            device = self._pick_device(devices)
+            if device.get('is_active'):
                 logger.info(f"Found active device: {device['name']} (ID: {device['id']})")
-                return device['id']
-            
-            # If no device is marked 'active', fall back to the first one available.
-            device = devices[0]
-            logger.warning(f"No active device found. Falling back to first available: {device['name']} (ID: {device['id']})")
+            else:
+                # If no device is marked 'active', fall back to the first one available.
+                logger.warning(f"No active device found. Falling back to first available: {device['name']} (ID: {device['id']})")
+            self.remember_device(device['id'])
             return device['id']
         except SpotifyException as e:
             logger.error(f"Could not retrieve devices from Spotify: {e}")
             raise NoActiveDeviceException("Failed to get device list from Spotify. The token may be invalid or expired.")
 
+    @staticmethod
+    def _is_stale_device_error(e: SpotifyException) -> bool:
+        """404 / NO_ACTIVE_DEVICE: the device we targeted is gone or no longer active."""
+        reason = (getattr(e, "reason", None) or "").upper()
+        return e.http_status == 404 or reason == "NO_ACTIVE_DEVICE" or "no active device" in str(e).lower()
+
+    def _on_device(self, command: Callable[[str], T]) -> T:
+        """
+        Runs `command(device_id)` against the account's device. If a cached device turns out
+        to be stale, the cache is dropped and the command retried once with a fresh lookup.
+        """
+        cached = self._cached_device_id()
+        device_id = cached or self._get_active_device_id(use_cache=False)
+        try:
+            return command(device_id)
+        except SpotifyException as e:
+            if not (cached and self._is_stale_device_error(e)):
+                raise
+            logger.info(f"Cached device {device_id} rejected by Spotify ({e.http_status}), looking it up again")
+            self.invalidate_device()
+            return command(self._get_active_device_id(use_cache=False))
+
     def get_active_device(self) -> dict | None:
+        """Full device lookup (used by the status check); also warms the device cache."""
         try:
             devices_info = self.sp.devices()
             devices = devices_info.get('devices', []) if devices_info else []
-            
-            if not devices:
-                return None
+            device = self._pick_device(devices)
+            if device:
+                self.remember_device(device.get('id'))
+            return device
 
-            # Return the first active one, or None
-            active_devices = [d for d in devices if d.get('is_active')]
-            if active_devices:
-                return active_devices[0]
-            
-            return devices[0]
-            
         except Exception as e:
             logger.warning(f"Error checking active device: {e}")
             return None
@@ -170,53 +417,123 @@ class SpotifyAdapter(MusicPlatformAdapter):
 
     # === Playback Controls ===
     def play(self, uris: list[str]):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to play URIs on device {device_id}")
-        self.sp.start_playback(device_id=device_id, uris=uris)
+        logger.debug(f"Attempting to play {len(uris)} URIs")
+        self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id, uris=uris))
+        self._playback_changed()
         logger.debug("Spotify 'start_playback' command sent successfully.")
 
     def pause(self):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to pause playback on device {device_id}")
-        self.sp.pause_playback(device_id=device_id)
+        logger.debug("Attempting to pause playback")
+        self._on_device(lambda device_id: self.sp.pause_playback(device_id=device_id))
+        self._playback_changed(is_playing=False)
         logger.debug("Spotify 'pause_playback' command sent successfully.")
 
     def resume(self):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to resume playback on device {device_id}")
-        self.sp.start_playback(device_id=device_id)
+        logger.debug("Attempting to resume playback")
+        self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id))
+        self._playback_changed(is_playing=True)
         logger.debug("Spotify 'resume' command sent successfully.")
 
     def skip_current_track(self):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to skip track on device {device_id}")
-        self.sp.next_track(device_id=device_id)
+        before = self._playback_position()
+        logger.debug("Attempting to skip track")
+        self._on_device(lambda device_id: self.sp.next_track(device_id=device_id))
         logger.debug("Spotify 'next_track' command sent successfully.")
-        
-        # Wait for state update and return new track info
-        time.sleep(0.5)
-        return self.get_currently_playing_song()
+        return self._await_track_change(before)
 
     def previous_track(self):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to go to previous track on device {device_id}")
-        self.sp.previous_track(device_id=device_id)
+        before = self._playback_position()
+        logger.debug("Attempting to go to previous track")
+        self._on_device(lambda device_id: self.sp.previous_track(device_id=device_id))
         logger.debug("Spotify 'previous_track' command sent successfully.")
+        # "Previous" restarts the current track once it has played a few seconds
+        return self._await_track_change(before, allow_restart=True)
 
-        # Wait for state update and return new track info
-        time.sleep(0.5)
-        return self.get_currently_playing_song()
+    def _playback_position(self) -> tuple[str | None, int | None]:
+        """(track URI, progress_ms) of current playback, read before a track change."""
+        try:
+            playback = self.sp.current_playback() or {}
+        except Exception as e:
+            logger.warning(f"Could not read playback before track change: {e}")
+            return None, None
+        return (playback.get("item") or {}).get("uri"), playback.get("progress_ms")
+
+    def _await_track_change(self, before: tuple[str | None, int | None], allow_restart: bool = False) -> dict | None:
+        """
+        Polls current playback until the track URI differs from the one in `before` (or, with
+        `allow_restart`, the same track started over) or TRACK_CHANGE_TIMEOUT_SECONDS pass.
+        Returns the track like get_currently_playing_song() plus a `track_change` block
+        (confirmed, wait_ms, polls). Without a known previous URI the first playing track is taken.
+        """
+        start = time.monotonic()
+        deadline = start + TRACK_CHANGE_TIMEOUT_SECONDS
+        interval = TRACK_CHANGE_FIRST_INTERVAL
+        polls = 0
+        playback = None
+        confirmed = False
+
+        with span("track_change_wait"):
+            while True:
+                try:
+                    playback = self.sp.current_playback()
+                except Exception as e:
+                    logger.warning(f"Playback poll failed while waiting for track change: {e}")
+                    playback = None
+                polls += 1
+
+                if self._track_changed(playback, before, allow_restart):
+                    confirmed = True
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, TRACK_CHANGE_MAX_INTERVAL)
+
+        return self._track_change_result(playback, confirmed, round((time.monotonic() - start) * 1000, 1), polls)
+
+    @staticmethod
+    def _track_changed(playback: dict | None, before: tuple[str | None, int | None], allow_restart: bool) -> bool:
+        """Whether `playback` shows another track than `before` (or, with `allow_restart`, the same one started over)."""
+        before_uri, before_progress = before
+        uri = ((playback or {}).get("item") or {}).get("uri")
+        progress = (playback or {}).get("progress_ms")
+        restarted = (
+            allow_restart and uri == before_uri and progress is not None
+            and before_progress is not None and progress + 1000 < before_progress
+        )
+        return bool(uri and uri != before_uri) or restarted
+
+    def _track_change_result(self, playback: dict | None, confirmed: bool, wait_ms: float, polls: int) -> dict | None:
+        """Stores the last poll as the snapshot and formats the result of a track change wait."""
+        if confirmed:
+            logger.info(f"Track change confirmed after {wait_ms} ms ({polls} polls)")
+        else:
+            logger.warning(f"Track change not confirmed within {TRACK_CHANGE_TIMEOUT_SECONDS}s ({polls} polls), returning last known track")
+
+        snapshot = snapshot_from_playback(playback)
+        if confirmed and self.platform_account_id is not None:
+            # The last poll is the freshest view of the new track
+            store_snapshot(self.platform_account_id, snapshot)
+        else:
+            self._playback_changed()
+
+        result = self._format_track(snapshot["track"])
+        if result is not None:
+            result["track_change"] = {"confirmed": confirmed, "wait_ms": wait_ms, "polls": polls}
+        return result
 
     def restart_current_track(self):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to restart track on device {device_id}")
-        self.sp.seek_track(0, device_id=device_id)
+        logger.debug("Attempting to restart track")
+        self._on_device(lambda device_id: self.sp.seek_track(0, device_id=device_id))
+        self._playback_changed()
         logger.debug("Spotify 'seek_track' to 0ms command sent successfully.")
 
     def seek_position(self, seconds: int):
-        device_id = self._get_active_device_id()
-        logger.debug(f"Attempting to seek to {seconds}s on device {device_id}")
-        self.sp.seek_track(seconds * 1000, device_id=device_id)
+        logger.debug(f"Attempting to seek to {seconds}s")
+        self._on_device(lambda device_id: self.sp.seek_track(seconds * 1000, device_id=device_id))
+        self._playback_changed()
         logger.debug(f"Spotify 'seek_track' to {seconds * 1000}ms command sent successfully.")
 
     def set_volume(self, volume_percent: int):
@@ -230,34 +547,72 @@ class SpotifyAdapter(MusicPlatformAdapter):
         except SpotifyException as e:
             # Fallback: If no active device is found implicitly, try strict lookup
             logger.warning(f"Direct volume set failed ({e}), attempting with explicit device ID.")
-            device_id = self._get_active_device_id()
-            self.sp.volume(vol, device_id=device_id)
+            self._on_device(lambda device_id: self.sp.volume(vol, device_id=device_id))
+        self._playback_changed(volume_percent=vol)
+
+    def _device_volume(self) -> tuple[str, int]:
+        """
+        (device id, volume) in at most one read: from the playback snapshot when fresh,
+        otherwise from a single devices response (which also warms the device cache).
+        """
+        snapshot = get_snapshot(self.platform_account_id) if self.platform_account_id is not None else None
+        if snapshot and snapshot.get("device_id"):
+            volume = snapshot.get("volume_percent")
+            return snapshot["device_id"], volume if volume is not None else 80
+
+        try:
+            devices_info = self.sp.devices()
+        except SpotifyException as e:
+            logger.error(f"Could not retrieve devices from Spotify: {e}")
+            raise NoActiveDeviceException("Failed to get device list from Spotify. The token may be invalid or expired.")
+        device = self._pick_device(devices_info.get('devices', []) if devices_info else [])
+        if not device:
+            raise NoActiveDeviceException("No Spotify devices are connected to this account.")
+        self.remember_device(device['id'])
+        volume = device.get("volume_percent")
+        return device['id'], volume if volume is not None else 80
+
+    def _write_volume(self, volume: int, device_id: str | None = None):
+        if device_id:
+            try:
+                self.sp.volume(volume, device_id=device_id)
+            except SpotifyException as e:
+                if not self._is_stale_device_error(e):
+                    raise
+                self.invalidate_device()
+                self._on_device(lambda fresh_id: self.sp.volume(volume, device_id=fresh_id))
+        else:
+            self._on_device(lambda fresh_id: self.sp.volume(volume, device_id=fresh_id))
+        self._playback_changed(volume_percent=volume)
 
     def get_volume(self):
-        device_id = self._get_active_device_id()
         try:
-            playback = self.sp.current_playback()
-            if playback and playback.get("device"):
-                return playback["device"].get("volume_percent", 80) 
-            return 80 
+            return self._device_volume()[1]
+        except NoActiveDeviceException:
+            raise
         except Exception as e:
             logger.warning(f"Failed to get current volume: {e}")
             return 80
 
     def change_volume(self, volume_change: int | None, mode: str):
         """
-        Unified volume control.
+        Unified volume control: one read (skipped while a recent change is still settling)
+        and one write, with bursts of changes merged by the volume coalescer.
         :param volume_change: The specific number provided (e.g. 50, 20). Can be None.
         :param mode: "absolute", "increase", or "decrease".
         """
-        current_vol = self.get_volume()
+        if mode == "absolute" and volume_change is None:
+            return "Please specify a volume level."
+
+        key = self.platform_account_id if self.platform_account_id is not None else id(self)
+        device_id = None
+        current_vol = volume_coalescer.recent_target(key)
+        if current_vol is None and mode != "absolute":
+            device_id, current_vol = self._device_volume()
         new_vol = current_vol
 
         if mode == "absolute":
-            if volume_change is not None:
-                new_vol = volume_change
-            else:
-                return "Please specify a volume level."
+            new_vol = volume_change
         
         elif mode == "increase":
             amount = volume_change if volume_change is not None else 10
@@ -270,33 +625,58 @@ class SpotifyAdapter(MusicPlatformAdapter):
         # Clamp between 0 and 100
         new_vol = max(0, min(100, new_vol))
 
-        self.set_volume(new_vol)
-        return f"Volume set to {new_vol}%"
+        if volume_coalescer.submit(key, new_vol, lambda volume: self._write_volume(volume, device_id)):
+            return f"Volume set to {new_vol}%"
+        # Merged into the trailing write, which has not been sent yet
+        return f"Setting volume to {new_vol}%"
 
 
+    # === Playback state ===
+    def _playback_state(self, live: bool = False) -> dict:
+        """
+        Current playback as a snapshot (see playback_snapshot): the shared one kept fresh by the
+        playback poller when there is one, otherwise one live read, stored for the next caller.
+        Writes that act on the current track pass `live`, since the shared snapshot can be
+        seconds behind a skip made in the Spotify app.
+        """
+        if self.platform_account_id is not None and not live:
+            snapshot = get_snapshot(self.platform_account_id)
+            if snapshot:
+                return snapshot
+        snapshot = snapshot_from_playback(self.sp.current_playback())
+        if self.platform_account_id is not None:
+            store_snapshot(self.platform_account_id, snapshot)
+        return snapshot
+
+    def _playback_changed(self, **known):
+        """
+        Keeps the snapshot consistent after a command: applies what the command is known to have
+        changed, or drops the snapshot when the outcome must be read back from Spotify.
+        """
+        if self.platform_account_id is None:
+            return
+        if known:
+            update_snapshot(self.platform_account_id, **known)
+        else:
+            invalidate_snapshot(self.platform_account_id)
+
+    @staticmethod
+    def _format_track(track: dict | None) -> dict | None:
+        if not track:
+            return None
+        return {
+            "status": "success",
+            "track_info": {
+                "title": track.get("name"),
+                "subtitle": ", ".join(track.get("artists", [])),
+                "image": track.get("image"),
+                "type": "song"
+            }
+        }
 
     def get_currently_playing_song(self):
         try:
-            playback = self.sp.current_playback()
-            if playback and playback.get("item"):
-                item = playback["item"]
-                song_name = item.get("name")
-                artist_names = ", ".join([artist["name"] for artist in item.get("artists", [])])
-                
-                image_url = None
-                if item.get("album") and item["album"].get("images"):
-                    image_url = item["album"]["images"][0]["url"]
-
-                return {
-                    "status": "success",
-                    "track_info": {
-                        "title": song_name,
-                        "subtitle": artist_names,
-                        "image": image_url,
-                        "type": "song"
-                    }
-                }
-            return None
+            return self._format_track(self._playback_state()["track"])
         except Exception:
             logger.error(f"Error fetching current playback", exc_info=True)
             return None
@@ -305,12 +685,11 @@ class SpotifyAdapter(MusicPlatformAdapter):
     # === Liked Songs ===
     def add_current_to_favorites(self, db: Session, platform_account_id: int):
         """Likes the current track on Spotify and stores its metadata in local cache."""
-        current = self.sp.current_playback()
-        if not current or not current.get("item"):
+        track = self._playback_state(live=True)["track"]
+        if not track:
             logger.warning("No current playback track found.")
             return
 
-        track = current["item"]
         track_id = track["id"]
         track_uri = track["uri"]
 
@@ -332,9 +711,10 @@ class SpotifyAdapter(MusicPlatformAdapter):
             track_uri=track_uri,
             meta_data={
                 "track_name": track["name"],
-                "artist": track["artists"][0]["name"],
-                "album_name": track["album"]["name"],
-                "duration_ms": track.get("duration_ms", 0)
+                "artist": track["artists"][0] if track["artists"] else None,
+                "album_name": track["album_name"],
+                "duration_ms": track.get("duration_ms", 0),
+                "added_at": liked_at_now()
             }
         ))
         db.commit()
@@ -343,12 +723,11 @@ class SpotifyAdapter(MusicPlatformAdapter):
 
     def remove_current_from_favorites(self, db: Session, platform_account_id: int):
         """Unlikes current track and removes it from local DB."""
-        current = self.sp.current_playback()
-        if not current or not current.get("item"):
+        track = self._playback_state(live=True)["track"]
+        if not track:
             logger.warning("No track currently playing.")
             return
 
-        track = current["item"]
         track_id = track["id"]
         track_uri = track["uri"]
 
@@ -367,33 +746,82 @@ class SpotifyAdapter(MusicPlatformAdapter):
             logger.info(f"Removed '{track['name']}' from local cache.")
 
 
-    def fetch_liked_tracks(self, limit: int = 50) -> list:
-        logger.info("Fetching liked tracks and their audio features.")
-        results = self.sp.current_user_saved_tracks(limit=limit)
-        tracks = [item["track"] for item in results["items"] if item.get("track")]
-        if not tracks:
-            return []
-        
-        enriched_tracks = []
-        for track in tracks:
-            enriched_tracks.append({
-                "id": track["id"],
-                "name": track["name"],
-                "artist": track["artists"][0]["name"],
-                "uri": track["uri"],
+    @staticmethod
+    def _liked_tracks(results: dict) -> list:
+        return [
+            {
+                "id": item["track"]["id"],
+                "name": item["track"]["name"],
+                "artist": item["track"]["artists"][0]["name"],
+                "uri": item["track"]["uri"],
                 "meta_data": {
-                    "duration_ms": track["duration_ms"],
-                    "album_name": track["album"]["name"]
+                    "duration_ms": item["track"]["duration_ms"],
+                    "album_name": item["track"]["album"]["name"],
+                    "added_at": item.get("added_at"),
                 }
-            })
-        return enriched_tracks
+            }
+            for item in results["items"] if item.get("track")
+        ]
+
+    def _liked_tracks_page(self, offset: int, limit: int) -> list:
+        return self._liked_tracks(self.sp.current_user_saved_tracks(limit=limit, offset=offset))
+
+    def iter_liked_track_pages(self, page_size: int = LIKED_TRACKS_PAGE_SIZE, max_tracks: int | None = None,
+                               concurrency: int = LIKED_TRACKS_CONCURRENCY) -> Iterator[list]:
+        """
+        Yields all saved tracks page by page. The first page tells the total; the remaining
+        offsets are fetched `concurrency` at a time (each call still waits its turn at the
+        shared rate limiter) and yielded as they arrive, so pages come out of order.
+        """
+        page_size = min(page_size, LIKED_TRACKS_PAGE_SIZE)
+        limit = page_size if max_tracks is None else min(page_size, max_tracks)
+        first = self.sp.current_user_saved_tracks(limit=limit, offset=0)
+        yield self._liked_tracks(first)
+
+        total = first.get("total") or 0
+        if max_tracks is not None:
+            total = min(total, max_tracks)
+        if total <= page_size:
+            return
+        offsets = iter(range(page_size, total, page_size))
+
+        def submit(pool, offset):
+            # Worker threads do not inherit context: carry the rate-limit lane over
+            size = min(page_size, total - offset)
+            return pool.submit(contextvars.copy_context().run, self._liked_tracks_page, offset, size)
+
+        workers = max(1, min(concurrency, -(-(total - page_size) // page_size)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spotify-liked") as pool:
+            pending = {submit(pool, offset) for offset in islice(offsets, workers)}
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page = future.result()
+                        offset = next(offsets, None)
+                        if offset is not None:
+                            pending.add(submit(pool, offset))
+                        yield page
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def fetch_liked_tracks(self, limit: int | None = 50) -> list:
+        """Up to `limit` saved tracks (all of them with None); past the first page the order is not kept."""
+        logger.info("Fetching liked tracks.")
+        return [track for page in self.iter_liked_track_pages(max_tracks=limit) for track in page]
     
-    def play_liked_songs(self, db: Session, platform_account_id: int):
-        tracks = self.fetch_liked_tracks(limit=50)
-        if not tracks:
+    def play_liked_songs(self, db: Session, platform_account_id: int, shuffle: bool = False):
+        """Plays liked songs from the synced library; the API is only asked when it is empty or stale."""
+        uris = [uri for uri, _ in local_liked_songs(db, platform_account_id, limit=PLAY_URIS_LIMIT, shuffle=shuffle)]
+        if not uris:
+            logger.info("Liked songs not synced recently, fetching them from Spotify.")
+            uris = [t["uri"] for t in self.fetch_liked_tracks(limit=PLAY_URIS_LIMIT) if t.get("uri")]
+            if shuffle:
+                random.shuffle(uris)
+        if not uris:
             raise Exception("No liked songs found.")
 
-        uris = [t["uri"] for t in tracks if t.get("uri")]
         self.play(uris)
 
 
@@ -448,7 +876,9 @@ class SpotifyAdapter(MusicPlatformAdapter):
             logger.info(f"Successfully removed playlist '{matched_playlist.name}' from local cache.")
 
     def add_tracks_to_playlist(self, db: Session, platform_account_id: int, playlist_id: str, uris: list):
-        self.sp.playlist_add_items(playlist_id, uris)
+        # In order, so the songs land in the playlist in the order they were asked for
+        for start in range(0, len(uris), PLAYLIST_WRITE_CHUNK):
+            self.sp.playlist_add_items(playlist_id, uris[start:start + PLAYLIST_WRITE_CHUNK])
         
         # Update local DB track count
         playlist = db.query(UserPlaylist).filter_by(
@@ -466,7 +896,8 @@ class SpotifyAdapter(MusicPlatformAdapter):
 
 
     def remove_tracks_from_playlist(self, db: Session, platform_account_id: int, playlist_id: str, uris: list):
-        self.sp.playlist_remove_all_occurrences_of_items(playlist_id, uris)
+        for start in range(0, len(uris), PLAYLIST_WRITE_CHUNK):
+            self.sp.playlist_remove_all_occurrences_of_items(playlist_id, uris[start:start + PLAYLIST_WRITE_CHUNK])
 
         # Update local DB track count
         playlist = db.query(UserPlaylist).filter_by(
@@ -491,25 +922,95 @@ class SpotifyAdapter(MusicPlatformAdapter):
     def reorder_playlist_tracks(self, playlist_id: str, range_start: int, insert_before: int):
         self.sp.playlist_reorder_items(playlist_id, range_start, insert_before)
 
+    def resolve_playlist_edit(self, db: Session, platform_account_id: int, playlist_name: str, song_names: list[str]) -> tuple[str, list, list]:
+        """
+        Resolves the playlist and all songs of one playlist edit: (playlist_id, uris, song names not found).
+        Local lookups (UserPlaylist, SearchCache) run first on this thread, as the DB session is
+        not thread-safe; whatever they miss is searched on Spotify concurrently, and the new
+        search results are cached with one commit.
+        """
+        names = list(dict.fromkeys(name for name in song_names if name))
+        playlists = db.query(UserPlaylist).filter_by(platform_account_id=platform_account_id).all()
+        match, _ = fuzzy_db_match(normalize_query(playlist_name), playlists, attr="name", threshold=80)
+        playlist_id = match.playlist_id if match else None
+
+        cache_records = db.query(SearchCache).filter(SearchCache.platform_account_id == platform_account_id).all()
+        found, misses, incomplete = {}, [], []
+        for name in names:
+            match, _ = fuzzy_search_cache(normalize_query(name), cache_records, threshold=75)
+            if match and (match.meta_data or {}).get("image"):
+                record_search_cache("spotify", "fuzzy", hit=True)
+                found[name] = match.track_uri
+                continue
+            if match and match not in incomplete:
+                incomplete.append(match)
+            record_search_cache("spotify", "fuzzy", hit=False)
+            misses.append(name)
+
+        if misses or playlist_id is None:
+            jobs = len(misses) + (playlist_id is None)
+            with ThreadPoolExecutor(max_workers=min(jobs, RESOLVE_CONCURRENCY), thread_name_prefix="spotify-resolve") as pool:
+                def submit(**search):
+                    return pool.submit(contextvars.copy_context().run, self.sp.search, **search)
+
+                playlist_search = submit(q=playlist_name, type="playlist", limit=1) if playlist_id is None else None
+                searches = {name: submit(q=name, type="track", limit=1) for name in misses}
+
+                if playlist_search is not None:
+                    items = playlist_search.result().get("playlists", {}).get("items", [])
+                    playlist_id = items[0]["id"] if items else None
+                for name, search in searches.items():
+                    record_search_api_fallback("spotify")
+                    tracks = search.result().get("tracks", {}).get("items", [])
+                    if not tracks:
+                        continue
+                    found[name] = tracks[0]["uri"]
+                    db.add(SearchCache(
+                        platform_account_id=platform_account_id,
+                        normalized_query=normalize_query(name),
+                        track_uri=tracks[0]["uri"],
+                        meta_data=self._search_cache_meta(tracks[0]),
+                    ))
+            for entry in incomplete:
+                db.delete(entry)
+            db.commit()
+
+        if playlist_id is None:
+            raise ValueError(f"Playlist '{playlist_name}' not found")
+        uris = list(dict.fromkeys(found[name] for name in names if name in found))
+        return playlist_id, uris, [name for name in names if name not in found]
+
     # === Music Search & Playback by Metadata ===
-    def _resolve_track(
+    @staticmethod
+    def _search_cache_meta(track: dict) -> dict:
+        """What SearchCache keeps about a search result."""
+        image_url = None
+        if track.get("album") and track["album"].get("images"):
+            image_url = track["album"]["images"][0]["url"]
+        return {
+            "track_name": track.get("name", ""),
+            "artist": track["artists"][0].get("name", "") if track.get("artists") else "",
+            "album_name": track["album"].get("name", "") if track.get("album") else "",
+            "duration_ms": track.get("duration_ms", 0),
+            "image": image_url
+        }
+
+    def _cached_track(
         self,
         db: Session,
         platform_account_id: int,
         query: str,
-        limit: int = 1,
         song_name: str | None = None,
         artist_name: str | None = None,
         use_cache: bool = True,
-    ):
-        """
-        Internal helper: Resolves tracks and returns (uris, track_info_dict).
-        """
+    ) -> tuple[str, dict] | None:
+        """(uri, track_info) from SearchCache, or None when the Spotify API has to be searched."""
+        if not use_cache:
+            return None
         norm_query = normalize_query(query)
-        track_info = None
 
         # Strict song+artist cache lookup
-        if use_cache and song_name and artist_name:
+        if song_name and artist_name:
             norm_song = normalize_query(song_name)
             norm_artist = normalize_query(artist_name)
 
@@ -523,6 +1024,7 @@ class SpotifyAdapter(MusicPlatformAdapter):
                 cached_artist = normalize_query(meta.get("artist", "")) if meta.get("artist") else ""
                 if cached_song == norm_song and cached_artist == norm_artist:
                     logger.info("Strict SearchCache hit: song='%s', artist='%s' → %s", song_name, artist_name, rec.track_uri,)
+                    record_search_cache("spotify", "strict", hit=True)
                     
                     track_info = {
                         "title": meta.get("track_name"),
@@ -530,75 +1032,90 @@ class SpotifyAdapter(MusicPlatformAdapter):
                         "image": meta.get("image", None),
                         "type": "song"
                     }
-                    return [rec.track_uri], track_info
+                    return rec.track_uri, track_info
 
             logger.info("No strict cache hit for song='%s', artist='%s'; querying Spotify API directly", song_name, artist_name,)
+            record_search_cache("spotify", "strict", hit=False)
+            return None
 
         # Fuzzy normalized_query cache path
-        elif use_cache:
-            cache_records = db.query(SearchCache).filter(
-                SearchCache.platform_account_id == platform_account_id
-            ).all()
+        cache_records = db.query(SearchCache).filter(
+            SearchCache.platform_account_id == platform_account_id
+        ).all()
 
-            match, score = fuzzy_search_cache(norm_query, cache_records, threshold=75)
-            if match:
-                meta = match.meta_data or {}
-                if meta.get("image"):
-                    logger.info("Fuzzy SearchCache hit: '%s' (score: %s)", match.normalized_query, score)
-                    track_info = {
-                        "title": meta.get("track_name"),
-                        "subtitle": meta.get("artist"),
-                        "image": meta.get("image"),
-                        "type": "song"
-                    }
-                    return [match.track_uri], track_info
-                else:
-                    logger.info("Cache hit for '%s' but missing image. Invalidating incomplete cache entry.", norm_query)
-                    try:
-                        db.delete(match)
-                        db.commit()
-                    except Exception as e:
-                        logger.warning(f"Failed to delete incomplete cache entry: {e}")
-                        db.rollback()
+        match, score = fuzzy_search_cache(norm_query, cache_records, threshold=75)
+        if match:
+            meta = match.meta_data or {}
+            if meta.get("image"):
+                logger.info("Fuzzy SearchCache hit: '%s' (score: %s)", match.normalized_query, score)
+                record_search_cache("spotify", "fuzzy", hit=True)
+                track_info = {
+                    "title": meta.get("track_name"),
+                    "subtitle": meta.get("artist"),
+                    "image": meta.get("image"),
+                    "type": "song"
+                }
+                return match.track_uri, track_info
+            else:
+                logger.info("Cache hit for '%s' but missing image. Invalidating incomplete cache entry.", norm_query)
+                try:
+                    db.delete(match)
+                    db.commit()
+                except Exception as e:
+                    logger.warning(f"Failed to delete incomplete cache entry: {e}")
+                    db.rollback()
+
+        # An incomplete entry (no image) counts as a miss: the API is queried next
+        record_search_cache("spotify", "fuzzy", hit=False)
+        return None
+
+    def _cache_track(self, db: Session, platform_account_id: int, query: str, track: dict) -> dict:
+        """Caches the top search result for `query` in SearchCache; returns its track_info."""
+        logger.info("Spotify API Search Resolved: '%s' -> '%s' (URI: %s)", query, track.get('name'), track['uri'])
+
+        meta = self._search_cache_meta(track)
+        norm_query = normalize_query(query)
+        db.add(
+            SearchCache(
+                platform_account_id=platform_account_id,
+                normalized_query=norm_query,
+                track_uri=track["uri"],
+                meta_data=meta,
+            )
+        )
+        db.commit()
+        logger.info("Cached search result '%s' → '%s' in SearchCache.", norm_query, track.get("name"),)
+        return {
+            "title": track.get("name"),
+            "subtitle": meta["artist"],
+            "image": meta["image"],
+            "type": "song"
+        }
+
+    def _resolve_track(
+        self,
+        db: Session,
+        platform_account_id: int,
+        query: str,
+        limit: int = 1,
+        song_name: str | None = None,
+        artist_name: str | None = None,
+        use_cache: bool = True,
+    ):
+        """
+        Internal helper: Resolves tracks and returns (uris, track_info_dict).
+        """
+        cached = self._cached_track(db, platform_account_id, query, song_name, artist_name, use_cache)
+        if cached:
+            return [cached[0]], cached[1]
 
         # Spotify API search + cache top result
         logger.warning("No SearchCache match for '%s'. Querying Spotify API.", query)
+        record_search_api_fallback("spotify")
         results = self.sp.search(q=query, type="track", limit=limit)
         tracks = results.get("tracks", {}).get("items", [])
         uris = [track["uri"] for track in tracks]
-
-        if tracks:
-            track = tracks[0]
-            logger.info("Spotify API Search Resolved: '%s' -> '%s' (URI: %s)", query, track.get('name'), track['uri'])
-            
-            image_url = None
-            if track.get("album") and track["album"].get("images"):
-                image_url = track["album"]["images"][0]["url"]
-
-            track_info = {
-                "title": track.get("name"),
-                "subtitle": track["artists"][0].get("name", "") if track.get("artists") else "",
-                "image": image_url,
-                "type": "song"
-            }
-
-            db.add(
-                SearchCache(
-                    platform_account_id=platform_account_id,
-                    normalized_query=norm_query,
-                    track_uri=track["uri"],
-                    meta_data={
-                        "track_name": track.get("name", ""),
-                        "artist": track["artists"][0].get("name", "") if track.get("artists") else "",
-                        "album_name": track["album"].get("name", "") if track.get("album") else "",
-                        "duration_ms": track.get("duration_ms", 0),
-                        "image": image_url 
-                    },
-                )
-            )
-            db.commit()
-            logger.info("Cached search result '%s' → '%s' in SearchCache.", norm_query, track.get("name"),)
-        
+        track_info = self._cache_track(db, platform_account_id, query, tracks[0]) if tracks else None
         return uris, track_info
 
     def search_track_uris(
@@ -664,12 +1181,8 @@ class SpotifyAdapter(MusicPlatformAdapter):
                 
         return all_playlists
     
-    def play_playlist_by_name(self, db: Session, platform_account_id: int, playlist_name: str, resolve_only: bool = False):
-        """
-        Plays a playlist by name using fuzzy match in DB first,
-        then falling back to Spotify API. Uses context_uri with playlist ID
-        for correct playback via Spotify API.
-        """
+    def _local_playlist(self, db: Session, platform_account_id: int, playlist_name: str) -> tuple[str, str, str | None] | None:
+        """(playlist_id, name, image) of the synced playlist best matching `playlist_name`, if any."""
         norm_playlist_name = normalize_query(playlist_name)
 
         playlists = db.query(UserPlaylist).filter(
@@ -696,71 +1209,92 @@ class SpotifyAdapter(MusicPlatformAdapter):
 
         wrapped_playlists = [PlaylistNormView(pl) for pl in playlists]
         match, score = fuzzy_db_match(norm_playlist_name, wrapped_playlists, attr="normalized_name", threshold=80)
+        if not match:
+            return None
 
-        playlist_id = None
-        playlist_display_name = playlist_name
         playlist_image = None
-        
-        if match:
-            playlist_id = match.playlist_id
-            playlist_display_name = match.name
-            if match.meta_data and isinstance(match.meta_data, dict):
-                playlist_image = match.meta_data.get("image")
-            
-            logger.info(f"Found playlist via fuzzy match in DB: '{playlist_display_name}' (score: {score})")
-        else:
-            logger.warning(f"No DB match for '{playlist_name}'. Falling back to Spotify API search...")
-            results = self.sp.search(q=playlist_name, type="playlist", limit=1)
-            playlists_api = results.get("playlists", {}).get("items", [])
-            if not playlists_api:
-                raise Exception(f"Playlist '{playlist_name}' not found in DB or Spotify API.")
-            playlist_data = playlists_api[0]
-            playlist_id = playlist_data["id"]
-            playlist_display_name = playlist_data.get("name", "")
-            owner_id = playlist_data.get("owner", {}).get("id")
-            
-            if playlist_data.get("images"):
-                playlist_image = playlist_data["images"][0]["url"]
-
-            current_user = self.sp.current_user()
-            current_user_id = current_user.get("id")
-
-            if owner_id == current_user_id:
-                normalized_name = normalize_query(playlist_display_name)
-
-                # Cache new playlist in DB
-                db.add(UserPlaylist(
-                    platform_account_id=platform_account_id,
-                    playlist_id=playlist_id,
-                    name=playlist_display_name,
-                    meta_data={
-                        "normalized_name": normalized_name,
-                        "description": playlist_data.get("description", ""),
-                        "owner": playlist_data.get("owner", {}).get("display_name", ""),
-                        "track_count": playlist_data.get("tracks", {}).get("total", 0),
-                        "image": playlist_image
-                    }
-                ))
-                db.commit()
-                logger.info(f"Cached new playlist '{playlist_display_name}' from Spotify API into DB.")
+        if match.meta_data and isinstance(match.meta_data, dict):
+            playlist_image = match.meta_data.get("image")
+        logger.info(f"Found playlist via fuzzy match in DB: '{match.name}' (score: {score})")
+        return match.playlist_id, match.name, playlist_image
+
+    def _searched_playlist(
+        self, db: Session, platform_account_id: int, playlist_name: str, results: dict,
+        fetch_profile: Callable[[], dict] | None = None,
+    ) -> tuple[str, str, str | None]:
+        """
+        (playlist_id, name, image) of the top playlist search result; the user's own
+        playlists are cached in UserPlaylist.
+        """
+        playlists_api = results.get("playlists", {}).get("items", [])
+        if not playlists_api:
+            raise Exception(f"Playlist '{playlist_name}' not found in DB or Spotify API.")
+        playlist_data = playlists_api[0]
+        playlist_id = playlist_data["id"]
+        playlist_display_name = playlist_data.get("name", "")
+        owner_id = playlist_data.get("owner", {}).get("id")
 
-        if not resolve_only:
-            # Use context_uri to play playlist by ID to avoid unsupported URI kind error
-            device_id = self._get_active_device_id()
-            context_uri = f"spotify:playlist:{playlist_id}"
-            logger.info(f"Playing playlist '{playlist_display_name}' using context URI: {context_uri} on device {device_id}")
-            self.sp.start_playback(device_id=device_id, context_uri=context_uri)
-        
+        playlist_image = None
+        if playlist_data.get("images"):
+            playlist_image = playlist_data["images"][0]["url"]
+
+        profile = get_spotify_profile(db, platform_account_id, fetch=fetch_profile) or {}
+        current_user_id = profile.get("id")
+
+        if owner_id == current_user_id:
+            normalized_name = normalize_query(playlist_display_name)
+
+            # Cache new playlist in DB
+            db.add(UserPlaylist(
+                platform_account_id=platform_account_id,
+                playlist_id=playlist_id,
+                name=playlist_display_name,
+                meta_data={
+                    "normalized_name": normalized_name,
+                    "description": playlist_data.get("description", ""),
+                    "owner": playlist_data.get("owner", {}).get("display_name", ""),
+                    "track_count": playlist_data.get("tracks", {}).get("total", 0),
+                    "image": playlist_image
+                }
+            ))
+            db.commit()
+            logger.info(f"Cached new playlist '{playlist_display_name}' from Spotify API into DB.")
+        return playlist_id, playlist_display_name, playlist_image
+
+    @staticmethod
+    def _playlist_result(name: str, image: str | None) -> dict:
         return {
             "status": "success",
             "track_info": {
-                "title": playlist_display_name,
+                "title": name,
                 "subtitle": "Spotify Playlist",
                 "type": "playlist",
-                "image": playlist_image
+                "image": image
             }
         }
 
+    def play_playlist_by_name(self, db: Session, platform_account_id: int, playlist_name: str, resolve_only: bool = False):
+        """
+        Plays a playlist by name using fuzzy match in DB first,
+        then falling back to Spotify API. Uses context_uri with playlist ID
+        for correct playback via Spotify API.
+        """
+        playlist = self._local_playlist(db, platform_account_id, playlist_name)
+        if playlist is None:
+            logger.warning(f"No DB match for '{playlist_name}'. Falling back to Spotify API search...")
+            results = self.sp.search(q=playlist_name, type="playlist", limit=1)
+            playlist = self._searched_playlist(db, platform_account_id, playlist_name, results, fetch_profile=self.sp.current_user)
+        playlist_id, playlist_display_name, playlist_image = playlist
+
+        if not resolve_only:
+            # Use context_uri to play playlist by ID to avoid unsupported URI kind error
+            context_uri = f"spotify:playlist:{playlist_id}"
+            logger.info(f"Playing playlist '{playlist_display_name}' using context URI: {context_uri}")
+            self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id, context_uri=context_uri))
+            self._playback_changed()
+        
+        return self._playlist_result(playlist_display_name, playlist_image)
+
     
     
     def resolve_playlist_id(self, db: Session, platform_account_id: int, playlist_name: str) -> str:
@@ -780,4 +1314,14 @@ class SpotifyAdapter(MusicPlatformAdapter):
             playlist_data = items[0]
             return playlist_data["id"]
 
-        raise ValueError(f"Playlist '{playlist_name}' not found")
\ No newline at end of file
+        raise ValueError(f"Playlist '{playlist_name}' not found")
+
+
+# Shared by every request handled by this process (web worker or Celery worker)
+volume_coalescer = VolumeCoalescer()
+
+spotify_client_pool = ClientPool(
+    SpotifyAdapter,
+    max_size=int(os.getenv("SPOTIFY_CLIENT_POOL_SIZE", 64)),
+    name="spotify"
+)
@@ -0,0 +1,417 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+import weakref
+import httpx
+from typing import Awaitable, Callable, TypeVar
+from spotipy.exceptions import SpotifyException
+from sqlalchemy.orm import Session
+from backend.adapters.adapter_base import MusicPlatformAdapter
+from backend.adapters.spotify_adapter import (
+    SpotifyAdapter, NoActiveDeviceException, SPOTIFY_API_BASE, RATE_LIMIT_RETRIES,
+    TRACK_CHANGE_TIMEOUT_SECONDS, TRACK_CHANGE_FIRST_INTERVAL, TRACK_CHANGE_MAX_INTERVAL,
+)
+from backend.services.rate_limiter import spotify_rate_limiter, current_lane, RateLimited
+from backend.services.playback_snapshot import snapshot_from_playback, get_snapshot, store_snapshot
+from backend.utils.metrics import record_search_api_fallback
+from backend.utils.tracing import span, in_trace_context
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Connections one event loop keeps to the Web API (shared by every account served by the worker)
+SPOTIFY_ASYNC_MAX_CONNECTIONS = int(os.getenv("SPOTIFY_ASYNC_MAX_CONNECTIONS", 100))
+# Same budget as the spotipy client (requests_timeout=15), with a shorter connect phase
+SPOTIFY_ASYNC_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+# 5xx responses and failed connects are retried like build_spotify_session() does (urllib3 backoff: 0s, 2s, 4s)
+SERVER_ERROR_RETRIES = 3
+
+# httpx.AsyncClient is bound to the loop it first ran on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The pooled Web API client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=SPOTIFY_API_BASE,
+            timeout=SPOTIFY_ASYNC_TIMEOUT,
+            limits=httpx.Limits(max_connections=SPOTIFY_ASYNC_MAX_CONNECTIONS, max_keepalive_connections=SPOTIFY_ASYNC_MAX_CONNECTIONS),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Closes the running loop's client (app shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _without_none(**params) -> dict:
+    return {key: value for key, value in params.items() if value is not None}
+
+
+class AsyncSpotifyClient:
+    """
+    The Web API calls the async adapter makes, named and shaped like their spotipy
+    counterparts. Errors are raised as SpotifyException, so callers handle them the same way.
+    """
+
+    def __init__(self, access_token: str):
+        self.access_token = access_token
+
+    async def _call(self, method: str, path: str, params: dict | None = None, payload: dict | None = None):
+        client = get_async_client()
+        lane = current_lane()
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        rate_limited = server_errors = 0
+        while True:
+            try:
+                await spotify_rate_limiter.acquire_async(lane)
+            except RateLimited as e:
+                raise SpotifyException(
+                    429, -1, f"{path}:\n {e.message}", reason="RATE_LIMITED",
+                    headers={"Retry-After": str(max(1, round(e.retry_after)))},
+                )
+            try:
+                response = await client.request(method, path, params=params, json=payload, headers=headers)
+            except httpx.ConnectError:
+                if server_errors >= SERVER_ERROR_RETRIES:
+                    raise
+                server_errors += 1
+                await asyncio.sleep(0 if server_errors == 1 else 2 ** (server_errors - 1))
+                continue
+
+            if response.status_code == 429 and rate_limited < RATE_LIMIT_RETRIES:
+                try:
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                except ValueError:
+                    retry_after = 1.0
+                logger.warning(f"Spotify returned 429 ({lane}), pausing all workers for {retry_after:g}s")
+                await asyncio.get_running_loop().run_in_executor(None, in_trace_context(spotify_rate_limiter.block), retry_after)
+                rate_limited += 1
+                continue
+            if response.status_code >= 500 and server_errors < SERVER_ERROR_RETRIES:
+                server_errors += 1
+                await asyncio.sleep(0 if server_errors == 1 else 2 ** (server_errors - 1))
+                continue
+            if response.status_code >= 400:
+                raise self._error(response)
+            return response.json() if response.content else None
+
+    @staticmethod
+    def _error(response: httpx.Response) -> SpotifyException:
+        """The SpotifyException spotipy would raise for this response."""
+        try:
+            error = response.json().get("error", {})
+            if isinstance(error, str):
+                error = {"message": error}
+        except (ValueError, AttributeError):
+            error = {}
+        message = error.get("message") or "error"
+        return SpotifyException(
+            response.status_code, -1, f"{response.url}:\n {message}",
+            reason=error.get("reason"), headers=dict(response.headers),
+        )
+
+    async def devices(self):
+        return await self._call("GET", "me/player/devices")
+
+    async def current_playback(self):
+        return await self._call("GET", "me/player")
+
+    async def current_user(self):
+        return await self._call("GET", "me")
+
+    async def start_playback(self, device_id=None, context_uri=None, uris=None):
+        payload = _without_none(context_uri=context_uri, uris=uris)
+        return await self._call("PUT", "me/player/play", params=_without_none(device_id=device_id), payload=payload or None)
+
+    async def pause_playback(self, device_id=None):
+        return await self._call("PUT", "me/player/pause", params=_without_none(device_id=device_id))
+
+    async def next_track(self, device_id=None):
+        return await self._call("POST", "me/player/next", params=_without_none(device_id=device_id))
+
+    async def previous_track(self, device_id=None):
+        return await self._call("POST", "me/player/previous", params=_without_none(device_id=device_id))
+
+    async def seek_track(self, position_ms, device_id=None):
+        return await self._call("PUT", "me/player/seek", params=_without_none(position_ms=position_ms, device_id=device_id))
+
+    async def search(self, q, limit=10, offset=0, type="track"):
+        return await self._call("GET", "search", params={"q": q, "limit": limit, "offset": offset, "type": type})
+
+
+class AsyncSpotifyAdapter(MusicPlatformAdapter):
+    """
+    Spotify adapter for the event loop: the playback, search and playlist calls of a turn
+    are awaited on one pooled httpx client instead of holding an executor thread each.
+
+    Covers the actions in MusicActionService.ASYNC_SPOTIFY_ACTIONS; everything else stays
+    on SpotifyAdapter. The Redis and DB helpers are shared with SpotifyAdapter; they are
+    blocking calls, so they run on the default executor (see _off_loop) and the loop only
+    ever waits on Spotify.
+    """
+
+    CAPABILITIES = SpotifyAdapter.CAPABILITIES
+
+    def __init__(self, access_token: str, platform_account_id: int | None = None):
+        if not access_token:
+            raise ValueError("AsyncSpotifyAdapter requires a valid user access_token.")
+        self.sp = AsyncSpotifyClient(access_token)
+        # Enables the per-account device cache and playback snapshot, as in SpotifyAdapter
+        self.platform_account_id = platform_account_id
+
+    get_auth_url = staticmethod(SpotifyAdapter.get_auth_url)
+    handle_auth_callback = staticmethod(SpotifyAdapter.handle_auth_callback)
+
+    # Redis / DB helpers shared with the threaded adapter (they never call self.sp); blocking,
+    # so only ever called through _off_loop
+    _device_cache_key = SpotifyAdapter._device_cache_key
+    _cached_device_id = SpotifyAdapter._cached_device_id
+    remember_device = SpotifyAdapter.remember_device
+    invalidate_device = SpotifyAdapter.invalidate_device
+    _playback_changed = SpotifyAdapter._playback_changed
+    _update_song_history = SpotifyAdapter._update_song_history
+    _track_change_result = SpotifyAdapter._track_change_result
+    _cached_track = SpotifyAdapter._cached_track
+    _cache_track = SpotifyAdapter._cache_track
+    _local_playlist = SpotifyAdapter._local_playlist
+    _searched_playlist = SpotifyAdapter._searched_playlist
+    _pick_device = staticmethod(SpotifyAdapter._pick_device)
+    _is_stale_device_error = staticmethod(SpotifyAdapter._is_stale_device_error)
+    _track_changed = staticmethod(SpotifyAdapter._track_changed)
+    _format_track = staticmethod(SpotifyAdapter._format_track)
+    _search_cache_meta = staticmethod(SpotifyAdapter._search_cache_meta)
+    _playlist_result = staticmethod(SpotifyAdapter._playlist_result)
+
+    @staticmethod
+    async def _off_loop(fn: Callable[..., T], *args) -> T:
+        """Runs a blocking Redis/DB helper on the default executor, so other turns keep running."""
+        return await asyncio.get_running_loop().run_in_executor(None, in_trace_context(fn), *args)
+
+    @staticmethod
+    def _released(db: Session, lookup: Callable[..., T], *args) -> T:
+        """
+        Runs a DB helper and ends its transaction, so the session gives its pooled connection
+        back before Spotify is awaited (with many actions in flight the pool would run dry).
+        """
+        try:
+            result = lookup(db, *args)
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return result
+
+    # === Device resolution ===
+    async def _get_active_device_id(self, use_cache: bool = True) -> str:
+        """Finds an active device; raises NoActiveDeviceException if none are available."""
+        if use_cache:
+            cached = await self._off_loop(self._cached_device_id)
+            if cached:
+                return cached
+
+        try:
+            devices_info = await self.sp.devices()
+        except SpotifyException as e:
+            logger.error(f"Could not retrieve devices from Spotify: {e}")
+            raise NoActiveDeviceException("Failed to get device list from Spotify. The token may be invalid or expired.")
+        device = self._pick_device(devices_info.get('devices', []) if devices_info else [])
+        if not device:
+            raise NoActiveDeviceException("No Spotify devices are connected to this account.")
+        if not device.get('is_active'):
+            logger.warning(f"No active device found. Falling back to first available: {device['name']} (ID: {device['id']})")
+        await self._off_loop(self.remember_device, device['id'])
+        return device['id']
+
+    async def _on_device(self, command: Callable[[str], Awaitable[T]]) -> T:
+        """SpotifyAdapter._on_device: a stale cached device is dropped and the command retried once."""
+        cached = await self._off_loop(self._cached_device_id)
+        device_id = cached or await self._get_active_device_id(use_cache=False)
+        try:
+            return await command(device_id)
+        except SpotifyException as e:
+            if not (cached and self._is_stale_device_error(e)):
+                raise
+            logger.info(f"Cached device {device_id} rejected by Spotify ({e.http_status}), looking it up again")
+            await self._off_loop(self.invalidate_device)
+            return await command(await self._get_active_device_id(use_cache=False))
+
+    async def get_active_device(self) -> dict | None:
+        """Full device lookup (used by the status check); also warms the device cache."""
+        try:
+            devices_info = await self.sp.devices()
+            device = self._pick_device(devices_info.get('devices', []) if devices_info else [])
+            if device:
+                await self._off_loop(self.remember_device, device.get('id'))
+            return device
+        except Exception as e:
+            logger.warning(f"Error checking active device: {e}")
+            return None
+
+    # === Playback Controls ===
+    async def play(self, uris: list[str]):
+        await self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id, uris=uris))
+        await self._off_loop(self._playback_changed)
+
+    async def pause(self):
+        await self._on_device(lambda device_id: self.sp.pause_playback(device_id=device_id))
+        await self._off_loop(functools.partial(self._playback_changed, is_playing=False))
+
+    async def resume(self):
+        await self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id))
+        await self._off_loop(functools.partial(self._playback_changed, is_playing=True))
+
+    async def skip_current_track(self):
+        before = await self._playback_position()
+        await self._on_device(lambda device_id: self.sp.next_track(device_id=device_id))
+        return await self._await_track_change(before)
+
+    async def previous_track(self):
+        before = await self._playback_position()
+        await self._on_device(lambda device_id: self.sp.previous_track(device_id=device_id))
+        return await self._await_track_change(before, allow_restart=True)
+
+    async def restart_current_track(self):
+        await self._on_device(lambda device_id: self.sp.seek_track(0, device_id=device_id))
+        await self._off_loop(self._playback_changed)
+
+    async def seek_position(self, seconds: int):
+        await self._on_device(lambda device_id: self.sp.seek_track(seconds * 1000, device_id=device_id))
+        await self._off_loop(self._playback_changed)
+
+    async def _playback_position(self) -> tuple[str | None, int | None]:
+        try:
+            playback = await self.sp.current_playback() or {}
+        except Exception as e:
+            logger.warning(f"Could not read playback before track change: {e}")
+            return None, None
+        return (playback.get("item") or {}).get("uri"), playback.get("progress_ms")
+
+    async def _await_track_change(self, before: tuple[str | None, int | None], allow_restart: bool = False) -> dict | None:
+        """SpotifyAdapter._await_track_change, polling with asyncio.sleep."""
+        start = time.monotonic()
+        deadline = start + TRACK_CHANGE_TIMEOUT_SECONDS
+        interval = TRACK_CHANGE_FIRST_INTERVAL
+        polls = 0
+        playback = None
+        confirmed = False
+
+        with span("track_change_wait"):
+            while True:
+                try:
+                    playback = await self.sp.current_playback()
+                except Exception as e:
+                    logger.warning(f"Playback poll failed while waiting for track change: {e}")
+                    playback = None
+                polls += 1
+
+                if self._track_changed(playback, before, allow_restart):
+                    confirmed = True
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(interval, remaining))
+                interval = min(interval * 2, TRACK_CHANGE_MAX_INTERVAL)
+
+        return await self._off_loop(self._track_change_result, playback, confirmed, round((time.monotonic() - start) * 1000, 1), polls)
+
+    # === Playback state ===
+    async def get_currently_playing_song(self):
+        try:
+            snapshot = await self._off_loop(get_snapshot, self.platform_account_id) if self.platform_account_id is not None else None
+            if not snapshot:
+                snapshot = snapshot_from_playback(await self.sp.current_playback())
+                if self.platform_account_id is not None:
+                    await self._off_loop(store_snapshot, self.platform_account_id, snapshot)
+            return self._format_track(snapshot["track"])
+        except Exception:
+            logger.error("Error fetching current playback", exc_info=True)
+            return None
+
+    # === Music Search & Playback by Metadata ===
+    async def _resolve_track(
+        self,
+        db: Session,
+        platform_account_id: int,
+        query: str,
+        limit: int = 1,
+        song_name: str | None = None,
+        artist_name: str | None = None,
+        use_cache: bool = True,
+    ):
+        cached = await self._off_loop(
+            self._released, db, self._cached_track, platform_account_id, query, song_name, artist_name, use_cache,
+        )
+        if cached:
+            return [cached[0]], cached[1]
+
+        logger.warning("No SearchCache match for '%s'. Querying Spotify API.", query)
+        record_search_api_fallback("spotify")
+        results = await self.sp.search(q=query, type="track", limit=limit)
+        tracks = (results or {}).get("tracks", {}).get("items", [])
+        track_info = await self._off_loop(self._released, db, self._cache_track, platform_account_id, query, tracks[0]) if tracks else None
+        return [track["uri"] for track in tracks], track_info
+
+    async def search_track_uris(
+        self,
+        db: Session,
+        platform_account_id: int,
+        query: str,
+        limit: int = 1,
+        song_name: str | None = None,
+        artist_name: str | None = None,
+        use_cache: bool = True,
+    ) -> list:
+        uris, _ = await self._resolve_track(db, platform_account_id, query, limit, song_name, artist_name, use_cache)
+        return uris
+
+    async def play_by_query(
+        self,
+        db: Session,
+        platform_account_id: int,
+        query: str,
+        limit: int = 5,
+        song_name: str | None = None,
+        artist_name: str | None = None,
+        use_cache: bool = True,
+        resolve_only: bool = False,
+    ):
+        uris, track_info = await self._resolve_track(
+            db, platform_account_id, query, limit=limit, song_name=song_name, artist_name=artist_name, use_cache=use_cache,
+        )
+        if not uris:
+            logger.warning("No URIs found for query: %s", query)
+            return {"status": "error", "message": "No tracks found"}
+        if not resolve_only:
+            await self.play(uris=uris)
+            await self._off_loop(self._update_song_history, platform_account_id, uris[0])
+        return {"status": "success", "track_info": track_info}
+
+    # === Playlists ===
+    async def play_playlist_by_name(self, db: Session, platform_account_id: int, playlist_name: str, resolve_only: bool = False):
+        playlist = await self._off_loop(self._released, db, self._local_playlist, platform_account_id, playlist_name)
+        if playlist is None:
+            logger.warning(f"No DB match for '{playlist_name}'. Falling back to Spotify API search...")
+            results = await self.sp.search(q=playlist_name, type="playlist", limit=1)
+            # The profile comes from the profile cache; it is stored at login, so no fetch is needed here
+            playlist = await self._off_loop(self._released, db, self._searched_playlist, platform_account_id, playlist_name, results or {})
+        playlist_id, playlist_display_name, playlist_image = playlist
+
+        if not resolve_only:
+            context_uri = f"spotify:playlist:{playlist_id}"
+            logger.info(f"Playing playlist '{playlist_display_name}' using context URI: {context_uri}")
+            await self._on_device(lambda device_id: self.sp.start_playback(device_id=device_id, context_uri=context_uri))
+            await self._off_loop(self._playback_changed)
+        return self._playlist_result(playlist_display_name, playlist_image)
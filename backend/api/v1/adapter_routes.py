@@ -8,6 +8,8 @@ from spotipy.exceptions import SpotifyException
 from backend.adapters.soundcloud_adapter import SoundCloudAdapter
 from backend.models.database_models import PlatformAccount, SystemUser
 from backend.services.data_sync_service import sync_spotify_library, sync_soundcloud_library
+from backend.services.profile_cache import store_profile, invalidate_profile
+from backend.services.token_cache import invalidate_access_token
 from backend.configurations.database import get_db
 from backend.utils.feature_flags import is_soundcloud_enabled
 from sqlalchemy.orm import Session
@@ -44,7 +46,7 @@ def get_platform_status(
              if not token:
                  return {"is_connected": False, "reason": "Token refresh failed"}
              
-             adapter = SpotifyAdapter(token)
+             adapter = SpotifyAdapter.for_account(token, account.id)
              device = adapter.get_active_device()
              
              # Return True if ANY device is found. 
@@ -76,6 +78,7 @@ def get_platform_status(
                  # Token is invalid, clear it
                  account.refresh_token = None
                  db.commit()
+                 invalidate_access_token("soundcloud", account.id)
                  return {"is_connected": False, "reason": "Token expired/revoked"}
                  
         except Exception as e:
@@ -168,9 +171,16 @@ def spotify_callback(request: Request, code: str = Query(...), db: Session = Dep
             )
             db.add(account)
 
+        # Cache the profile so actions never need a current_user() call
+        store_profile(account, {"id": platform_user_id, "display_name": display_name, "email": email})
+
         db.commit()
         db.refresh(account)
 
+        # New tokens and profile from the login replace whatever this process had cached
+        invalidate_access_token("spotify", account.id)
+        invalidate_profile(account.id)
+
         # SECURE SESSION STORAGE
         request.session["spotify_account_id"] = account.id
         request.session["user_id"] = system_user.id
@@ -294,6 +304,9 @@ def soundcloud_callback(
         db.commit()
         db.refresh(account)
 
+        # New tokens from the login replace whatever this process had cached
+        invalidate_access_token("soundcloud", account.id)
+
         # SECURE SESSION STORAGE
         request.session["soundcloud_account_id"] = account.id
         request.session["user_id"] = system_user.id
@@ -6,15 +6,18 @@ import io
 import logging
 import asyncio
 import requests
+import httpx
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query, Depends, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from backend.configurations.database import get_db
-from backend.services.speech_to_text import SpeechToTextService
+from backend.services.speech_to_text import SpeechToTextService, STT_MAX_UPLOAD_BYTES
+from backend.services.audio_preprocessing import transcribe_upload
 from backend.services.text_to_speech import TextToSpeechService
 from backend.services.dialog_manager import DialogManager
-from backend.utils.custom_exceptions import DeviceNotFoundException, ExternalAPIError, AuthenticationError
+from backend.utils.custom_exceptions import DeviceNotFoundException, ExternalAPIError, AuthenticationError, AudioTooLargeError
+from backend.utils.tracing import trace_turn, span, latency_snapshot
 
 router = APIRouter(prefix="/chat", tags=["Chat NLP"])
 logger = logging.getLogger(__name__)
@@ -47,7 +50,8 @@ async def execute_action(
     dm = DialogManager(db, session_id, payload.platform, platform_account_id=payload.platform_account_id)
     
     try:
-        result = await dm.execute_action(payload.action, payload.parameters)
+        with trace_turn("execute", session=session_id, platform=payload.platform, action=payload.action):
+            result = await dm.execute_action(payload.action, payload.parameters)
         return {"status": "success", "result": result}
     except (DeviceNotFoundException, ExternalAPIError, AuthenticationError):
         # Let these bubble up to the global handler in main.py
@@ -66,6 +70,7 @@ async def process_chat_text(
     request: Request,
     text_input: TextInput,
     platform: str = Query(..., description="Platform name (spotify, soundcloud, etc.)"),
+    include_timings: bool = Query(False, description="Add per-stage latencies (ms) to the response"),
     db: Session = Depends(get_db)
 ):
     
@@ -91,15 +96,19 @@ async def process_chat_text(
 
     try:
         session_id = resolve_session_id(text_input.session_id) 
-        dialog_manager = DialogManager(db, session_id, platform, platform_account_id=text_input.platform_account_id)
-        
-        result = await dialog_manager.process_request(text_input.text)
-
-        response = {
-            "session_id": session_id,
-            **result
-        }
-        return JSONResponse(content=response)
+        with trace_turn("process_text", session=session_id, platform=platform) as trace:
+            dialog_manager = DialogManager(db, session_id, platform, platform_account_id=text_input.platform_account_id)
+            
+            result = await dialog_manager.process_request(text_input.text)
+
+            response = {
+                "session_id": session_id,
+                **result
+            }
+            if include_timings:
+                response["timings"] = trace.timings()
+            with span("serialize"):
+                return JSONResponse(content=response)
 
     except ValueError as e:
         logger.error("DialogManager error: %s", e)
@@ -111,19 +120,7 @@ async def process_chat_text(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/process_voice")
-async def process_chat_voice(
-    request: Request,
-    audio: UploadFile = File(...),
-    session_id: str | None = Query(None, description="Session ID for multi-turn conversation"),
-    platform: str = Query(..., description="Platform name (spotify, soundcloud, etc.)"),
-    platform_account_id: int | None = Query(None, description="PlatformAccount ID"),
-    db: Session = Depends(get_db)
-):
-    
-    platform = platform.strip().lower()
-    session_id = resolve_session_id(session_id)
-
+def _resolve_voice_account(request: Request, platform: str, platform_account_id: int | None) -> int:
     # SECURE SESSION CHECK
     secure_account_id = request.session.get(f"{platform}_account_id")
     if secure_account_id:
@@ -135,7 +132,12 @@ async def process_chat_voice(
             status_code=400,
             detail="platform_account_id is required (please login first)"
         )
+    return platform_account_id
+
 
+async def _run_voice_turn(transcription, session_id: str, platform: str, platform_account_id: int, db: Session,
+                          route: str = "process_voice", include_timings: bool = False):
+    """Awaits the `transcription` coroutine and runs the transcript through the DialogManager."""
     logger.info(
         "Incoming voice chat request | platform=%s | platform_account_id=%s",
         platform,
@@ -143,30 +145,95 @@ async def process_chat_voice(
     )
 
     try:
-        loop = asyncio.get_running_loop()
-        transcribed_text = await loop.run_in_executor(None, SpeechToTextService.transcribe_audio, audio.file)
-        
-        logger.info(f"\n\n🎤 STT OUTPUT: {transcribed_text}\n") 
-        
-        dialog_manager = DialogManager(db, session_id, platform, platform_account_id=platform_account_id)
-        result = await dialog_manager.process_request(transcribed_text)
-
-        response = {
-            "session_id": session_id,
-            "input_text": transcribed_text, 
-            **result
-        }
-
-        return JSONResponse(content=response)
-
-    except requests.exceptions.RequestException as e:
+        with trace_turn(route, session=session_id, platform=platform) as trace:
+            with span("stt"):
+                transcribed_text = await transcription
+            
+            logger.info(f"\n\n🎤 STT OUTPUT: {transcribed_text}\n") 
+            
+            dialog_manager = DialogManager(db, session_id, platform, platform_account_id=platform_account_id)
+            result = await dialog_manager.process_request(transcribed_text)
+
+            response = {
+                "session_id": session_id,
+                "input_text": transcribed_text, 
+                **result
+            }
+            if include_timings:
+                response["timings"] = trace.timings()
+
+            with span("serialize"):
+                return JSONResponse(content=response)
+
+    except (requests.exceptions.RequestException, httpx.TransportError) as e:
         logger.error(f"Voice service connection failed: {e}")
         raise HTTPException(
             status_code=504, 
             detail="Voice service connection timed out. Please check your internet connection and try again."
         )
-    except (DeviceNotFoundException, ExternalAPIError, AuthenticationError):
+    except (DeviceNotFoundException, ExternalAPIError, AuthenticationError, AudioTooLargeError):
         raise
     except Exception as e:
         logger.error(f"Voice processing invalid error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/process_voice")
+async def process_chat_voice(
+    request: Request,
+    audio: UploadFile = File(...),
+    session_id: str | None = Query(None, description="Session ID for multi-turn conversation"),
+    platform: str = Query(..., description="Platform name (spotify, soundcloud, etc.)"),
+    platform_account_id: int | None = Query(None, description="PlatformAccount ID"),
+    include_timings: bool = Query(False, description="Add per-stage latencies (ms) to the response"),
+    db: Session = Depends(get_db)
+):
+    
+    platform = platform.strip().lower()
+    session_id = resolve_session_id(session_id)
+    platform_account_id = _resolve_voice_account(request, platform, platform_account_id)
+
+    transcription = transcribe_upload(
+        audio.file,
+        SpeechToTextService.transcribe_audio,
+        filename=audio.filename or "audio.wav",
+        content_type=audio.content_type or "audio/wav"
+    )
+    return await _run_voice_turn(transcription, session_id, platform, platform_account_id, db,
+                                 route="process_voice", include_timings=include_timings)
+
+
+@router.post("/process_voice/stream")
+async def process_chat_voice_stream(
+    request: Request,
+    session_id: str | None = Query(None, description="Session ID for multi-turn conversation"),
+    platform: str = Query(..., description="Platform name (spotify, soundcloud, etc.)"),
+    platform_account_id: int | None = Query(None, description="PlatformAccount ID"),
+    include_timings: bool = Query(False, description="Add per-stage latencies (ms) to the response"),
+    db: Session = Depends(get_db)
+):
+    """
+    Same as /process_voice, but the request body is the raw audio (Content-Type: audio/*).
+    The body is piped chunk by chunk into the STT request, so memory stays bounded
+    regardless of recording length.
+    """
+    platform = platform.strip().lower()
+    session_id = resolve_session_id(session_id)
+    platform_account_id = _resolve_voice_account(request, platform, platform_account_id)
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > STT_MAX_UPLOAD_BYTES:
+        raise AudioTooLargeError("Audio exceeds the transcription size limit.")
+
+    transcription = SpeechToTextService.transcribe_stream(
+        request.stream(),
+        content_type=request.headers.get("content-type", "audio/wav")
+    )
+    return await _run_voice_turn(transcription, session_id, platform, platform_account_id, db,
+                                 route="process_voice_stream", include_timings=include_timings)
+
+
+@router.get("/timings")
+async def turn_timings(reset: bool = Query(False, description="Clear the samples after reading them")):
+    """p50/p95/p99 per pipeline stage over the recent turns handled by this process."""
+    return latency_snapshot(reset=reset)
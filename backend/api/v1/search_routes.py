@@ -5,6 +5,7 @@ from backend.adapters.spotify_adapter import SpotifyAdapter
 from backend.models.database_models import PlatformAccount, SearchCache
 from backend.services.data_sync_service import get_valid_spotify_access_token
 from backend.utils.normalize_text import normalize_query
+from backend.utils.metrics import record_search_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,6 +36,7 @@ def search_tracks(
         )
         .first()
     )
+    record_search_cache("spotify", "exact", hit=bool(cached))
     if cached:
         logger.info("SearchCache hit for query='%s'", norm_q)
         return {"status": "ok", "results": [{"track_uri": cached.track_uri}], "meta": cached.meta_data}
@@ -47,7 +49,7 @@ def search_tracks(
         raise HTTPException(status_code=400, detail="No refresh token available for this account")
 
     access_token = get_valid_spotify_access_token(db, account)
-    adapter = SpotifyAdapter(access_token=access_token)
+    adapter = SpotifyAdapter.for_account(access_token, platform_account_id)
     uris = adapter.search_track_uris(db, platform_account_id, query, limit=5)
 
     # 3) Save top result to cache
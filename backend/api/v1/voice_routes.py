@@ -1,26 +1,52 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from backend.services.speech_to_text import SpeechToTextService
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from backend.services.speech_to_text import SpeechToTextService, STT_MAX_UPLOAD_BYTES
 from backend.services.text_to_speech import TextToSpeechService
-import os
-import shutil
-import uuid
+from backend.services.audio_preprocessing import transcribe_upload
+from backend.utils.custom_exceptions import AudioTooLargeError
+import asyncio
+import io
 
 router = APIRouter(prefix="/voice", tags=["Voice I/O"])
 
 stt_service = SpeechToTextService()
 tts_service = TextToSpeechService()
 
+
 @router.post("/stt")
 async def speech_to_text(audio: UploadFile = File(...)):
     try:
-        temp_filename = f"temp_audio_{uuid.uuid4().hex}_{audio.filename}"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(audio.file, buffer)
+        # UploadFile is already a spooled buffer (memory up to 1 MB, disk above), so it is
+        # handed over as-is: small/WAV uploads are preprocessed, large ones streamed upstream.
+        text = await transcribe_upload(audio.file, stt_service.transcribe_audio,
+                                       filename=audio.filename or "audio.wav",
+                                       content_type=audio.content_type or "audio/wav")
+        return {"transcription": text}
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"STT error: {str(e)}")
 
-        text = stt_service.transcribe_audio(temp_filename)
-        os.remove(temp_filename)
 
+@router.post("/stt/stream")
+async def speech_to_text_stream(request: Request):
+    """
+    Raw-body STT: the request body (audio bytes, e.g. Content-Type: audio/webm) is piped
+    chunk by chunk into the outbound transcription request without being buffered.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > STT_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Audio exceeds the transcription size limit.")
+
+    try:
+        text = await stt_service.transcribe_stream(
+            request.stream(),
+            filename=request.query_params.get("filename", "audio.wav"),
+            content_type=request.headers.get("content-type", "audio/wav")
+        )
         return {"transcription": text}
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"STT error: {str(e)}")
 
@@ -28,13 +54,12 @@ async def speech_to_text(audio: UploadFile = File(...)):
 @router.post("/tts")
 async def text_to_speech(text: str):
     try:
-        output_audio_path = tts_service.synthesize_speech(text)
+        loop = asyncio.get_running_loop()
+        output_audio_path = await loop.run_in_executor(None, tts_service.synthesize_speech, text)
         return {"audio_path": output_audio_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
-from fastapi.responses import StreamingResponse
-import io
 
 @router.post("/tts/stream")
 async def text_to_speech_stream(text: str):
@@ -42,9 +67,10 @@ async def text_to_speech_stream(text: str):
     Synthesizes speech and streams the audio bytes directly (no file write).
     """
     try:
-        audio_bytes = tts_service.synthesize_speech(text)
+        loop = asyncio.get_running_loop()
+        audio_bytes = await loop.run_in_executor(None, tts_service.synthesize_speech, text)
         return StreamingResponse(
-            io.BytesIO(audio_bytes), 
+            io.BytesIO(audio_bytes),
             media_type="audio/wav"
         )
     except Exception as e:
@@ -0,0 +1,117 @@
+"""
+Streaming voice channel on the Socket.IO server.
+
+Client protocol:
+  voice_start  {session_id, platform, platform_account_id?, sample_rate? (8000-48000 Hz), encoding?}
+  voice_frame  <binary 16-bit little-endian mono PCM, any frame size>
+  voice_stop   {}  (optional: flush whatever was said without waiting for the endpoint)
+
+Server events:
+  voice_ready     {session_id}
+  voice_endpoint  {session_id, speech_seconds}  (speech ended, transcription started)
+  voice_result    {session_id, input_text, reply, ..., latency}
+  state_update    {state, message, session_id}  (the connection joins the session's room on voice_start)
+  voice_error     {detail, code}
+"""
+import uuid
+import asyncio
+import logging
+from backend.socket_manager import sio, join_session
+from backend.services.voice_stream_service import VoiceStream, process_utterance
+from backend.utils.custom_exceptions import AuthenticationError, DeviceNotFoundException, ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+active_streams: dict[str, VoiceStream] = {}
+# Turns still being processed; the loop only keeps weak references to tasks
+turn_tasks: set[asyncio.Task] = set()
+
+
+def discard_voice_stream(sid: str):
+    active_streams.pop(sid, None)
+
+
+def _secure_account_id(sid: str, platform: str):
+    """Reads the platform account from the signed HTTP session cookie, like the REST routes."""
+    environ = sio.get_environ(sid) or {}
+    session = environ.get("asgi.scope", {}).get("session") or {}
+    return session.get(f"{platform}_account_id")
+
+
+async def _emit_error(sid: str, detail: str, code: str):
+    await sio.emit("voice_error", {"detail": detail, "code": code}, room=sid)
+
+
+async def _run_turn(sid: str, stream: VoiceStream, wav_bytes: bytes, info: dict):
+    # Turns from the same connection are processed in the order they were spoken
+    async with stream.turn_lock:
+        try:
+            response = await process_utterance(stream, wav_bytes, info)
+            await sio.emit("voice_result", response, room=sid)
+        except AuthenticationError as e:
+            await _emit_error(sid, e.message, "AUTHENTICATION_ERROR")
+        except DeviceNotFoundException as e:
+            await _emit_error(sid, e.message, "DEVICE_NOT_FOUND")
+        except ExternalAPIError as e:
+            await _emit_error(sid, e.message, "EXTERNAL_API_ERROR")
+        except Exception as e:
+            logger.error(f"Streaming voice turn failed: {e}", exc_info=True)
+            await _emit_error(sid, str(e), "VOICE_STREAM_ERROR")
+
+
+async def _finish_utterance(sid: str, stream: VoiceStream):
+    wav_bytes, info = stream.take_utterance()
+    await sio.emit("voice_endpoint", {"session_id": stream.session_id, "speech_seconds": info["speech_seconds"]}, room=sid)
+    task = asyncio.create_task(_run_turn(sid, stream, wav_bytes, info), name=f"voice-turn-{sid}")
+    turn_tasks.add(task)
+    task.add_done_callback(turn_tasks.discard)
+
+
+@sio.on("voice_start")
+async def voice_start(sid, data):
+    data = data or {}
+    platform = str(data.get("platform", "spotify")).strip().lower()
+    platform_account_id = _secure_account_id(sid, platform) or data.get("platform_account_id")
+
+    if not platform_account_id:
+        await _emit_error(sid, "platform_account_id is required (please login first)", "AUTHENTICATION_ERROR")
+        return
+
+    try:
+        stream = VoiceStream(
+            session_id=data.get("session_id") or str(uuid.uuid4()),
+            platform=platform,
+            platform_account_id=int(platform_account_id),
+            sample_rate=data.get("sample_rate", 16000),
+            encoding=data.get("encoding", "pcm_s16le"),
+        )
+    except ValueError as e:
+        await _emit_error(sid, str(e), "UNSUPPORTED_AUDIO")
+        return
+
+    active_streams[sid] = stream
+    # State updates of the dialog (THINKING, SPEAKING) are emitted to the session room
+    await join_session(sid, stream.session_id)
+    logger.info(f"Voice stream started: sid={sid} session={stream.session_id} rate={stream.sample_rate}")
+    await sio.emit("voice_ready", {"session_id": stream.session_id}, room=sid)
+
+
+@sio.on("voice_frame")
+async def voice_frame(sid, data):
+    stream = active_streams.get(sid)
+    if stream is None:
+        await _emit_error(sid, "voice_start must be sent before audio frames", "VOICE_STREAM_NOT_STARTED")
+        return
+    if not isinstance(data, (bytes, bytearray)):
+        await _emit_error(sid, "voice_frame expects binary PCM data", "UNSUPPORTED_AUDIO")
+        return
+
+    if stream.feed(bytes(data)):
+        await _finish_utterance(sid, stream)
+
+
+@sio.on("voice_stop")
+async def voice_stop(sid, data=None):
+    stream = active_streams.pop(sid, None)
+    if stream is not None and stream.has_speech:
+        await _finish_utterance(sid, stream)
@@ -0,0 +1,381 @@
+"""
+Local stand-ins for the upstream APIs used in a turn: Groq (LLM, STT, TTS),
+the Spotify Web API and the SoundCloud API.
+
+Each service is a threaded HTTP/1.1 server (keep-alive, so client connection pools
+behave like they do against the real APIs). Every route has a `kind` (llm, stt, tts,
+spotify, soundcloud) used to configure latency and failure injection:
+
+    latency_ms={"llm": 350, "spotify": 80}, failure_rate={"spotify": 0.02}
+
+Only the endpoints the benchmarked turns touch are implemented.
+"""
+import re
+import json
+import time
+import random
+import struct
+import logging
+import threading
+from typing import Callable
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class FakeRequest:
+    def __init__(self, method: str, path: str, query: dict, headers, body: bytes, match: re.Match):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.match = match
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+    def arg(self, name: str, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class Route:
+    def __init__(self, method: str, pattern: str, kind: str, handler: Callable[[FakeRequest], tuple]):
+        self.method = method
+        self.regex = re.compile(f"^{pattern}$")
+        self.kind = kind
+        self.handler = handler
+        self.name = f"{method} {pattern}"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class FakeService:
+    """
+    Serves `routes` on 127.0.0.1:<random port>. Handlers return (status, body, content_type)
+    where body is a dict/list (sent as JSON), bytes, or None.
+    """
+
+    def __init__(self, name: str, routes: list[Route], latency_ms: dict | None = None, failure_rate: dict | None = None,
+                 jitter: float = 0.2, failure_status: int = 503, seed: int | None = None):
+        self.name = name
+        self.routes = routes
+        self.latency_ms = latency_ms or {}
+        self.failure_rate = failure_rate or {}
+        self.jitter = jitter
+        self.failure_status = failure_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.failures: dict[str, int] = {}
+        self._server = None
+
+    # --- lifecycle ---
+
+    def start(self) -> str:
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                service._dispatch(self)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, name=f"fake-{self.name}", daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self.calls.values()),
+                "failures_injected": sum(self.failures.values()),
+                "by_route": dict(sorted(self.calls.items())),
+            }
+
+    # --- request handling ---
+
+    def _sample_latency(self, kind: str) -> float:
+        base = self.latency_ms.get(kind, 0)
+        if not base:
+            return 0.0
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, base * factor) / 1000
+
+    def _should_fail(self, kind: str) -> bool:
+        rate = self.failure_rate.get(kind, 0)
+        if not rate:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    @staticmethod
+    def _read_body(handler: BaseHTTPRequestHandler) -> bytes:
+        if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(handler.rfile.readline().strip() or b"0", 16)
+                if size == 0:
+                    handler.rfile.readline()
+                    break
+                chunks.append(handler.rfile.read(size))
+                handler.rfile.readline()
+            return b"".join(chunks)
+        length = int(handler.headers.get("Content-Length") or 0)
+        return handler.rfile.read(length) if length else b""
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, body, content_type: str = "application/json"):
+        if body is None:
+            payload = b""
+        elif isinstance(body, (bytes, bytearray)):
+            payload = bytes(body)
+        else:
+            payload = json.dumps(body).encode()
+        handler.send_response(status)
+        if payload:
+            handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        if payload:
+            handler.wfile.write(payload)
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler):
+        parts = urlsplit(handler.path)
+        body = self._read_body(handler)
+
+        for route in self.routes:
+            if route.method != handler.command:
+                continue
+            match = route.regex.match(parts.path)
+            if not match:
+                continue
+
+            with self._lock:
+                self.calls[route.name] = self.calls.get(route.name, 0) + 1
+
+            delay = self._sample_latency(route.kind)
+            if delay:
+                time.sleep(delay)
+
+            if self._should_fail(route.kind):
+                with self._lock:
+                    self.failures[route.name] = self.failures.get(route.name, 0) + 1
+                self._send(handler, self.failure_status, {"error": {"status": self.failure_status, "message": "injected failure"}})
+                return
+
+            request = FakeRequest(handler.command, parts.path, parse_qs(parts.query), handler.headers, body, match)
+            try:
+                status, payload, content_type = route.handler(request)
+            except Exception as e:
+                logger.exception(f"Fake {self.name} handler failed for {route.name}")
+                self._send(handler, 500, {"error": {"status": 500, "message": str(e)}})
+                return
+            self._send(handler, status, payload, content_type)
+            return
+
+        with self._lock:
+            key = f"{handler.command} {parts.path} (unhandled)"
+            self.calls[key] = self.calls.get(key, 0) + 1
+        self._send(handler, 404, {"error": {"status": 404, "message": f"No fake route for {handler.command} {parts.path}"}})
+
+
+# --- Groq ---
+
+def silent_wav(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    """A mono 16-bit WAV of silence (the TTS stand-in's output)."""
+    data = b"\x00\x00" * int(seconds * sample_rate)
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVEfmt " + struct.pack(
+        "<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16
+    ) + b"data" + struct.pack("<I", len(data))
+    return header + data
+
+
+def groq_service(intents: dict[str, dict], transcripts: list[str], tts_seconds: float = 1.0, **options) -> FakeService:
+    """
+    `intents` maps a user utterance to the JSON the LLM should answer with; the prompt is
+    matched by its ending (the dialog manager appends the user's message last).
+    `transcripts` are returned by the STT endpoint in rotation.
+    """
+    rotation = {"next": 0}
+    lock = threading.Lock()
+    tts_audio = silent_wav(tts_seconds)
+
+    def chat_completion(request: FakeRequest):
+        prompt = request.json()["messages"][-1]["content"].rstrip()
+        result = {"intent": "chat", "actions": [], "reply": "Happy to help!"}
+        for utterance, intent in intents.items():
+            if prompt.endswith(utterance):
+                result = intent
+                break
+        return 200, {"choices": [{"message": {"role": "assistant", "content": json.dumps(result)}}]}, "application/json"
+
+    def transcription(request: FakeRequest):
+        with lock:
+            text = transcripts[rotation["next"] % len(transcripts)] if transcripts else ""
+            rotation["next"] += 1
+        return 200, {"text": text}, "application/json"
+
+    def speech(request: FakeRequest):
+        return 200, tts_audio, "audio/wav"
+
+    return FakeService("groq", [
+        Route("POST", "/openai/v1/chat/completions", "llm", chat_completion),
+        Route("POST", "/openai/v1/audio/transcriptions", "stt", transcription),
+        Route("POST", "/openai/v1/audio/speech", "tts", speech),
+    ], **options)
+
+
+# --- Spotify ---
+
+def _spotify_track(index: int) -> dict:
+    return {
+        "id": f"benchtrack{index:012d}",
+        "uri": f"spotify:track:benchtrack{index:012d}",
+        "name": f"Bench Track {index}",
+        "duration_ms": 200000,
+        "artists": [{"name": f"Bench Artist {index % 7}"}],
+        "album": {"name": f"Bench Album {index % 11}", "images": [{"url": f"https://img.invalid/{index}.jpg"}]},
+    }
+
+
+def spotify_service(liked_total: int = 500, **options) -> FakeService:
+    """A single listener with one active device; next/previous move through numbered tracks."""
+    state = {"track": 0, "volume": 50, "is_playing": True}
+    lock = threading.Lock()
+    device = {"id": "bench-device", "is_active": True, "name": "Bench Speaker", "type": "Computer"}
+
+    def devices(request):
+        with lock:
+            return 200, {"devices": [{**device, "volume_percent": state["volume"]}]}, "application/json"
+
+    def playback(request):
+        with lock:
+            return 200, {
+                "device": {**device, "volume_percent": state["volume"]},
+                "is_playing": state["is_playing"],
+                "progress_ms": 1000,
+                "item": _spotify_track(state["track"]),
+            }, "application/json"
+
+    def control(change: Callable[[FakeRequest], None]):
+        def handler(request):
+            with lock:
+                change(request)
+            return 204, None, ""
+        return handler
+
+    def set_playing(value):
+        return lambda request: state.update(is_playing=value)
+
+    def step(delta):
+        return lambda request: state.update(track=max(0, state["track"] + delta))
+
+    def volume(request):
+        state["volume"] = int(request.arg("volume_percent", state["volume"]))
+
+    def search(request):
+        limit = int(request.arg("limit", 10))
+        seed = sum(map(ord, request.arg("q", ""))) % 10000
+        items = [_spotify_track(seed + i) for i in range(limit)]
+        return 200, {"tracks": {"items": items, "total": len(items), "limit": limit, "offset": 0, "next": None}}, "application/json"
+
+    def me(request):
+        return 200, {"id": "bench-user", "display_name": "Bench User", "email": "bench@example.com"}, "application/json"
+
+    def liked_tracks(request):
+        limit = int(request.arg("limit", 20))
+        offset = int(request.arg("offset", 0))
+        items = [{"added_at": "2024-01-01T00:00:00Z", "track": _spotify_track(i)} for i in range(offset, min(offset + limit, liked_total))]
+        return 200, {"items": items, "total": liked_total, "limit": limit, "offset": offset, "next": None}, "application/json"
+
+    def playlists(request):
+        return 200, {"items": [], "total": 0, "limit": 50, "offset": 0, "next": None}, "application/json"
+
+    def ok(request):
+        return 200, {}, "application/json"
+
+    def contains(request):
+        ids = (request.arg("ids", "") or "").split(",")
+        return 200, [False for _ in ids if _], "application/json"
+
+    return FakeService("spotify", [
+        Route("GET", "/v1/me/player/devices", "spotify", devices),
+        Route("GET", "/v1/me/player", "spotify", playback),
+        Route("GET", "/v1/me/player/currently-playing", "spotify", playback),
+        Route("PUT", "/v1/me/player/pause", "spotify", control(set_playing(False))),
+        Route("PUT", "/v1/me/player/play", "spotify", control(set_playing(True))),
+        Route("POST", "/v1/me/player/next", "spotify", control(step(1))),
+        Route("POST", "/v1/me/player/previous", "spotify", control(step(-1))),
+        Route("PUT", "/v1/me/player/seek", "spotify", control(lambda request: None)),
+        Route("PUT", "/v1/me/player/volume", "spotify", control(volume)),
+        Route("GET", "/v1/search", "spotify", search),
+        Route("GET", "/v1/me", "spotify", me),
+        Route("GET", "/v1/me/tracks", "spotify", liked_tracks),
+        Route("PUT", "/v1/me/tracks", "spotify", ok),
+        Route("DELETE", "/v1/me/tracks", "spotify", ok),
+        Route("GET", "/v1/me/tracks/contains", "spotify", contains),
+        Route("GET", "/v1/me/playlists", "spotify", playlists),
+    ], **options)
+
+
+# --- SoundCloud ---
+
+def _soundcloud_track(index: int) -> dict:
+    return {
+        "id": 100000 + index,
+        "title": f"Bench Cloud Track {index}",
+        "duration": 180000,
+        "permalink_url": f"https://soundcloud.invalid/bench/{index}",
+        "artwork_url": f"https://img.invalid/sc/{index}.jpg",
+        "user": {"username": f"bench-artist-{index % 5}", "avatar_url": None},
+    }
+
+
+def soundcloud_service(likes_total: int = 200, **options) -> FakeService:
+    def tracks(request):
+        limit = int(request.arg("limit", 10))
+        seed = sum(map(ord, request.arg("q", ""))) % 10000
+        return 200, [_soundcloud_track(seed + i) for i in range(limit)], "application/json"
+
+    def me(request):
+        return 200, {"id": 4242, "username": "bench-user", "full_name": "Bench User"}, "application/json"
+
+    def likes(request):
+        limit = int(request.arg("limit", 50))
+        return 200, {"collection": [_soundcloud_track(i) for i in range(min(limit, likes_total))], "next_href": None}, "application/json"
+
+    def playlists(request):
+        return 200, [], "application/json"
+
+    def ok(request):
+        return 200, {}, "application/json"
+
+    return FakeService("soundcloud", [
+        Route("GET", "/tracks", "soundcloud", tracks),
+        Route("GET", "/me", "soundcloud", me),
+        Route("GET", "/me/likes/tracks", "soundcloud", likes),
+        Route("GET", "/me/playlists", "soundcloud", playlists),
+        Route("POST", "/likes/tracks/[^/]+", "soundcloud", ok),
+        Route("DELETE", "/likes/tracks/[^/]+", "soundcloud", ok),
+    ], **options)
@@ -0,0 +1,106 @@
+"""
+Library sync of a large Spotify library: runs sync_user_library against the local Spotify
+stand-in with N saved tracks, once per --concurrency value, and prints wall time, API calls
+and tracks stored per run as JSON.
+
+    python -m backend.benchmarks.liked_sync --tracks 10000 --latency-ms 120 --concurrency 1 4 8
+    python -m backend.benchmarks.liked_sync --rate 10   # include the shared rate limiter (10 calls/s)
+
+Every run starts from an empty liked-songs table in a throwaway SQLite file, with an
+in-process fakeredis for the rate limiter.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import functools
+from backend.benchmarks.fake_upstreams import spotify_service
+from backend.benchmarks.turn_latency import start_fake_redis
+
+
+def run_sync(account_id: int, concurrency: int, fake) -> dict:
+    from backend.adapters.spotify_adapter import SpotifyAdapter
+    from backend.configurations.database import SessionLocal
+    from backend.models.database_models import PlatformAccount, UserLikedSong
+    from backend.services.library_sync_service import sync_user_library
+    from backend.services.rate_limiter import rate_limit_lane, BACKGROUND
+
+    db = SessionLocal()
+    try:
+        db.query(UserLikedSong).delete()
+        db.commit()
+        account = db.get(PlatformAccount, account_id)
+        adapter = SpotifyAdapter("bench-access")
+        adapter.iter_liked_track_pages = functools.partial(adapter.iter_liked_track_pages, concurrency=concurrency)
+
+        calls_before = fake.stats()["by_route"].get("GET /v1/me/tracks", 0)
+        start = time.perf_counter()
+        with rate_limit_lane(BACKGROUND):
+            sync_user_library(db, platform_account=account, adapter=adapter)
+        elapsed = time.perf_counter() - start
+        stored = db.query(UserLikedSong).count()
+    finally:
+        db.close()
+
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "liked_pages_fetched": fake.stats()["by_route"].get("GET /v1/me/tracks", 0) - calls_before,
+        "tracks_stored": stored,
+        "tracks_per_second": round(stored / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=10000, help="Saved tracks in the fake library")
+    parser.add_argument("--latency-ms", type=float, default=120, help="Injected latency per Spotify call")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate", type=float, help="Shared rate limit in calls/s (default: effectively unlimited)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    fake = spotify_service(liked_total=args.tracks, latency_ms={"spotify": args.latency_ms}, jitter=args.jitter, seed=args.seed)
+    fake.start()
+    with tempfile.TemporaryDirectory(prefix="sam-bench-") as workdir:
+        try:
+            os.environ["SPOTIFY_API_BASE"] = f"{fake.base_url}/v1/"
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            os.environ["REDIS_URL"] = start_fake_redis()
+            os.environ["SPOTIFY_RATE_LIMIT_PER_SECOND"] = str(args.rate or 100000)
+            os.environ["SPOTIFY_RATE_LIMIT_BURST"] = str(int(args.rate) if args.rate else 100000)
+            os.environ["SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE"] = "0"
+
+            from backend.configurations.database import Base, engine, SessionLocal
+            from backend.models.database_models import SystemUser, PlatformAccount
+            logging.getLogger().setLevel(logging.WARNING)
+
+            Base.metadata.create_all(bind=engine)
+            db = SessionLocal()
+            try:
+                user = SystemUser(email=f"bench-{time.time_ns()}@example.com")
+                db.add(user)
+                db.flush()
+                account = PlatformAccount(system_user_id=user.id, platform_name="spotify", platform_user_id="bench-user")
+                db.add(account)
+                db.commit()
+                account_id = account.id
+            finally:
+                db.close()
+
+            runs = [run_sync(account_id, concurrency, fake) for concurrency in args.concurrency]
+        finally:
+            fake.stop()
+
+    print(json.dumps({
+        "config": {"tracks": args.tracks, "latency_ms": args.latency_ms, "rate_limit_per_s": args.rate},
+        "runs": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
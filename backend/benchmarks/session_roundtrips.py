@@ -0,0 +1,100 @@
+"""
+Benchmarks per-turn Redis access of SessionManager: the legacy call sequence
+(~10 round trips) against load_turn_context + commit_turn (2 round trips).
+
+    python -m backend.benchmarks.session_roundtrips --turns 500
+    python -m backend.benchmarks.session_roundtrips --rtt-ms 2   # emulate a remote Redis
+
+Uses REDIS_URL / REDIS_HOST like the app does.
+"""
+import time
+import json
+import argparse
+import statistics
+import redis
+from backend.services.session_manager import SessionManager
+
+
+class RoundTripCounter:
+    """Counts (and optionally delays) every packet sent to Redis; one per command or pipeline."""
+
+    def __init__(self, rtt_ms: float = 0.0):
+        self.count = 0
+        self.rtt = rtt_ms / 1000
+        self._original = redis.connection.Connection.send_packed_command
+
+    def __enter__(self):
+        counter = self
+
+        def send(conn, command, check_health=True):
+            counter.count += 1
+            if counter.rtt:
+                time.sleep(counter.rtt)
+            return counter._original(conn, command, check_health)
+
+        redis.connection.Connection.send_packed_command = send
+        return self
+
+    def __exit__(self, *exc):
+        redis.connection.Connection.send_packed_command = self._original
+
+
+def legacy_turn(session_id: str, pending: bool):
+    SessionManager.get_pending_context(session_id)
+    SessionManager.get_turn_history(session_id)
+    SessionManager.add_turn_history(session_id, role="user", text="like this song and add it to gym")
+    SessionManager.add_turn_history(session_id, role="assistant", text="Done!")
+    if pending:
+        SessionManager.save_pending_context(session_id, "add_to_playlist", {"song_name": "x"}, ["playlist_name"])
+    else:
+        SessionManager.clear_session_state(session_id)
+
+
+def batched_turn(session_id: str, pending: bool):
+    SessionManager.load_turn_context(session_id)
+    pending_info = {"pending_action": "add_to_playlist", "pending_parameters": {"song_name": "x"}, "missing_params": ["playlist_name"]}
+    SessionManager.commit_turn(
+        session_id,
+        [("user", "like this song and add it to gym"), ("assistant", "Done!")],
+        pending=pending_info if pending else None
+    )
+
+
+def run(turn, turns: int, rtt_ms: float) -> dict:
+    session_id = f"bench:{turn.__name__}"
+    SessionManager.clear_turn_history(session_id)
+    latencies = []
+    with RoundTripCounter(rtt_ms) as counter:
+        for i in range(turns):
+            start = time.perf_counter()
+            turn(session_id, pending=(i % 4 == 0))
+            latencies.append((time.perf_counter() - start) * 1000)
+    SessionManager.clear_turn_history(session_id)
+    SessionManager.clear_session_state(session_id)
+
+    latencies.sort()
+    return {
+        "round_trips_per_turn": round(counter.count / turns, 2),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="extra latency added to every round trip")
+    args = parser.parse_args()
+
+    results = {
+        "turns": args.turns,
+        "rtt_ms": args.rtt_ms,
+        "legacy": run(legacy_turn, args.turns, args.rtt_ms),
+        "batched": run(batched_turn, args.turns, args.rtt_ms),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
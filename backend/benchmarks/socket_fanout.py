@@ -0,0 +1,92 @@
+"""
+Benchmarks the cost of one `state_update` as the number of connected clients grows:
+the old broadcast to every socket against emit_state() to the turn's session room.
+
+    python -m backend.benchmarks.socket_fanout --connections 10 100 1000 10000
+
+Clients are registered straight in the Socket.IO manager and packets are counted
+instead of written to a transport, so this measures the server-side fan-out only.
+"""
+import time
+import json
+import asyncio
+import argparse
+import statistics
+from backend import socket_manager
+from backend.socket_manager import sio, emit_state, session_room
+
+
+class PacketCounter:
+    """Replaces the Engine.IO send of `sio` with a counter for the duration of the block."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        async def send(eio_sid, pkt):
+            self.count += 1
+
+        self._original = sio._send_eio_packet
+        sio._send_eio_packet = send
+        return self
+
+    def __exit__(self, *exc):
+        sio._send_eio_packet = self._original
+
+
+async def connect_clients(n: int) -> list[str]:
+    """Registers n clients, each in its own chat session room."""
+    sids = []
+    for i in range(n):
+        sid = await sio.manager.connect(f"bench-eio-{i}", "/")
+        await socket_manager.join_session(sid, f"bench-session-{i}")
+        sids.append(sid)
+    return sids
+
+
+async def disconnect_clients(sids: list[str]):
+    for sid in sids:
+        await sio.manager.disconnect(sid, "/", ignore_queue=True)
+
+
+async def measure(emit, emits: int) -> dict:
+    latencies = []
+    with PacketCounter() as counter:
+        for _ in range(emits):
+            start = time.perf_counter()
+            await emit()
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "packets_per_emit": round(counter.count / emits, 2),
+        "p50_ms": round(statistics.median(latencies), 4),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 4),
+    }
+
+
+async def run(connections: list[int], emits: int) -> dict:
+    results = {}
+    for n in connections:
+        sids = await connect_clients(n)
+        try:
+            results[n] = {
+                "broadcast": await measure(lambda: sio.emit("state_update", {"state": "THINKING", "message": ""}), emits),
+                "session_room": await measure(lambda: emit_state("bench-session-0", "THINKING"), emits),
+            }
+        finally:
+            await disconnect_clients(sids)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--emits", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.connections, args.emits))
+    print(json.dumps({"emits": args.emits, "room": session_room("<id>"), "connections": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Spotify action stage of a turn under load, threaded vs asyncio adapter: runs
+DialogManager._handle_music_action for a mix of actions (pause, resume, play_song,
+skip_song) at a given concurrency against the local Spotify stand-in, once with
+SpotifyAdapter on the default executor and once with AsyncSpotifyAdapter awaited on
+the loop, and prints throughput, latency percentiles and peak actions in flight as JSON.
+
+    python -m backend.benchmarks.spotify_actions --concurrency 32 --threads 8 --actions 512
+    python -m backend.benchmarks.spotify_actions --latency-ms 150 --modes async
+
+--threads sizes the loop's default executor, i.e. how many threaded actions one worker
+can have in flight (Python's default is min(32, cpu_count + 4)). The Spotify stand-in runs
+in its own process, so its handler threads do not compete with the measured worker for the
+GIL; SQLite and fakeredis are local as in the other benchmarks.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from backend.benchmarks.fake_upstreams import spotify_service
+from backend.benchmarks.turn_latency import start_fake_redis, seed_account, percentiles
+
+ACTIONS = [
+    ("pause_song", {}),
+    ("resume_song", {}),
+    ("play_song", {"song_name": "Blinding Lights"}),
+    ("skip_song", {}),
+]
+
+
+def serve_spotify(latency_ms: float, jitter: float, seed: int, ready, stop):
+    """Child process: runs the Spotify stand-in until `stop` is set, then sends back its stats."""
+    fake = spotify_service(latency_ms={"spotify": latency_ms}, jitter=jitter, seed=seed)
+    ready.send(fake.start())
+    stop.recv()
+    ready.send(fake.stats())
+    fake.stop()
+
+
+async def run_mode(mode: str, args, account_id: int) -> dict:
+    from backend.configurations.database import SessionLocal
+    from backend.services.dialog_manager import DialogManager
+
+    os.environ["ENABLE_ASYNC_SPOTIFY_ADAPTER"] = "true" if mode == "async" else "false"
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix="bench-executor"))
+
+    request_db = SessionLocal()
+    dialog = DialogManager(request_db, session_id=f"bench-{mode}", platform="spotify", platform_account_id=account_id)
+    latencies = []
+    errors: dict[str, int] = {}
+    in_flight = peak = 0
+    next_index = 0
+
+    async def one_action(index: int):
+        nonlocal in_flight, peak
+        action, params = ACTIONS[index % len(ACTIONS)]
+        # Every action gets its own session, as DialogManager._run_action does
+        db = SessionLocal()
+        in_flight += 1
+        peak = max(peak, in_flight)
+        start = time.perf_counter()
+        try:
+            await dialog._handle_music_action(action, dict(params), db=db)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        finally:
+            in_flight -= 1
+            db.close()
+
+    async def worker(total: int):
+        nonlocal next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            await one_action(index)
+
+    try:
+        # Warm the token cache, device cache and SearchCache outside the measurement
+        for index in range(len(ACTIONS)):
+            await one_action(index)
+        latencies.clear()
+        peak = 0
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(args.actions) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        request_db.close()
+
+    return {
+        "mode": mode,
+        "duration_s": round(elapsed, 3),
+        "actions_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "peak_actions_in_flight": peak,
+        "errors": errors,
+        "latency_ms": percentiles(latencies) if latencies else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions", type=int, default=512, help="Actions run per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Actions started concurrently (turns in flight)")
+    parser.add_argument("--threads", type=int, default=8, help="Default executor size of the worker")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Injected latency per Spotify call")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--modes", nargs="+", choices=["threaded", "async"], default=["threaded", "async"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    ready, child_ready = context.Pipe()
+    stop, child_stop = context.Pipe()
+    server = context.Process(
+        target=serve_spotify, args=(args.latency_ms, args.jitter, args.seed, child_ready, child_stop), daemon=True
+    )
+    server.start()
+    base_url = ready.recv()
+    with tempfile.TemporaryDirectory(prefix="sam-bench-") as workdir:
+        try:
+            os.environ["SPOTIFY_API_BASE"] = f"{base_url}/v1/"
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            os.environ["REDIS_URL"] = start_fake_redis()
+            os.environ["ENABLE_PLAYBACK_POLLER"] = "false"
+            os.environ.setdefault("SPOTIFY_RATE_LIMIT_PER_SECOND", "100000")
+            os.environ.setdefault("SPOTIFY_RATE_LIMIT_BURST", "100000")
+            if not os.getenv("ENCRYPTION_KEY"):
+                from cryptography.fernet import Fernet
+                os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+            account_id = seed_account("spotify")
+            logging.getLogger().setLevel(logging.WARNING)
+            # Each mode gets a fresh loop (and with it a fresh executor and async client)
+            runs = [asyncio.run(run_mode(mode, args, account_id)) for mode in args.modes]
+        finally:
+            stop.send(True)
+            upstream_calls = ready.recv()
+            server.join(timeout=5)
+
+    print(json.dumps({
+        "config": {
+            "actions": args.actions, "concurrency": args.concurrency, "threads": args.threads,
+            "latency_ms": args.latency_ms, "mix": [action for action, _ in ACTIONS],
+        },
+        "runs": runs,
+        "upstream_calls": upstream_calls,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+End-to-end turn latency: boots backend.main.app in-process against local stand-ins for
+Groq (LLM/STT/TTS), Spotify and SoundCloud, drives /v1/chat/process_text and
+/v1/chat/process_voice at a given concurrency, and prints throughput plus p50/p95/p99
+per pipeline stage (from the `timings` block of each response) as JSON.
+
+    python -m backend.benchmarks.turn_latency --requests 200 --concurrency 8
+    python -m backend.benchmarks.turn_latency --mode voice --latency llm=350 stt=250 tts=200 spotify=80
+    python -m backend.benchmarks.turn_latency --fail spotify=0.05 --output before.json
+    python -m backend.benchmarks.turn_latency --database-url postgresql://... --redis redis://localhost:6379/0
+
+Upstream latency is injected by the fakes (per route kind: llm, stt, tts, spotify, soundcloud,
+with +/- --jitter). Defaults to a throwaway SQLite file and an in-process fakeredis TCP server,
+so no external services are needed; compare runs of the same configuration before/after a change.
+"""
+import os
+import io
+import sys
+import json
+import time
+import wave
+import math
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+from backend.benchmarks.fake_upstreams import groq_service, spotify_service, soundcloud_service
+
+logger = logging.getLogger(__name__)
+
+# utterance -> intent the fake LLM answers with
+SCENARIOS = {
+    "pause the music": {"intent": "control", "actions": [{"action": "pause_song", "parameters": {}}], "reply": "Paused."},
+    "play blinding lights": {
+        "intent": "play", "actions": [{"action": "play_song", "parameters": {"song_name": "Blinding Lights", "artist": "The Weeknd"}}],
+        "reply": "Playing Blinding Lights.",
+    },
+    "what is playing right now": {"intent": "info", "actions": [{"action": "get_current_song", "parameters": {}}], "reply": "Here is the current song."},
+    "skip this song": {"intent": "control", "actions": [{"action": "skip_song", "parameters": {}}], "reply": "Skipped."},
+    "turn it up a bit": {
+        "intent": "control", "actions": [{"action": "change_volume", "parameters": {"volume": None, "mode": "increase"}}],
+        "reply": "Turning it up.",
+    },
+    "how are you today": {"intent": "chat", "actions": [], "reply": "Doing great, ready to play some music!"},
+}
+
+
+def parse_kinds(values: list[str] | None, cast=float) -> dict:
+    """`["llm=350", "spotify=80"]` -> {"llm": 350.0, "spotify": 80.0}"""
+    result = {}
+    for item in values or []:
+        kind, _, value = item.partition("=")
+        if not value:
+            raise argparse.ArgumentTypeError(f"Expected kind=value, got '{item}'")
+        result[kind.strip()] = cast(value)
+    return result
+
+
+def percentiles(values: list[float]) -> dict:
+    ordered = sorted(values)
+
+    def pick(pct):
+        return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 1),
+        "p50_ms": round(pick(50), 1),
+        "p95_ms": round(pick(95), 1),
+        "p99_ms": round(pick(99), 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+def voice_clip(seconds: float = 1.5, sample_rate: int = 16000) -> bytes:
+    """A short tone, loud enough that audio preprocessing keeps it as speech."""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        sample = int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate))
+        frames += sample.to_bytes(2, "little", signed=True)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return buf.getvalue()
+
+
+def start_fake_redis() -> str:
+    """In-process fakeredis TCP server on a free port (Nagle off, as with a real Redis)."""
+    from fakeredis import TcpFakeServer
+
+    class Server(TcpFakeServer):
+        def get_request(self):
+            conn, addr = super().get_request()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return conn, addr
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = Server(("127.0.0.1", port), server_type="redis")
+    # TcpFakeServer sets this in __init__; pooled connections would otherwise block exit
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-redis", daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def configure_environment(args, fakes: dict, workdir: str):
+    """Points the app at the fakes; must run before anything under backend.* is imported."""
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_API_BASE"] = f"{fakes['groq'].base_url}/openai/v1"
+    os.environ["SPOTIFY_API_BASE"] = f"{fakes['spotify'].base_url}/v1/"
+    os.environ["SOUNDCLOUD_API_BASE"] = fakes["soundcloud"].base_url
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REDIS_URL"] = start_fake_redis() if args.redis == "fake" else args.redis
+    if args.platform == "soundcloud":
+        os.environ["ENABLE_SOUNDCLOUD"] = "true"
+    # The fakes have no rate limit; keep the shared limiter out of the latency numbers unless asked for
+    os.environ.setdefault("SPOTIFY_RATE_LIMIT_PER_SECOND", "100000")
+    os.environ.setdefault("SPOTIFY_RATE_LIMIT_BURST", "100000")
+    if not os.getenv("ENCRYPTION_KEY"):
+        from cryptography.fernet import Fernet
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+
+def seed_account(platform: str) -> int:
+    """Creates the schema and one connected account whose token never expires."""
+    from datetime import datetime, timedelta, timezone
+    from backend.configurations.database import Base, engine, SessionLocal
+    from backend.models.database_models import SystemUser, PlatformAccount
+    from backend.utils.encryption import encrypt_token
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = SystemUser(email=f"bench-{time.time_ns()}@example.com")
+        db.add(user)
+        db.flush()
+        account = PlatformAccount(
+            system_user_id=user.id,
+            platform_name=platform,
+            platform_user_id="bench-user",
+            refresh_token=encrypt_token("bench-refresh"),
+            meta_data={
+                "access_token": encrypt_token("bench-access"),
+                "expires_at": (datetime.now(timezone.utc) + timedelta(days=365)).isoformat(),
+                "profile": {"id": "bench-user", "display_name": "Bench User"},
+            },
+        )
+        db.add(account)
+        db.commit()
+        return account.id
+    finally:
+        db.close()
+
+
+async def drive(args, account_id: int) -> dict:
+    import httpx
+    from backend.main import app
+
+    utterances = list(SCENARIOS)
+    clip = voice_clip() if args.mode != "text" else b""
+    results = []
+    next_index = 0
+
+    async def one_turn(client, index: int, session_id: str) -> dict:
+        text = utterances[index % len(utterances)]
+        voice = args.mode == "voice" or (args.mode == "mixed" and index % 2)
+        params = {"platform": args.platform, "include_timings": "true"}
+        start = time.perf_counter()
+        try:
+            if voice:
+                resp = await client.post("/v1/chat/process_voice", params={
+                    **params, "session_id": session_id, "platform_account_id": account_id,
+                }, files={"audio": ("turn.wav", clip, "audio/wav")})
+            else:
+                resp = await client.post("/v1/chat/process_text", params=params, json={
+                    "text": text, "session_id": session_id, "platform_account_id": account_id,
+                })
+            status = resp.status_code
+            timings = resp.json().get("timings", {}) if status == 200 else {}
+        except Exception as e:
+            status, timings = type(e).__name__, {}
+        return {
+            "route": "process_voice" if voice else "process_text",
+            "status": status,
+            "ms": (time.perf_counter() - start) * 1000,
+            "timings": timings,
+        }
+
+    async def worker(client, worker_id: int, total: int, record: bool):
+        nonlocal next_index
+        session_id = f"bench-{worker_id}-{time.time_ns()}"
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            result = await one_turn(client, index, session_id)
+            if record:
+                results.append(result)
+
+    async def run_phase(client, total: int, record: bool) -> float:
+        nonlocal next_index
+        next_index = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, i, total, record) for i in range(args.concurrency)))
+        return time.perf_counter() - start
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            if args.warmup:
+                await run_phase(client, args.warmup, record=False)
+            elapsed = await run_phase(client, args.requests, record=True)
+
+    return {"elapsed": elapsed, "results": results}
+
+
+def report(args, run: dict, fakes: dict) -> dict:
+    results = run["results"]
+    ok = [r for r in results if r["status"] == 200]
+    errors: dict[str, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+
+    stage_samples: dict[str, list[float]] = {}
+    for r in ok:
+        for stage, ms in r["timings"].items():
+            stage_samples.setdefault(stage, []).append(ms)
+
+    by_route = {}
+    for route in sorted({r["route"] for r in ok}):
+        by_route[route] = percentiles([r["ms"] for r in ok if r["route"] == route])
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "platform": args.platform,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "latency_ms": parse_kinds(args.latency),
+            "jitter": args.jitter,
+            "failure_rate": parse_kinds(args.fail),
+            "database": "sqlite" if not args.database_url else args.database_url.split(":", 1)[0],
+            "redis": "fakeredis" if args.redis == "fake" else "redis",
+        },
+        "duration_s": round(run["elapsed"], 3),
+        "throughput_rps": round(len(results) / run["elapsed"], 2) if run["elapsed"] else 0.0,
+        "succeeded": len(ok),
+        "errors": errors,
+        "latency_ms": percentiles([r["ms"] for r in ok]) if ok else {},
+        "latency_by_route_ms": by_route,
+        "stages_ms": {stage: percentiles(values) for stage, values in sorted(stage_samples.items())},
+        "upstream_calls": {name: fake.stats() for name, fake in fakes.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["text", "voice", "mixed"], default="text")
+    parser.add_argument("--platform", choices=["spotify", "soundcloud"], default="spotify")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10, help="Turns run first and left out of the report")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", nargs="*", metavar="KIND=MS",
+                        default=["llm=300", "stt=200", "tts=150", "spotify=60", "soundcloud=80"],
+                        help="Injected latency per route kind (llm, stt, tts, spotify, soundcloud)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency varies uniformly by +/- this fraction")
+    parser.add_argument("--fail", nargs="*", metavar="KIND=RATE", default=[], help="Failure rate per route kind, e.g. spotify=0.05")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--redis", default="fake", help="'fake' (in-process fakeredis) or a redis:// URL")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    options = {
+        "latency_ms": parse_kinds(args.latency),
+        "failure_rate": parse_kinds(args.fail),
+        "jitter": args.jitter,
+        "failure_status": args.fail_status,
+        "seed": args.seed,
+    }
+    fakes = {
+        "groq": groq_service(SCENARIOS, transcripts=list(SCENARIOS), **options),
+        "spotify": spotify_service(**options),
+        "soundcloud": soundcloud_service(**options),
+    }
+    for fake in fakes.values():
+        fake.start()
+
+    with tempfile.TemporaryDirectory(prefix="sam-bench-") as workdir:
+        try:
+            configure_environment(args, fakes, workdir)
+            account_id = seed_account(args.platform)
+            # backend.main configures INFO logging on import; quiet it down for the run
+            import backend.main  # noqa: F401
+            logging.getLogger().setLevel(args.log_level.upper())
+
+            run = asyncio.run(drive(args, account_id))
+            result = report(args, run, fakes)
+        finally:
+            for fake in fakes.values():
+                fake.stop()
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
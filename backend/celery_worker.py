@@ -1,8 +1,11 @@
-from celery import Celery
+from celery import Celery, signals
 from celery.schedules import crontab
 import os
 from backend.configurations.database import engine
 from backend.models import database_models
+from backend.utils.feature_flags import is_metrics_enabled
+from backend.utils import metrics
+from backend.services.rate_limiter import BACKGROUND, enter_lane, leave_lane
 import logging
 import ssl
 
@@ -33,6 +36,23 @@ if redis_url and redis_url.startswith("rediss://"):
 
 logger.info("Celery worker initialized with Redis broker")
 
+if is_metrics_enabled():
+    metrics.install()
+    metrics.install_celery_metrics()
+
+# Everything a worker calls upstream is background traffic for the shared rate limiters
+_task_lanes = {}
+
+@signals.task_prerun.connect(weak=False)
+def _enter_background_lane(task_id=None, **kwargs):
+    _task_lanes[task_id] = enter_lane(BACKGROUND)
+
+@signals.task_postrun.connect(weak=False)
+def _leave_background_lane(task_id=None, **kwargs):
+    token = _task_lanes.pop(task_id, None)
+    if token is not None:
+        leave_lane(token)
+
 celery_app.conf.update(
     task_track_started=True,
     beat_schedule_filename="tmp/celerybeat-schedule"
@@ -47,6 +67,10 @@ celery_app.conf.beat_schedule = {
         'task': 'refresh_all_soundcloud_libraries',
         'schedule': 21600,  # 6 hours (in seconds)
     },
+    'proactive-token-refresh-every-2m': {
+        'task': 'refresh_expiring_tokens',
+        'schedule': 120,  # tokens expiring within PROACTIVE_REFRESH_AHEAD_SECONDS get renewed
+    },
     'purge-search-cache-daily': {
         'task': 'purge_expired_search_cache',  # <-- use the registered task name
         'schedule': crontab(hour=2, minute=0),  # every day at 2 AM UTC
@@ -54,4 +78,4 @@ celery_app.conf.beat_schedule = {
     },
 }
 
-logger.info("Celery beat schedule registered: Spotify refresh + cache purge")
+logger.info("Celery beat schedule registered: library refresh + token renewal + cache purge")
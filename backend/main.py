@@ -1,18 +1,25 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 import logging
 import os
+from contextlib import asynccontextmanager
 from backend.api.v1.adapter_routes import router as adapter_router
 from backend.api.v1.voice_routes import router as voice_router
 from backend.api.v1.chat_routes import router as chat_router
 from backend.api.v1.user_routes import router as user_router
 from backend.api.v1.search_routes import router as search_router
+from backend.api.v1 import voice_socket  # registers the streaming voice Socket.IO events
 from backend.models import database_models 
 from backend.configurations.database import engine
 from backend.socket_manager import socket_app
-from backend.utils.custom_exceptions import AuthenticationError, DeviceNotFoundException, ExternalAPIError
+from backend.services.interaction_log_writer import interaction_log_writer
+from backend.services.playback_poller import playback_poller
+from backend.adapters.spotify_async_adapter import close_async_client
+from backend.utils.custom_exceptions import AuthenticationError, DeviceNotFoundException, ExternalAPIError, AudioTooLargeError
+from backend.utils.feature_flags import is_metrics_enabled
+from backend.utils import metrics
 
 # Configure centralized logging
 logging.basicConfig(
@@ -26,7 +33,16 @@ logger = logging.getLogger(__name__)
 # Verify database schema existence
 # database_models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Voice Assistant Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    interaction_log_writer.start()
+    yield
+    # Interaction logs are batched in memory, write out whatever is still queued
+    await interaction_log_writer.stop()
+    await playback_poller.stop()
+    await close_async_client()
+
+app = FastAPI(title="Voice Assistant Backend", version="1.0.0", lifespan=lifespan)
 
 app.mount("/socket.io", socket_app)
 # Fallback mount if needed, though socket.io handles paths
@@ -89,6 +105,14 @@ async def external_api_error_handler(request: Request, exc: ExternalAPIError):
         content={"detail": exc.message, "code": "EXTERNAL_API_ERROR"},
     )
 
+@app.exception_handler(AudioTooLargeError)
+async def audio_too_large_handler(request: Request, exc: AudioTooLargeError):
+    logger.warning(f"AudioTooLargeError caught: {exc.message}")
+    return JSONResponse(
+        status_code=413, # Payload Too Large
+        content={"detail": exc.message, "code": "AUDIO_TOO_LARGE"},
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception caught: {str(exc)}", exc_info=True)
@@ -126,3 +150,16 @@ app.add_middleware(
 def home():
     logger.debug("Health check endpoint called")
     return {"message": "Voice Assistant Backend is Running 🚀"}
+
+# Prometheus metrics: added last so the timing middleware wraps CORS and sessions too
+if is_metrics_enabled():
+    metrics.install()
+    app.add_middleware(metrics.PrometheusMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        # async on purpose: the executor gauges read the loop this handler runs on
+        content, content_type = metrics.render_metrics()
+        return Response(content=content, media_type=content_type)
+
+    logger.info("Prometheus metrics exposed at /metrics")
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from backend.configurations.database import Base
 
@@ -35,9 +35,11 @@ class UserPlaylist(Base):
 
 class UserLikedSong(Base):
     __tablename__ = "user_liked_songs"
+    # Several accounts can like the same track
+    __table_args__ = (UniqueConstraint("platform_account_id", "track_uri"),)
     id = Column(Integer, primary_key=True, index=True)
-    platform_account_id = Column(Integer, ForeignKey("platform_accounts.id"))
-    track_uri = Column(String, unique=True, index=True)
+    platform_account_id = Column(Integer, ForeignKey("platform_accounts.id"), index=True)
+    track_uri = Column(String, index=True)
     meta_data = Column(JSON, nullable=True)
     last_synced = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     account = relationship("PlatformAccount", back_populates="liked_songs")
@@ -59,4 +61,4 @@ class InteractionLog(Base):
     user_input = Column(String)
     llm_response = Column(JSON)
     final_action = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
\ No newline at end of file
+    timestamp = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
\ No newline at end of file
@@ -9,6 +9,7 @@ from backend.utils.action_params import ACTION_REQUIRED_PARAMS
 load_dotenv()
 logger = logging.getLogger(__name__)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
 
 def call_llm_agent(user_text: str, short_reply: bool = True, action_keys: list = []) -> dict:
     """
@@ -35,6 +36,7 @@ Instructions:
 1. **Analyze the user's request:** Parse and split the request into one or more music-related actions if multiple tasks are stated (e.g., "play X and add it to playlist Y").
 2. **Choose Actions:** For each action needed, select from the `Available Actions` list. The order in the list should match the order of intent in the user's message.
 3. **Extract Parameters:** For each action, identify the required parameters like `song_name`, `artist`, `playlist_name`, or `mood` where relevant.
+    - **add_to_playlist / remove_from_playlist:** For several songs at once ("add these 5 songs to road trip"), put them all in `song_names` as a list of strings (include the artist when given, e.g. "Levitating by Dua Lipa") instead of `song_name`.
     - **skip_time(seconds):** If the user says "skip 20s" or "jump 30 seconds", you MUST extract the integer value into `seconds`.
     - **change_volume(volume, mode):** 
       - `mode` must be one of: "absolute", "increase", "decrease".
@@ -55,6 +57,7 @@ Instructions:
 ⚠️ IMPORTANT SEMANTIC RULE:
 - "Liked Songs" / "Liked Tracks" / "My Liked Songs" is NOT a playlist.
 - If the user asks to play liked songs, you MUST use the action `play_liked_songs`.
+- Set `shuffle: true` on `play_liked_songs` only when the user asks to shuffle them.
 - NEVER use `play_playlist_by_name` for liked songs.
 - Do NOT treat "Liked Songs" as a playlist name.
 4. **Handle Non-Music Talk:** If there is only small talk, ignore actions and return just a conversational `reply`.
@@ -85,7 +88,7 @@ Available Actions: {available_actions_prompt}
 """ + user_text  # user_text contains "Conversation so far: ... User now: ..." from dialog_manager
 
     # Groq OpenAI-compatible endpoint
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    url = f"{GROQ_API_BASE}/chat/completions"
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
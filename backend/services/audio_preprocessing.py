@@ -0,0 +1,206 @@
+import io
+import os
+import time
+import wave
+import asyncio
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from backend.services.speech_to_text import SpeechToTextService, STT_MAX_UPLOAD_BYTES
+from backend.utils.custom_exceptions import AudioTooLargeError
+from backend.utils.feature_flags import is_audio_preprocessing_enabled
+from backend.utils.voice_activity import frame_energy_db
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000         # Whisper works at 16 kHz internally
+SILENCE_FLOOR_DB = -50.0           # frames below this are always silence
+SILENCE_BELOW_PEAK_DB = 35.0       # frames this far below the loudest frame count as silence
+TRIM_PADDING_MS = 200              # keep a little audio around the speech
+PREPROCESS_MAX_BYTES = 10 * 1024 * 1024  # larger uploads are streamed untouched
+STREAM_THRESHOLD_BYTES = 1024 * 1024     # non-WAV uploads above this are streamed instead of buffered
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Dedicated pool so NumPy work never competes with the default executor used for upstream I/O
+_preprocess_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AUDIO_PREPROCESS_WORKERS", 2)),
+    thread_name_prefix="audio-prep"
+)
+
+
+def _decode_pcm(raw: bytes, sample_width: int) -> np.ndarray:
+    """Decodes interleaved PCM frames into float32 samples in [-1, 1]."""
+    if sample_width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 4:
+        return (np.frombuffer(raw, dtype="<i4").astype(np.float64) / 2147483648.0).astype(np.float32)
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def _lowpass(samples: np.ndarray, cutoff: float, taps: int = 101) -> np.ndarray:
+    """Windowed-sinc FIR low-pass. `cutoff` is a fraction of the sample rate (0 < cutoff < 0.5)."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Downsamples with an anti-aliasing filter followed by linear interpolation."""
+    if source_rate <= target_rate or len(samples) == 0:
+        return samples
+    filtered = _lowpass(samples, cutoff=0.45 * target_rate / source_rate)
+    duration = len(samples) / source_rate
+    target_len = int(round(duration * target_rate))
+    source_t = np.arange(len(samples)) / source_rate
+    target_t = np.arange(target_len) / target_rate
+    return np.interp(target_t, source_t, filtered).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, frame_ms: int = 20) -> np.ndarray:
+    """Drops leading and trailing silence, keeping TRIM_PADDING_MS around the voiced region."""
+    frame_size = max(1, sample_rate * frame_ms // 1000)
+    energies = frame_energy_db(samples, frame_size)
+    if len(energies) == 0:
+        return samples
+
+    threshold = max(SILENCE_FLOOR_DB, float(energies.max()) - SILENCE_BELOW_PEAK_DB)
+    voiced = np.flatnonzero(energies > threshold)
+    if len(voiced) == 0:
+        return samples
+
+    padding = sample_rate * TRIM_PADDING_MS // 1000
+    start = max(voiced[0] * frame_size - padding, 0)
+    end = min((voiced[-1] + 1) * frame_size + padding, len(samples))
+    return samples[start:end]
+
+
+def preprocess_wav(data: bytes) -> bytes | None:
+    """
+    Mono mixdown, resampling to 16 kHz and silence trimming for PCM WAV input.
+    Returns the processed 16-bit WAV, or None when the input is not a PCM WAV
+    (e.g. webm/ogg from the browser) and must be uploaded as-is.
+    """
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            sample_rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = _decode_pcm(raw, sample_width)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+
+    samples = resample(samples, sample_rate)
+    output_rate = min(sample_rate, TARGET_SAMPLE_RATE)
+    samples = trim_silence(samples, output_rate)
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(output_rate)
+        wav.writeframes(pcm)
+    return out.getvalue()
+
+
+def preprocess_audio(file_obj) -> tuple[bytes, dict]:
+    """
+    Reads an upload (bytes or file-like) and returns (audio_bytes, stats) ready for the STT upload.
+    Falls back to the original bytes whenever preprocessing does not apply or fails.
+    """
+    start = time.perf_counter()
+    data = file_obj if isinstance(file_obj, (bytes, bytearray)) else file_obj.read()
+    data = bytes(data)
+
+    processed = None
+    if is_audio_preprocessing_enabled() and len(data) <= PREPROCESS_MAX_BYTES:
+        try:
+            processed = preprocess_wav(data)
+        except Exception as e:
+            logger.warning(f"Audio preprocessing failed, uploading original audio: {e}")
+
+    # Never upload something bigger than what we received
+    applied = processed is not None and len(processed) < len(data)
+    output = processed if applied else data
+
+    stats = {
+        "bytes_in": len(data),
+        "bytes_out": len(output),
+        "preprocessed": applied,
+        "preprocess_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    return output, stats
+
+
+async def prepare_audio_for_stt(file_obj) -> tuple[bytes, dict]:
+    """Runs preprocess_audio on the dedicated worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_preprocess_pool, preprocess_audio, file_obj)
+
+
+def _inspect_upload(file_obj) -> tuple[int, bool]:
+    """Size of the upload and whether it starts with a WAV header; seeks, so run it off the loop."""
+    position = file_obj.tell()
+    file_obj.seek(0, os.SEEK_END)
+    size = file_obj.tell()
+    file_obj.seek(position)
+    header = file_obj.read(12)
+    file_obj.seek(position)
+    return size, len(header) == 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+async def iter_file_chunks(file_obj, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Reads a (possibly disk-backed) file in chunks without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, file_obj.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def transcribe_upload(file_obj, transcribe, filename: str = "audio.wav", content_type: str = "audio/wav") -> str:
+    """
+    Transcribes an upload (bytes or file-like) with bounded memory:
+    - small uploads and WAVs up to PREPROCESS_MAX_BYTES are preprocessed on the worker pool
+      and sent with the blocking `transcribe` callable on the default executor;
+    - anything larger is streamed chunk by chunk to the STT provider.
+    Logs upload size and STT latency for every request.
+    """
+    if not isinstance(file_obj, (bytes, bytearray)):
+        # A spooled upload above 1 MB is on disk
+        size, is_wav = await asyncio.get_running_loop().run_in_executor(None, _inspect_upload, file_obj)
+        if size > STT_MAX_UPLOAD_BYTES:
+            raise AudioTooLargeError(f"Audio exceeds the {STT_MAX_UPLOAD_BYTES // (1024 * 1024)} MB transcription limit.")
+
+        preprocessable = is_audio_preprocessing_enabled() and size <= PREPROCESS_MAX_BYTES and is_wav
+        if size > STREAM_THRESHOLD_BYTES and not preprocessable:
+            stt_start = time.perf_counter()
+            transcript = await SpeechToTextService.transcribe_stream(
+                iter_file_chunks(file_obj), filename=filename, content_type=content_type
+            )
+            logger.info(
+                "STT upload | bytes_in=%s | bytes_out=%s | streamed=True | stt_ms=%s",
+                size, size, round((time.perf_counter() - stt_start) * 1000, 1)
+            )
+            return transcript
+
+    audio_bytes, stats = await prepare_audio_for_stt(file_obj)
+
+    loop = asyncio.get_running_loop()
+    stt_start = time.perf_counter()
+    transcript = await loop.run_in_executor(None, transcribe, audio_bytes)
+    stats["stt_ms"] = round((time.perf_counter() - stt_start) * 1000, 1)
+
+    logger.info(
+        "STT upload | bytes_in=%s | bytes_out=%s | preprocessed=%s | preprocess_ms=%s | stt_ms=%s",
+        stats["bytes_in"], stats["bytes_out"], stats["preprocessed"], stats["preprocess_ms"], stats["stt_ms"]
+    )
+    return transcript
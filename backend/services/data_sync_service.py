@@ -1,23 +1,33 @@
 import os
+import redis
 import requests
 import base64
 import logging
+from contextlib import contextmanager
 from backend.adapters.spotify_adapter import SpotifyAdapter
 from backend.adapters.adapter_factory import get_soundcloud_adapter
+from backend.adapters.soundcloud_adapter import soundcloud_session
 from backend.utils.feature_flags import is_soundcloud_enabled
 from backend.services.library_sync_service import sync_user_library
 from backend.services.cache_service import purge_old_cache_entries
 from backend.celery_worker import celery_app
-from backend.models.database_models import PlatformAccount
+from backend.models.database_models import PlatformAccount, InteractionLog
 from backend.configurations.database import SessionLocal
+from backend.configurations.redis_client import redis_client
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-from backend.utils.custom_exceptions import AuthenticationError
+from backend.utils.custom_exceptions import AuthenticationError, ExternalAPIError
 from backend.utils.encryption import encrypt_token, decrypt_token
+from backend.services.profile_cache import store_profile, invalidate_profile
+from backend.services.token_cache import cache_access_token, get_cached_access_token, invalidate_access_token
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+TOKEN_REFRESH_LOCK_TIMEOUT = 20      # seconds; longer than an OAuth round trip with retries
+PROACTIVE_REFRESH_AHEAD_SECONDS = int(os.getenv("PROACTIVE_REFRESH_AHEAD_SECONDS", 600))
+ACTIVE_ACCOUNT_WINDOW_MINUTES = int(os.getenv("ACTIVE_ACCOUNT_WINDOW_MINUTES", 60))
+
 # --------------------------------------------------- SPOTIFY ---------------------------------------------------
 
 def refresh_spotify_access_token(refresh_token: str) -> str:
@@ -48,57 +58,144 @@ def refresh_spotify_access_token(refresh_token: str) -> str:
     }
 
 
-def get_valid_spotify_access_token(db, account: PlatformAccount) -> str:
-    logger.debug("get_valid_spotify_access_token START")
-    logger.debug("Account ID: %s", account.id)
-    logger.debug("Refresh token present: %s", bool(account.refresh_token))
-    logger.debug("Meta data raw: %s", account.meta_data)
-
+def _stored_token(account: PlatformAccount, valid_for: timedelta) -> tuple[str, datetime] | None:
+    """Returns (decrypted access token, expiry) from meta_data if it stays valid for at least `valid_for`."""
     meta = account.meta_data or {}
     access_token = decrypt_token(meta.get("access_token"))
     expires_at = meta.get("expires_at")
+    if not (access_token and expires_at):
+        return None
 
-    # If token exists and is still valid → reuse
-    if access_token and expires_at:
-        try:
-            expires_dt = datetime.fromisoformat(expires_at)
-
-            if expires_dt.tzinfo is None:
-                expires_dt = expires_dt.replace(tzinfo=timezone.utc)
+    try:
+        expires_dt = datetime.fromisoformat(expires_at)
+        if expires_dt.tzinfo is None:
+            expires_dt = expires_dt.replace(tzinfo=timezone.utc)
+    except Exception as e:
+        logger.warning("Invalid expires_at for platform_account_id=%s: %s", account.id, e)
+        return None
 
-            if datetime.now(timezone.utc) < expires_dt:
-                logger.debug("Reusing valid Spotify token for platform_account_id=%s (…%s)", account.id, access_token[-6:])
-                return access_token
+    if datetime.now(timezone.utc) < expires_dt - valid_for:
+        return access_token, expires_dt
+    return None
 
-        except Exception as e:
-            logger.warning("Invalid expires_at for platform_account_id=%s: %s", account.id, e)
 
-    # Refresh token
-    logger.info("Spotify token expired or missing for platform_account_id=%s. Refreshing…", account.id)
+@contextmanager
+def token_refresh_lock(platform: str, account_id: int):
+    """
+    Single-flight guard around a token refresh, shared by every web and Celery process.
+    Waiters block until the holder is done (or its lock expires) and then re-read the account,
+    so only one of them ever spends the refresh token. SoundCloud rotates refresh tokens,
+    so a second concurrent refresh would fail and wipe the account.
 
+    Yields whether the lock was taken. Without it (holder still busy, Redis down) callers may
+    only reuse a token someone else stored; see _refresh_lock_missed.
+    """
+    lock = redis_client.lock(
+        f"lock:token_refresh:{platform}:{account_id}",
+        timeout=TOKEN_REFRESH_LOCK_TIMEOUT,
+        blocking_timeout=TOKEN_REFRESH_LOCK_TIMEOUT + 5
+    )
+    acquired = False
     try:
-        # Decrypt refresh token before using
-        decrypted_refresh = decrypt_token(account.refresh_token)
-        token_data = refresh_spotify_access_token(decrypted_refresh)
-    except Exception as e:
-        logger.error("Spotify token refresh failed for platform_account_id=%s: %s", account.id, e)
-        
-        # Mark as disconnected in DB so status check fails
-        account.refresh_token = None
+        acquired = lock.acquire()
+    except redis.exceptions.RedisError as e:
+        logger.warning("Token refresh lock unavailable for %s account %s: %s", platform, account_id, e)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except redis.exceptions.RedisError:
+                # Held longer than the timeout (another process may own it now); it expires on its own
+                pass
+
+
+def _refresh_lock_missed(platform: str, account_id: int) -> ExternalAPIError:
+    """The error for a refresh that could not take the lock: retrying later beats spending the refresh token twice."""
+    logger.warning("Not refreshing %s token for account %s: the refresh lock was not acquired", platform, account_id)
+    return ExternalAPIError(
+        message=f"{platform} token refresh is busy for account {account_id}",
+        error_code=503, platform=platform,
+    )
+
+
+def get_valid_spotify_access_token(db, account: PlatformAccount, refresh_within: int | None = None) -> str:
+    """
+    Returns a valid Spotify access token, refreshing it (once across all processes) when expired.
+    `refresh_within` (seconds) also refreshes tokens that expire soon; used by the proactive renewal task.
+    """
+    # Warm path: already decrypted and checked by this process
+    if refresh_within is None:
+        cached = get_cached_access_token("spotify", account.id)
+        if cached:
+            return cached
+
+    logger.debug("get_valid_spotify_access_token START")
+    logger.debug("Account ID: %s", account.id)
+    logger.debug("Refresh token present: %s", bool(account.refresh_token))
+
+    valid_for = timedelta(seconds=refresh_within or 0)
+
+    # If token exists and is still valid → reuse
+    stored = _stored_token(account, valid_for)
+    if stored:
+        logger.debug("Reusing valid Spotify token for platform_account_id=%s (…%s)", account.id, stored[0][-6:])
+        cache_access_token("spotify", account.id, *stored)
+        return stored[0]
+
+    with token_refresh_lock("spotify", account.id) as locked:
+        # Another request or worker may have refreshed while we waited for the lock
+        db.refresh(account)
+        stored = _stored_token(account, valid_for)
+        if stored:
+            logger.info("Spotify token for platform_account_id=%s was refreshed concurrently, reusing it", account.id)
+            cache_access_token("spotify", account.id, *stored)
+            return stored[0]
+        if not locked:
+            raise _refresh_lock_missed("spotify", account.id)
+
+        # Refresh token
+        logger.info("Spotify token expired or missing for platform_account_id=%s. Refreshing…", account.id)
+        meta = account.meta_data or {}
+
+        try:
+            # Decrypt refresh token before using
+            decrypted_refresh = decrypt_token(account.refresh_token)
+            token_data = refresh_spotify_access_token(decrypted_refresh)
+        except Exception as e:
+            logger.error("Spotify token refresh failed for platform_account_id=%s: %s", account.id, e)
+            invalidate_access_token("spotify", account.id)
+            invalidate_profile(account.id)
+            
+            # Mark as disconnected in DB so status check fails
+            account.refresh_token = None
+            db.commit()
+            
+            # Explicit failure (frontend will redirect to login later)
+            raise AuthenticationError("Spotify authentication expired. Re-login required.")
+
+        account.meta_data = {
+            **meta,
+            "access_token": encrypt_token(token_data["access_token"]),
+            "expires_at": token_data["expires_at"],
+            "scope": token_data.get("scope"),
+            "token_type": token_data.get("token_type", "Bearer")
+        }
+
+        if not meta.get("profile"):
+            # Accounts connected before profiles were cached: fetch it once, off the action path
+            try:
+                user = SpotifyAdapter.for_account(token_data["access_token"], account.id).sp.current_user()
+                store_profile(account, user)
+            except Exception as e:
+                logger.warning("Could not cache Spotify profile for platform_account_id=%s: %s", account.id, e)
+
         db.commit()
-        
-        # Explicit failure (frontend will redirect to login later)
-        raise AuthenticationError("Spotify authentication expired. Re-login required.")
-
-    account.meta_data = {
-        **meta,
-        "access_token": encrypt_token(token_data["access_token"]),
-        "expires_at": token_data["expires_at"],
-        "scope": token_data.get("scope"),
-        "token_type": token_data.get("token_type", "Bearer")
-    }
+        # meta_data was rewritten; the next lookup reads the committed profile
+        invalidate_profile(account.id)
 
-    db.commit()
+    cache_access_token("spotify", account.id, token_data["access_token"], token_data["expires_at"])
     logger.info("Returning refreshed Spotify access token for platform_account_id=%s", account.id)
     return token_data["access_token"]
 
@@ -112,7 +209,7 @@ def sync_spotify_library(platform_account_id: int):
             logger.error(f"No account or refresh_token found for ID {platform_account_id}. Aborting sync.")
             return
         access_token = get_valid_spotify_access_token(db, account)
-        spotify_adapter = SpotifyAdapter(access_token=access_token)
+        spotify_adapter = SpotifyAdapter.for_account(access_token, account.id)
         sync_user_library(db, platform_account=account, adapter=spotify_adapter)
     except Exception as e:
         db.rollback()
@@ -146,7 +243,7 @@ def refresh_soundcloud_access_token(refresh_token: str) -> str:
         "client_secret": os.getenv("SOUNDCLOUD_CLIENT_SECRET"),
     }
 
-    resp = requests.post("https://secure.soundcloud.com/oauth/token", data=payload)
+    resp = soundcloud_session().post("https://secure.soundcloud.com/oauth/token", data=payload)
     resp.raise_for_status()
     data = resp.json()
     
@@ -158,60 +255,76 @@ def refresh_soundcloud_access_token(refresh_token: str) -> str:
         "scope": data.get("scope")
     }
 
-def get_valid_soundcloud_access_token(db, account: PlatformAccount) -> str:
+def get_valid_soundcloud_access_token(db, account: PlatformAccount, refresh_within: int | None = None) -> str:
     """
     Returns a valid access token. 
-    Checks expiration and refreshes if necessary, updating the DB.
+    Checks expiration and refreshes if necessary (once across all processes), updating the DB.
     """
+    if refresh_within is None:
+        cached = get_cached_access_token("soundcloud", account.id)
+        if cached:
+            return cached
+
     logger.debug("get_valid_soundcloud_access_token START for account %s", account.id)
-    meta = account.meta_data or {}
-    access_token = decrypt_token(meta.get("access_token"))
-    expires_at = meta.get("expires_at")
+
+    # Buffer of 5 minutes
+    valid_for = timedelta(seconds=max(refresh_within or 0, 300))
 
     # 1. Check validity
-    if access_token and expires_at:
+    stored = _stored_token(account, valid_for)
+    if stored:
+        cache_access_token("soundcloud", account.id, stored[0], stored[1] - timedelta(minutes=5))
+        return stored[0]
+
+    with token_refresh_lock("soundcloud", account.id) as locked:
+        # SoundCloud rotates refresh tokens: re-read, another worker may already have used ours
+        db.refresh(account)
+        stored = _stored_token(account, valid_for)
+        if stored:
+            logger.info("SoundCloud token for account %s was refreshed concurrently, reusing it", account.id)
+            cache_access_token("soundcloud", account.id, stored[0], stored[1] - timedelta(minutes=5))
+            return stored[0]
+        if not locked:
+            raise _refresh_lock_missed("soundcloud", account.id)
+
+        # 2. Refresh
+        logger.info("SoundCloud token expired/missing (ID: %s). Refreshing...", account.id)
+        meta = account.meta_data or {}
+        
+        if not account.refresh_token:
+             raise ValueError("No refresh token available for SoundCloud account.")
+
         try:
-            expires_dt = datetime.fromisoformat(expires_at)
-            if expires_dt.tzinfo is None:
-                expires_dt = expires_dt.replace(tzinfo=timezone.utc)
-            
-            # Buffer of 5 minutes
-            if datetime.now(timezone.utc) < (expires_dt - timedelta(minutes=5)):
-                return access_token
+            decrypted_refresh = decrypt_token(account.refresh_token)
+            token_data = refresh_soundcloud_access_token(decrypted_refresh)
         except Exception as e:
-            logger.warning("Invalid expires_at for SC account %s: %s", account.id, e)
-
-    # 2. Refresh
-    logger.info("SoundCloud token expired/missing (ID: %s). Refreshing...", account.id)
-    
-    if not account.refresh_token:
-         raise ValueError("No refresh token available for SoundCloud account.")
-
-    try:
-        decrypted_refresh = decrypt_token(account.refresh_token)
-        token_data = refresh_soundcloud_access_token(decrypted_refresh)
-    except Exception as e:
-        logger.error("SoundCloud refresh failed: %s", e)
+            logger.error("SoundCloud refresh failed: %s", e)
+            invalidate_access_token("soundcloud", account.id)
+            
+            # Mark as disconnected in DB
+            account.refresh_token = None
+            db.commit()
+            
+            raise AuthenticationError("SoundCloud authentication expired. Re-login required.")
+
+        # 3. Update DB
+        # Update refresh token if shifted
+        if token_data.get("refresh_token"):
+            account.refresh_token = encrypt_token(token_data["refresh_token"])
+
+        account.meta_data = {
+            **meta,
+            "access_token": encrypt_token(token_data["access_token"]),
+            "expires_at": token_data["expires_at"],
+            "scope": token_data.get("scope")
+        }
         
-        # Mark as disconnected in DB
-        account.refresh_token = None
         db.commit()
-        
-        raise AuthenticationError("SoundCloud authentication expired. Re-login required.")
-
-    # 3. Update DB
-    # Update refresh token if shifted
-    if token_data.get("refresh_token"):
-        account.refresh_token = encrypt_token(token_data["refresh_token"])
-
-    account.meta_data = {
-        **meta,
-        "access_token": encrypt_token(token_data["access_token"]),
-        "expires_at": token_data["expires_at"],
-        "scope": token_data.get("scope")
-    }
-    
-    db.commit()
+
+    cache_access_token(
+        "soundcloud", account.id, token_data["access_token"],
+        datetime.fromisoformat(token_data["expires_at"]) - timedelta(minutes=5)
+    )
     logger.info("Refreshed SoundCloud token for account %s", account.id)
     return token_data["access_token"]
 
@@ -273,6 +386,55 @@ def refresh_all_soundcloud_libraries():
     finally:
         db.close()
 
+# ---------------------------- PROACTIVE TOKEN RENEWAL ------------------------------
+
+
+@celery_app.task(name="refresh_expiring_tokens")
+def refresh_expiring_tokens():
+    """
+    Renews the tokens of recently active accounts a few minutes before they expire,
+    so no user request has to wait on an OAuth round trip.
+    """
+    db = SessionLocal()
+    refreshed = 0
+    try:
+        since = datetime.now(timezone.utc) - timedelta(minutes=ACTIVE_ACCOUNT_WINDOW_MINUTES)
+        active_ids = [
+            row[0] for row in
+            db.query(InteractionLog.platform_account_id)
+            .filter(InteractionLog.timestamp >= since, InteractionLog.platform_account_id.isnot(None))
+            .distinct()
+        ]
+        if not active_ids:
+            return 0
+
+        accounts = (
+            db.query(PlatformAccount)
+            .filter(PlatformAccount.id.in_(active_ids), PlatformAccount.refresh_token.isnot(None))
+            .all()
+        )
+        ahead = timedelta(seconds=PROACTIVE_REFRESH_AHEAD_SECONDS)
+
+        for account in accounts:
+            if _stored_token(account, ahead):
+                continue
+            try:
+                if account.platform_name == "spotify":
+                    get_valid_spotify_access_token(db, account, refresh_within=PROACTIVE_REFRESH_AHEAD_SECONDS)
+                elif account.platform_name == "soundcloud" and is_soundcloud_enabled():
+                    get_valid_soundcloud_access_token(db, account, refresh_within=PROACTIVE_REFRESH_AHEAD_SECONDS)
+                else:
+                    continue
+                refreshed += 1
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Proactive token refresh failed for account {account.id}: {e}")
+
+        logger.info(f"Proactively refreshed {refreshed} of {len(accounts)} active account tokens.")
+        return refreshed
+    finally:
+        db.close()
+
 # ---------------------------- DELETE OLD ENTRIES ------------------------------
 
 
@@ -1,3 +1,4 @@
+import time
 import logging
 import asyncio
 import base64
@@ -7,12 +8,18 @@ from backend.services.music_action_service import MusicActionService
 from backend.services.text_to_speech import TextToSpeechService
 from backend.services.session_manager import SessionManager
 from backend.utils.action_params import ACTION_REQUIRED_PARAMS
-from backend.adapters.spotify_adapter import SpotifyAdapter
 from backend.services.data_sync_service import get_valid_spotify_access_token, get_valid_soundcloud_access_token
-from backend.models.database_models import PlatformAccount, InteractionLog
+from backend.services.token_cache import get_cached_access_token
+from backend.models.database_models import PlatformAccount
+from backend.configurations.database import SessionLocal
+from backend.services.interaction_log_writer import interaction_log_writer
+from backend.services.playback_poller import playback_poller
+from backend.utils.feature_flags import is_playback_poller_enabled, is_async_spotify_adapter_enabled
 from backend.utils.action_fallbacks import ACTION_FALLBACK_MAP
-from backend.socket_manager import emit_state 
-from backend.utils.custom_exceptions import ExternalAPIError, DeviceNotFoundException 
+from backend.utils.action_dependencies import plan_action_batches
+from backend.utils.tracing import span, in_trace_context
+from backend.socket_manager import emit_state
+from backend.utils.custom_exceptions import ExternalAPIError, DeviceNotFoundException, AuthenticationError
 from backend.utils.error_translator import get_user_friendly_error_message
 
 logger = logging.getLogger(__name__)
@@ -38,15 +45,28 @@ class DialogManager:
                 return canonical
         return None
 
-    def _get_platform_credentials(self) -> dict:
+    def _cached_credentials(self) -> dict | None:
+        """Warm path: token already decrypted by this process -> no DB query, no decryption."""
+        if self.platform_account_id is not None and self.platform in ("spotify", "soundcloud"):
+            cached_token = get_cached_access_token(self.platform, self.platform_account_id)
+            if cached_token:
+                return {"platform": self.platform, "credentials": {"access_token": cached_token}}
+        return None
+
+    def _get_platform_credentials(self, db: Session | None = None) -> dict:
         """
         Return credentials needed by the platform adapter, based on self.platform
-        and self.platform_account_id.
+        and self.platform_account_id. A cold lookup queries `db` (the request session
+        by default) and may refresh the token, waiting on the cross-process refresh lock.
         """
-        
+        cached = self._cached_credentials()
+        if cached:
+            return cached
+
         if self.platform_account_id is not None:
+            db = db or self.db
             account = (
-                self.db.query(PlatformAccount)
+                db.query(PlatformAccount)
                 .filter_by(id=self.platform_account_id)
                 .first()
             )
@@ -54,11 +74,11 @@ class DialogManager:
                 raise ValueError("Platform account not found")
 
             if self.platform == "spotify":
-                access_token = get_valid_spotify_access_token(self.db, account)
+                access_token = get_valid_spotify_access_token(db, account)
                 return {"platform": "spotify", "credentials" : {"access_token": access_token}}
             
             if self.platform == "soundcloud":
-                access_token = get_valid_soundcloud_access_token(self.db, account)
+                access_token = get_valid_soundcloud_access_token(db, account)
                 return {"platform": "soundcloud", "credentials" : {"access_token": access_token}}
 
             raise ValueError(f"Unsupported platform: {self.platform}")
@@ -78,23 +98,33 @@ class DialogManager:
             clean_p = p.rstrip("?")
             
             if not is_optional:
-                # Value must be present and truthy (or at least not None/empty)
-                if clean_p not in parameters or parameters[clean_p] is None:
-                    missing.append(clean_p)
+                # Value must be present and truthy (or at least not None/empty);
+                # "a|b" is satisfied by either parameter and asked for as "a"
+                alternatives = clean_p.split("|")
+                if all(parameters.get(alt) in (None, []) for alt in alternatives):
+                    missing.append(alternatives[0])
         
         return missing
 
-    async def _handle_music_action(self, action: str, parameters: dict):
+    async def _handle_music_action(self, action: str, parameters: dict, db: Session | None = None):
         """
         Executes a music action via the music service.
+        `db` is the action's own session (see _run_action); the request session is the fallback.
         """
         complete_params = dict(parameters)
-        complete_params["db_session"] = self.db
+        complete_params["db_session"] = db or self.db
         complete_params["platform_account_id"] = self.platform_account_id
 
         logger.debug("_handle_music_action | platform=%s | platform_account_id=%s", self.platform, self.platform_account_id)
 
-        creds = self._get_platform_credentials()
+        with span("credentials"):
+            creds = self._cached_credentials()
+            if not creds:
+                # A cold lookup queries the DB and may wait up to the refresh lock timeout: keep it off the loop
+                loop = asyncio.get_running_loop()
+                creds = await loop.run_in_executor(
+                    None, in_trace_context(self._get_platform_credentials), complete_params["db_session"]
+                )
 
         if (
             not creds
@@ -112,71 +142,98 @@ class DialogManager:
         if not access_token:
             raise RuntimeError("Resolved access_token is None — refusing to init adapter")
 
+        if platform not in ("spotify", "soundcloud"):
+            raise ValueError(f"Unsupported platform: {platform}")
 
-        # ---------- Spotify path ----------
-        if platform == "spotify":
-            complete_params["access_token"] = access_token
-            adapter = SpotifyAdapter(access_token=access_token)
-            current_user = adapter.sp.current_user()
-            complete_params["user_id"] = current_user["id"]
-            complete_params["user_display_name"] = current_user.get("display_name")
+        # The Spotify profile is not resolved here: only create_playlist needs it and reads it from the profile cache
+        complete_params["access_token"] = access_token
 
-        elif platform == "soundcloud":
-             complete_params["access_token"] = access_token
-             # SoundCloud adapter handles user resolution internally
-             pass
+        logger.debug(f"Action: {action}, Parameters sent to MusicActionService: {complete_params}")
 
-        else:
-            raise ValueError(f"Unsupported platform: {platform}")
+        with span("adapter"):
+            if (
+                platform == "spotify" and is_async_spotify_adapter_enabled()
+                and action in MusicActionService.ASYNC_SPOTIFY_ACTIONS
+            ):
+                # Awaited on the loop: no executor thread is held while Spotify answers
+                result = await MusicActionService.perform_music_action_async(action, platform, complete_params)
+            else:
+                # Execute in thread executor to prevent blocking the async loop as adapter calls are synchronous 'requests'
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    None, 
+                    in_trace_context(MusicActionService.perform_music_action), 
+                    action, 
+                    platform, 
+                    complete_params
+                )
+
+        if platform == "spotify" and is_playback_poller_enabled():
+            # Keeps the now-playing snapshot of an active session warm and pushes external changes
+            playback_poller.watch(self.platform_account_id, access_token, self.session_id)
+        return result
+
+    async def _run_action(self, action: str, params: dict, immediate: bool):
+        """
+        Runs one planned action. Returns the action result, or None for failed metadata lookups.
+        The action gets its own session: it may run in a worker thread, and the request
+        session must stay on the loop thread.
+        """
+        db = SessionLocal()
+        try:
+            if immediate:
+                await emit_state(self.session_id, "SPEAKING", f"Executing {action}...")
+                return await self._handle_music_action(action, params, db=db)
+
+            meta_params = dict(params)
+            meta_params["resolve_only"] = True
+            try:
+                return await self._handle_music_action(action, meta_params, db=db)
+            except AuthenticationError:
+                raise
+            except Exception as e:
+                logger.warning(f"Metadata resolution warning: {e}")
+                return None
+        finally:
+            db.close()
 
-        # Execute in thread executor to prevent blocking the async loop as adapter calls are synchronous 'requests'
-        loop = asyncio.get_running_loop()
-        
-        logger.debug(f"Action: {action}, Parameters sent to MusicActionService: {complete_params}")
-        
-        return await loop.run_in_executor(
-            None, 
-            MusicActionService.perform_music_action, 
-            action, 
-            platform, 
-            complete_params
-        )
-    
     def _log_interaction(self, user_input: str, llm_response: dict, final_action: str | None):
         """
         Persist a single user ↔ LLM interaction for future analysis / fine-tuning.
+        Queued for the background batch writer, so the turn never waits on a commit.
         """
         try:
-            log = InteractionLog(
+            interaction_log_writer.submit(
                 platform_account_id=self.platform_account_id,
                 session_id=self.session_id,
                 user_input=user_input,
                 llm_response=llm_response,
                 final_action=final_action
             )
-            self.db.add(log)
-            self.db.commit()
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Failed to log interaction: {e}")
+            logger.error(f"Failed to queue interaction log: {e}")
 
 
     async def execute_action(self, action: str, params: dict):
         """Public wrapper to execute a specific action (used for deferred playback)."""
         logger.info(f"Executing deferred action: {action}")
-        return await self._handle_music_action(action, params)
+        db = SessionLocal()
+        try:
+            return await self._handle_music_action(action, params, db=db)
+        finally:
+            db.close()
 
     async def process_request(self, user_input: str):
         # Notify Frontend: Thinking
-        await emit_state("THINKING", "Processing intent...")
+        await emit_state(self.session_id, "THINKING", "Processing intent...")
 
         action_keys = MusicActionService.get_action_keys(platform=self.platform)
 
-        # Get pending context
-        pending_context = self.session_manager.get_pending_context(self.session_id)
+        # Get pending context + history (one Redis round trip; the pending context is cleared on read)
+        with span("session_load"):
+            pending_context, turns = self.session_manager.load_turn_context(self.session_id)
 
         # Build Prompt
-        turns = self.session_manager.get_turn_history(self.session_id)
         if turns:
             history_parts = []
             for i, m in enumerate(turns):
@@ -204,7 +261,8 @@ class DialogManager:
         loop = asyncio.get_running_loop()
         
         # Step 1: Intent Recognition (LLM)
-        nlp_result = await loop.run_in_executor(None, call_llm_agent, prompt_input, True, action_keys)
+        with span("llm"):
+            nlp_result = await loop.run_in_executor(None, in_trace_context(call_llm_agent), prompt_input, True, action_keys)
         
         logger.debug(f"LLM returned: {nlp_result}")
         logger.debug(f"LLM Response: {nlp_result}")
@@ -212,18 +270,22 @@ class DialogManager:
         actions = nlp_result.get("actions", [])
         final_reply = nlp_result.get("reply", "Sorry, I'm not sure how to help with that.")
 
-        # Update History
-        self.session_manager.add_turn_history(self.session_id, role="user", text=user_input)
-        self.session_manager.add_turn_history(self.session_id, role="assistant", text=final_reply)
+        # History is written together with the pending context in one round trip at the end of the turn
+        turn_messages = [("user", user_input), ("assistant", final_reply)]
 
         if not actions:
             logger.info("LLM returned no actions. Proceeding with conversation only.")
+            with span("session_commit"):
+                self.session_manager.commit_turn(self.session_id, turn_messages)
             
             # Generate TTS for simple reply
             try:
-                audio_bytes = await loop.run_in_executor(None, TextToSpeechService.synthesize_speech, final_reply)
+                with span("tts"):
+                    audio_bytes = await loop.run_in_executor(None, in_trace_context(TextToSpeechService.synthesize_speech), final_reply)
                 if audio_bytes:
-                    return {"reply": final_reply, "audio_base64": base64.b64encode(audio_bytes).decode('utf-8'), "executed": False}
+                    with span("base64"):
+                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+                    return {"reply": final_reply, "audio_base64": audio_base64, "executed": False}
             except Exception as e:
                 logger.error(f"TTS Failed: {e}")
             
@@ -233,7 +295,8 @@ class DialogManager:
         async def generate_tts(text):
             try:
                 if not text: return None
-                return await loop.run_in_executor(None, TextToSpeechService.synthesize_speech, text)
+                with span("tts"):
+                    return await loop.run_in_executor(None, in_trace_context(TextToSpeechService.synthesize_speech), text)
             except Exception as e:
                 logger.error(f"TTS Generation failed: {e}")
                 return None
@@ -258,7 +321,8 @@ class DialogManager:
         error_occurred = False
         error_msg = ""
 
-        # Processing Actions
+        # Validate every action first; the ones before a missing-parameter action still run
+        steps = []
         for act_entry in actions:
             raw_action = act_entry.get("action")
             action = self.normalize_action(raw_action, action_keys)
@@ -274,22 +338,72 @@ class DialogManager:
                     "pending_parameters": params,
                     "missing_params": missing_params
                 }
-                # If missing some parameters, change the reply to ask for them.
-                final_reply = f"Please provide: {missing_params[0]} for action {action}."
                 error_occurred = True
                 break
 
-            try:
-                if action in IMMEDIATE_ACTIONS:
-                    await emit_state("SPEAKING", f"Executing {action}...") 
-                    result = await self._handle_music_action(action, params)
-                    overall_results.append(result)
+            steps.append((action, params))
+
+        # Playback-changing actions keep their order; independent library/metadata
+        # actions in between run concurrently. Results are merged in the original order.
+        batches = plan_action_batches(steps)
+        actions_start = time.perf_counter()
+
+        for batch in batches:
+            outcomes = await asyncio.gather(
+                *(
+                    self._run_action(steps[i][0], steps[i][1], steps[i][0] in IMMEDIATE_ACTIONS)
+                    for i in batch
+                ),
+                return_exceptions=True
+            )
+
+            for i, outcome in zip(batch, outcomes):
+                action, params = steps[i]
+                immediate = action in IMMEDIATE_ACTIONS
+
+                if isinstance(outcome, AuthenticationError):
+                    # Re-raise to let the global exception handler return 401
+                    self.session_manager.commit_turn(self.session_id, turn_messages)
+                    raise outcome
+
+                if isinstance(outcome, DeviceNotFoundException):
+                    # Handle device not found with user-friendly message
+                    logger.error(f"Device not found during action execution: {outcome.message}")
+                    user_friendly_msg = get_user_friendly_error_message(
+                        error_code="no_device",
+                        platform=self.platform,
+                        action=action,
+                        original_message=str(outcome)
+                    )
+                    final_reply = user_friendly_msg
+                    error_occurred = True
+                    error_msg = user_friendly_msg
+                    continue
+
+                if isinstance(outcome, ExternalAPIError):
+                    # Handle API errors with user-friendly messages
+                    logger.error(f"API error during action execution: {outcome.message}")
+                    user_friendly_msg = outcome.user_friendly_message()
+                    final_reply = user_friendly_msg
+                    error_occurred = True
+                    error_msg = user_friendly_msg
+                    continue
+
+                if isinstance(outcome, Exception):
+                    logger.error(f"Action execution failed: {outcome}", exc_info=outcome)
+                    final_reply = f"I encountered an error: {str(outcome)}"
+                    error_occurred = True
+                    error_msg = str(outcome)
+                    continue
+
+                if immediate:
+                    overall_results.append(outcome)
                     final_action_executed = action
-                    
+
                     # If the action returned a user-facing string (e.g., error message or confirmation),
                     # let it override the LLM's optimistic reply.
-                    if isinstance(result, str) and result:
-                        final_reply = result
+                    if isinstance(outcome, str) and outcome:
+                        final_reply = outcome
                         error_occurred = True 
 
                     command_payload = {
@@ -297,16 +411,8 @@ class DialogManager:
                         "params": params,
                         "timing": "IMMEDIATE"
                     }
-                    self.session_manager.clear_session_state(self.session_id)
-                
                 else:
-                    meta_params = dict(params)
-                    meta_params["resolve_only"] = True
-                    try:
-                        meta_result = await self._handle_music_action(action, meta_params)
-                        if meta_result: overall_results.append(meta_result)
-                    except Exception as e:
-                        logger.warning(f"Metadata resolution warning: {e}")
+                    if outcome: overall_results.append(outcome)
 
                     command_payload = {
                         "type": action,
@@ -315,45 +421,24 @@ class DialogManager:
                     }
                     final_action_executed = action 
 
+        if len(steps) > 1:
+            logger.info(
+                "Multi-action turn | session=%s | actions=%s | batches=%s | actions_ms=%s",
+                self.session_id, len(steps), len(batches), round((time.perf_counter() - actions_start) * 1000, 1)
+            )
 
-            except DeviceNotFoundException as e:
-                # Handle device not found with user-friendly message
-                logger.error(f"Device not found during action execution: {e.message}")
-                user_friendly_msg = get_user_friendly_error_message(
-                    error_code="no_device",
-                    platform=self.platform,
-                    action=action,
-                    original_message=str(e)
-                )
-                final_reply = user_friendly_msg
-                error_occurred = True
-                error_msg = user_friendly_msg
-            
-            except ExternalAPIError as e:
-                # Handle API errors with user-friendly messages
-                logger.error(f"API error during action execution: {e.message}")
-                user_friendly_msg = e.user_friendly_message()
-                final_reply = user_friendly_msg
-                error_occurred = True
-                error_msg = user_friendly_msg
-
-            except AuthenticationError:
-                # Re-raise to let the global exception handler return 401
-                raise
-            
-            except Exception as e:
-                logger.error(f"Action execution failed: {e}", exc_info=True)
-                final_reply = f"I encountered an error: {str(e)}"
-                error_occurred = True
-                error_msg = str(e)
+        if pending_action_info:
+            # If missing some parameters, change the reply to ask for them.
+            final_reply = f"Please provide: {pending_action_info['missing_params'][0]} for action {pending_action_info['pending_action']}."
 
         # --- SYNC POINT ---
         # Wait for TTS to finish
         audio_bytes = None
         
         if not error_occurred and not pending_action_info:
-            # Optimistic case: All good.
-            audio_bytes = await tts_task
+            # Optimistic case: All good. Only the part of TTS not hidden behind the actions is waited for
+            with span("tts_wait"):
+                audio_bytes = await tts_task
         else:
             # Failure/Change case: Cancel old TTS, generate new one.
             tts_task.cancel()
@@ -370,19 +455,17 @@ class DialogManager:
         }
         
         if audio_bytes:
-            response_data["audio_base64"] = base64.b64encode(audio_bytes).decode("utf-8")
+            with span("base64"):
+                response_data["audio_base64"] = base64.b64encode(audio_bytes).decode("utf-8")
+
+        # Save history (and pending context, if any) in one round trip
+        with span("session_commit"):
+            self.session_manager.commit_turn(self.session_id, turn_messages, pending=pending_action_info)
 
-        # Handle Pending Context Save
         if pending_action_info:
-            self.session_manager.save_pending_context(
-                self.session_id,
-                pending_action_info['pending_action'],
-                pending_action_info['pending_parameters'],
-                pending_action_info['missing_params']
-            )
             response_data["status"] = "PENDING_INPUT"
         else:
-             self._log_interaction(user_input, nlp_result, final_action_executed)
+            with span("logging"):
+                self._log_interaction(user_input, nlp_result, final_action_executed)
 
         return response_data
-
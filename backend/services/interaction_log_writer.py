@@ -0,0 +1,160 @@
+import os
+import time
+import asyncio
+import logging
+import datetime
+from typing import Callable
+from sqlalchemy import insert
+from backend.configurations.database import SessionLocal
+from backend.models.database_models import InteractionLog
+
+logger = logging.getLogger(__name__)
+
+INTERACTION_LOG_QUEUE_SIZE = int(os.getenv("INTERACTION_LOG_QUEUE_SIZE", 5000))
+INTERACTION_LOG_BATCH_SIZE = int(os.getenv("INTERACTION_LOG_BATCH_SIZE", 200))
+INTERACTION_LOG_FLUSH_SECONDS = float(os.getenv("INTERACTION_LOG_FLUSH_SECONDS", 1.0))
+
+
+class InteractionLogWriter:
+    """
+    Buffers InteractionLog rows in a bounded in-memory queue and writes them from a
+    background task, one multi-row INSERT per batch, on its own DB session.
+
+    A batch is written when it reaches `batch_size` rows or `flush_interval` seconds
+    after its first row, whichever comes first. When the queue is full the row is
+    dropped and counted rather than making the turn wait on the database.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        max_queue: int = INTERACTION_LOG_QUEUE_SIZE,
+        batch_size: int = INTERACTION_LOG_BATCH_SIZE,
+        flush_interval: float = INTERACTION_LOG_FLUSH_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._collecting: list[dict] = []  # batch being filled by the drain task
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio queues are bound to the loop they are first used on
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._task = None
+            self._loop = loop
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(), name="interaction-log-writer")
+
+    def start(self):
+        """Starts the drain task on the running loop (also done lazily by submit())."""
+        self._ensure_started()
+
+    def submit(self, platform_account_id: int | None, session_id: str, user_input: str,
+               llm_response: dict | None, final_action: str | None) -> bool:
+        """
+        Queues one interaction without blocking. Returns False if the row was dropped
+        because the queue is full.
+        """
+        row = {
+            "platform_account_id": platform_account_id,
+            "session_id": session_id,
+            "user_input": user_input,
+            "llm_response": llm_response,
+            "final_action": final_action,
+            # Stamped now, not when the batch lands
+            "timestamp": datetime.datetime.now(datetime.timezone.utc),
+        }
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"Interaction log queue full ({self._max_queue}), dropped {self.dropped} rows so far")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _next_batch(self) -> list[dict]:
+        batch = self._collecting = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        self._collecting = []
+        return batch
+
+    def _drain_nowait(self) -> list[dict]:
+        rows, self._collecting = self._collecting, []
+        while self._queue is not None and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    def _write_batch(self, rows: list[dict]):
+        db = self._session_factory()
+        try:
+            # executemany of a single INSERT: SQLAlchemy sends it as multi-row VALUES
+            db.execute(insert(InteractionLog), rows)
+            db.commit()
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            db.rollback()
+            self.failed += len(rows)
+            logger.error(f"Failed to write {len(rows)} interaction logs: {e}")
+        finally:
+            db.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            await loop.run_in_executor(None, self._write_batch, batch)
+
+    async def flush(self):
+        """Writes everything queued so far (in batches) from the calling task."""
+        loop = asyncio.get_running_loop()
+        rows = self._drain_nowait()
+        for start in range(0, len(rows), self.batch_size):
+            await loop.run_in_executor(None, self._write_batch, rows[start:start + self.batch_size])
+
+    async def stop(self):
+        """Stops the drain task and flushes what is left. Called on app shutdown."""
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        logger.info(f"Interaction log writer stopped | {self.stats()}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+interaction_log_writer = InteractionLogWriter()
@@ -1,26 +1,95 @@
+import os
 import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from backend.models.database_models import UserPlaylist, UserLikedSong, PlatformAccount
 from backend.utils.normalize_text import normalize_query
 
+# Liked-song playback trusts the synced library for this long after the last sync (runs every 6h)
+LIKED_LIBRARY_MAX_AGE_HOURS = float(os.getenv("LIKED_LIBRARY_MAX_AGE_HOURS", 24))
+# Unliked songs are deleted this many ids per statement (SQLite caps bound parameters)
+UNLIKED_DELETE_BATCH = 500
+
+
+def liked_at_now() -> str:
+    """Timestamp stored as meta_data["added_at"] for a song liked through SAM (Spotify's format)."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def local_liked_songs(db: Session, platform_account_id: int, limit: int, shuffle: bool = False) -> list:
+    """
+    Up to `limit` of the account's synced liked songs as (track_uri, meta_data) rows: most
+    recently liked first, or a random selection with `shuffle`, ordered and limited by the
+    database. Returns [] when nothing is synced yet or the last sync is stale, so callers
+    fall back to the platform API.
+    """
+    last_synced = db.query(PlatformAccount.last_synced).filter(PlatformAccount.id == platform_account_id).scalar()
+    if last_synced is None:
+        return []
+    if last_synced.tzinfo is None:
+        last_synced = last_synced.replace(tzinfo=datetime.timezone.utc)
+    if datetime.datetime.now(datetime.timezone.utc) - last_synced > datetime.timedelta(hours=LIKED_LIBRARY_MAX_AGE_HOURS):
+        return []
+
+    if shuffle:
+        order = (func.random(),)
+    else:
+        # The like date lives in meta_data (ISO strings sort chronologically); id breaks ties.
+        # Postgres puts NULLs first on DESC, so songs without a date go last explicitly
+        order = (UserLikedSong.meta_data["added_at"].as_string().desc().nullslast(), UserLikedSong.id.desc())
+    rows = (
+        db.query(UserLikedSong.track_uri, UserLikedSong.meta_data)
+        .filter(UserLikedSong.platform_account_id == platform_account_id)
+        .order_by(*order)
+        .limit(limit)
+        .all()
+    )
+    return [(row.track_uri, row.meta_data or {}) for row in rows]
+
+
 def sync_user_library(db: Session, platform_account: PlatformAccount, adapter):
 
-    # Sync liked songs
-    liked_songs_data = adapter.fetch_liked_tracks(limit=50)
-    new_songs = []
-    for song_data in liked_songs_data:
-        existing = db.query(UserLikedSong).filter_by(track_uri=song_data['uri']).first()
-        if not existing:
+    # Sync liked songs page by page as they arrive, one existence query per page
+    seen = set()
+    for page in adapter.iter_liked_track_pages():
+        songs = {}
+        for song_data in page:
+            if song_data.get('uri') and song_data['uri'] not in seen:
+                songs.setdefault(song_data['uri'], song_data)
+        if not songs:
+            continue
+        seen |= songs.keys()
+        existing = db.query(UserLikedSong).filter(
+            UserLikedSong.platform_account_id == platform_account.id,
+            UserLikedSong.track_uri.in_(songs),
+        )
+        for row in existing:
+            # Rows synced before the like date was stored get it now, so they order correctly
+            added_at = (songs.pop(row.track_uri).get('meta_data') or {}).get('added_at')
+            if added_at and (row.meta_data or {}).get('added_at') != added_at:
+                row.meta_data = {**(row.meta_data or {}), "added_at": added_at}
+        new_songs = []
+        for uri, song_data in songs.items():
             meta = song_data.get('meta_data', {}) or {}
             track_name = meta.get("album_name", "")
             meta["normalized_name"] = normalize_query(track_name) if track_name else ""
             new_songs.append(UserLikedSong(
                 platform_account_id=platform_account.id,
-                track_uri=song_data['uri'],
+                track_uri=uri,
                 meta_data=meta
             ))
-    if new_songs:
-        db.bulk_save_objects(new_songs)
+        if new_songs:
+            db.bulk_save_objects(new_songs)
+
+    # Songs unliked in the platform's own app: the pages above cover the whole library
+    unliked = [
+        song_id for song_id, uri in
+        db.query(UserLikedSong.id, UserLikedSong.track_uri).filter(UserLikedSong.platform_account_id == platform_account.id)
+        if uri not in seen
+    ]
+    for start in range(0, len(unliked), UNLIKED_DELETE_BATCH):
+        batch = unliked[start:start + UNLIKED_DELETE_BATCH]
+        db.query(UserLikedSong).filter(UserLikedSong.id.in_(batch)).delete(synchronize_session=False)
 
     # Sync playlists
     playlists_data = adapter.fetch_user_playlists() or []
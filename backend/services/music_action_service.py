@@ -1,11 +1,16 @@
 import logging
+import httpx
+import inspect
 import requests
 from typing import Dict
-from backend.adapters.spotify_adapter import SpotifyAdapter, NoActiveDeviceException
+from backend.adapters.spotify_adapter import SpotifyAdapter, NoActiveDeviceException, spotify_client_pool
+from backend.adapters.spotify_async_adapter import AsyncSpotifyAdapter
 from backend.adapters.soundcloud_adapter import SoundCloudAdapter
 from spotipy.exceptions import SpotifyException
 from backend.models.database_models import UserPlaylist, UserLikedSong, SearchCache, InteractionLog, PlatformAccount
 from backend.configurations.redis_client import redis_client
+from backend.services.profile_cache import get_spotify_profile, invalidate_profile
+from backend.services.token_cache import invalidate_access_token
 import json
 from sqlalchemy import desc
 from backend.utils.custom_exceptions import DeviceNotFoundException, ExternalAPIError, AuthenticationError
@@ -23,7 +28,10 @@ class MusicActionService:
                 "Credential resolution failed earlier in the pipeline."
             )
 
-        return SpotifyAdapter(token)
+        if parameters.get("async_adapter"):
+            # Set by perform_music_action_async: the action's adapter calls return coroutines
+            return AsyncSpotifyAdapter(token, parameters.get("platform_account_id"))
+        return SpotifyAdapter.for_account(token, parameters.get("platform_account_id"))
 
     @staticmethod
     def _get_soundcloud_adapter(parameters: Dict) -> SoundCloudAdapter:
@@ -148,17 +156,21 @@ class MusicActionService:
     def _spotify_play_liked_songs(parameters: Dict):
         return MusicActionService._get_spotify_adapter(parameters).play_liked_songs(
             parameters["db_session"],
-            parameters["platform_account_id"]
+            parameters["platform_account_id"],
+            shuffle=bool(parameters.get("shuffle"))
         )
 
     @staticmethod
     def _spotify_create_playlist(parameters: Dict):
-        return MusicActionService._get_spotify_adapter(parameters).create_playlist(
+        adapter = MusicActionService._get_spotify_adapter(parameters)
+        # Only action that needs the user profile; served from the profile cache, not the API
+        profile = get_spotify_profile(parameters["db_session"], parameters["platform_account_id"], fetch=adapter.sp.current_user) or {}
+        return adapter.create_playlist(
             parameters["db_session"],
             parameters["platform_account_id"],
-            parameters.get("user_id"),
+            parameters.get("user_id") or profile.get("id"),
             parameters.get("playlist_name"),
-            user_display_name=parameters.get("user_display_name")
+            user_display_name=parameters.get("user_display_name") or profile.get("display_name")
         )
 
     @staticmethod
@@ -170,41 +182,36 @@ class MusicActionService:
         )
 
     @staticmethod
-    def _spotify_add_to_playlist(parameters: Dict):
-        adapter = MusicActionService._get_spotify_adapter(parameters)
-        return adapter.add_tracks_to_playlist(
-            parameters["db_session"],
-            parameters["platform_account_id"],
-            adapter.resolve_playlist_id(
-                parameters["db_session"], 
-                parameters["platform_account_id"], 
-                parameters.get("playlist_name", "")
-            ),
-            adapter.search_track_uris(
-                parameters["db_session"],
-                parameters["platform_account_id"],
-                parameters.get("song_name", ""),
-                limit=1)
-            )
+    def _song_names(parameters: Dict) -> list:
+        """`song_names` (several songs) or `song_name` as a list."""
+        names = parameters.get("song_names") or parameters.get("song_name") or []
+        if isinstance(names, str):
+            names = [names]
+        return [name for name in names if name]
 
     @staticmethod
-    def _spotify_remove_from_playlist(parameters: Dict):
+    def _spotify_edit_playlist(parameters: Dict, write: str, verb: str):
         adapter = MusicActionService._get_spotify_adapter(parameters)
-        return adapter.remove_tracks_from_playlist(
+        playlist_id, uris, missing = adapter.resolve_playlist_edit(
             parameters["db_session"],
             parameters["platform_account_id"],
-            adapter.resolve_playlist_id(
-                parameters["db_session"],
-                parameters["platform_account_id"],
-                parameters.get("playlist_name", "")
-            ),
-            adapter.search_track_uris(
-                parameters["db_session"],
-                parameters["platform_account_id"],
-                parameters.get("song_name", ""),
-                limit=1
-            )
+            parameters.get("playlist_name", ""),
+            MusicActionService._song_names(parameters)
         )
+        if not uris:
+            raise ValueError(f"Couldn't find {', '.join(missing) or 'that song'} on Spotify.")
+        getattr(adapter, write)(parameters["db_session"], parameters["platform_account_id"], playlist_id, uris)
+        if missing:
+            # Partial success: tell the user which songs were skipped instead of the LLM's reply
+            return f"{verb} {len(uris)} song(s). I couldn't find: {', '.join(missing)}."
+
+    @staticmethod
+    def _spotify_add_to_playlist(parameters: Dict):
+        return MusicActionService._spotify_edit_playlist(parameters, "add_tracks_to_playlist", "Added")
+
+    @staticmethod
+    def _spotify_remove_from_playlist(parameters: Dict):
+        return MusicActionService._spotify_edit_playlist(parameters, "remove_tracks_from_playlist", "Removed")
 
     @staticmethod
     def _spotify_reorder_playlist(parameters: Dict):
@@ -276,11 +283,11 @@ class MusicActionService:
                 parameters["platform_account_id"], 
                 parameters.get("playlist_name", "")
             ),
-            adapter.search_track_uris(
-                parameters["db_session"],
-                parameters["platform_account_id"],
-                parameters.get("song_name", ""),
-                limit=1)
+            [
+                uri
+                for song_name in MusicActionService._song_names(parameters)
+                for uri in adapter.search_track_uris(parameters["db_session"], parameters["platform_account_id"], song_name, limit=1)
+            ]
             )
 
     @staticmethod
@@ -294,11 +301,11 @@ class MusicActionService:
                 parameters["platform_account_id"],
                 parameters.get("playlist_name", "")
             ),
-            adapter.search_track_uris(
-                parameters["db_session"],
-                parameters["platform_account_id"],
-                parameters.get("song_name", ""),
-                limit=1)
+            [
+                uri
+                for song_name in MusicActionService._song_names(parameters)
+                for uri in adapter.search_track_uris(parameters["db_session"], parameters["platform_account_id"], song_name, limit=1)
+            ]
         )
 
     @staticmethod
@@ -386,7 +393,8 @@ class MusicActionService:
     def _soundcloud_play_liked_songs(parameters: Dict):
         return MusicActionService._get_soundcloud_adapter(parameters).play_liked_songs(
             parameters["db_session"],
-            parameters["platform_account_id"]
+            parameters["platform_account_id"],
+            shuffle=bool(parameters.get("shuffle"))
         )
 
 
@@ -501,13 +509,43 @@ class MusicActionService:
                 logger.warning(f"Action '{action}' (method: {method_name}) is not implemented for platform '{platform}'.")
                 return "Platform not yet supported."
             
-        except NoActiveDeviceException:
+        except Exception as e:
+            raise MusicActionService._action_error(e, action, platform, parameters)
+
+    # Spotify actions AsyncSpotifyAdapter implements; the rest always run on SpotifyAdapter in a worker thread
+    ASYNC_SPOTIFY_ACTIONS = frozenset({
+        "play_song", "play_song_by_artist", "play_song_by_movie", "play_playlist_by_name",
+        "pause_song", "resume_song", "skip_song", "restart_song", "skip_time", "get_current_song",
+    })
+
+    @staticmethod
+    async def perform_music_action_async(action: str, platform: str, parameters: Dict = {}):
+        """
+        perform_music_action on the event loop, for the actions in ASYNC_SPOTIFY_ACTIONS:
+        the same action methods run against AsyncSpotifyAdapter and their result is awaited.
+        """
+        if platform != "spotify" or action not in MusicActionService.ASYNC_SPOTIFY_ACTIONS:
+            raise ValueError(f"Action '{action}' has no async implementation for platform '{platform}'")
+        method_name = f"_{platform}_{action}"
+        try:
+            logger.info("Executing action '%s' on platform '%s' via %s (async)", action, platform, method_name)
+            result = getattr(MusicActionService, method_name)({**parameters, "async_adapter": True})
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            raise MusicActionService._action_error(e, action, platform, parameters)
+
+    @staticmethod
+    def _action_error(e: Exception, action: str, platform: str, parameters: Dict) -> Exception:
+        """Translates an adapter error into the exception the dialog manager handles."""
+        if isinstance(e, NoActiveDeviceException):
             logger.warning("Action failed: No active Spotify device found.")
-            raise DeviceNotFoundException("No active Spotify device found. Please open Spotify on a device and play a song.")
-        
-        except SpotifyException as e:
+            return DeviceNotFoundException("No active Spotify device found. Please open Spotify on a device and play a song.")
+
+        if isinstance(e, SpotifyException):
             logger.error(f"A Spotify API error occurred for action '{action}': {e}")
-            
+
             # Extract HTTP status code
             from backend.utils.error_translator import extract_spotify_error_code
             error_code = extract_spotify_error_code(e)
@@ -518,39 +556,51 @@ class MusicActionService:
                 account_id = parameters.get("platform_account_id")
                 if db and account_id:
                     logger.warning(f"Spotify 401 Unauthorized. Invalidating token for account {account_id}.")
+                    spotify_client_pool.invalidate(account_id)
+                    invalidate_access_token("spotify", account_id)
+                    invalidate_profile(account_id)
                     account = db.query(PlatformAccount).filter_by(id=account_id).first()
                     if account:
                         account.refresh_token = None
                         db.commit()
                 # Raise Auth Error to redirect user
-                raise AuthenticationError("Spotify authentication expired. Re-login required.")
-            
-            raise ExternalAPIError(
+                return AuthenticationError("Spotify authentication expired. Re-login required.")
+
+            return ExternalAPIError(
                 message=f"Spotify API Error: {e.reason or str(e)}",
                 error_code=error_code,
                 platform="spotify",
                 action=action
             )
 
-        except requests.exceptions.HTTPError as e:
+        if isinstance(e, requests.exceptions.HTTPError):
             # FIX: Handle SoundCloud 401 Unauthorized
             if e.response.status_code == 401:
                 logger.error(f"SoundCloud 401 Unauthorized for action '{action}'. Invalidating token.")
-                
+
                 db = parameters.get("db_session")
                 account_id = parameters.get("platform_account_id")
+                if account_id:
+                    invalidate_access_token("soundcloud", account_id)
                 if db and account_id:
                      account = db.query(PlatformAccount).filter_by(id=account_id).first()
                      if account:
                          account.refresh_token = None
                          db.commit()
-                
-                raise AuthenticationError("SoundCloud authentication expired. Re-login required.")
-            
+
+                return AuthenticationError("SoundCloud authentication expired. Re-login required.")
+
             # Re-raise other HTTP errors
             logger.error(f"HTTP Error for action '{action}': {e}")
-            raise e
-        
-        except Exception as e:
-            logger.error(f"An unexpected error occurred for action '{action}': {e}", exc_info=True)
-            raise e
\ No newline at end of file
+            return e
+
+        # requests for the threaded adapters, httpx for AsyncSpotifyAdapter
+        if isinstance(e, (
+            requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+            httpx.TimeoutException, httpx.NetworkError,
+        )):
+            logger.error(f"{platform} did not respond for action '{action}': {e}")
+            return ExternalAPIError(message=str(e), error_code="network", platform=platform, action=action)
+
+        logger.error(f"An unexpected error occurred for action '{action}': {e}", exc_info=True)
+        return e
\ No newline at end of file
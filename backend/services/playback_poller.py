@@ -0,0 +1,207 @@
+import os
+import uuid
+import time
+import asyncio
+import logging
+import redis
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from spotipy.exceptions import SpotifyException
+from backend.adapters.spotify_adapter import SpotifyAdapter
+from backend.configurations.redis_client import redis_client
+from backend.services.token_cache import get_cached_access_token
+from backend.services.rate_limiter import rate_limit_lane, BACKGROUND
+from backend.services.playback_snapshot import snapshot_from_playback, peek_snapshot, store_snapshot, remaining_ms
+from backend.socket_manager import sio, session_room
+
+logger = logging.getLogger(__name__)
+
+PLAYBACK_POLL_FAST_SECONDS = float(os.getenv("PLAYBACK_POLL_FAST_SECONDS", 1.0))
+PLAYBACK_POLL_SECONDS = float(os.getenv("PLAYBACK_POLL_SECONDS", 5.0))
+PLAYBACK_POLL_IDLE_SECONDS = float(os.getenv("PLAYBACK_POLL_IDLE_SECONDS", 15.0))
+# Polls at the fast interval once the current track has less than this left
+PLAYBACK_POLL_NEAR_END_SECONDS = float(os.getenv("PLAYBACK_POLL_NEAR_END_SECONDS", 10.0))
+# An account stops being polled this long after its last turn
+PLAYBACK_WATCH_SECONDS = float(os.getenv("PLAYBACK_WATCH_SECONDS", 600))
+PLAYBACK_POLL_WORKERS = int(os.getenv("PLAYBACK_POLL_WORKERS", 4))
+
+
+def next_poll_interval(snapshot: dict | None) -> float:
+    """Fast near the end of a track, normal while playing, slow when paused or idle."""
+    if not snapshot or not snapshot.get("is_playing") or not snapshot.get("track"):
+        return PLAYBACK_POLL_IDLE_SECONDS
+    left = remaining_ms(snapshot)
+    if left is None:
+        return PLAYBACK_POLL_SECONDS
+    left_seconds = left / 1000
+    if left_seconds <= PLAYBACK_POLL_NEAR_END_SECONDS:
+        return PLAYBACK_POLL_FAST_SECONDS
+    # Wake up when the near-end window opens rather than overshooting it
+    return max(PLAYBACK_POLL_FAST_SECONDS, min(PLAYBACK_POLL_SECONDS, left_seconds - PLAYBACK_POLL_NEAR_END_SECONDS))
+
+
+def _state(snapshot: dict | None) -> tuple:
+    """The parts of a snapshot clients care about; progress alone is not a change."""
+    if not snapshot:
+        return (None, False, None, None)
+    return ((snapshot.get("track") or {}).get("uri"), snapshot.get("is_playing"), snapshot.get("volume_percent"), snapshot.get("device_id"))
+
+
+@dataclass
+class _Watch:
+    access_token: str
+    last_seen: float
+    sessions: set = field(default_factory=set)
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+
+class PlaybackPoller:
+    """
+    Keeps the Spotify playback snapshot (see playback_snapshot) fresh for accounts with
+    recent turns, so now-playing and volume reads are answered from Redis, and pushes
+    `now_playing` to the sessions' Socket.IO rooms when the track, play state, volume or
+    device changes outside of our own commands (track ended, user used another app).
+
+    One task per watched account on the running loop; Spotify and Redis calls run on a small
+    dedicated thread pool so polling never competes with turns for the default executor.
+    With several workers a short Redis lease makes sure only one of them polls an account.
+    """
+
+    def __init__(self, workers: int = PLAYBACK_POLL_WORKERS, watch_seconds: float = PLAYBACK_WATCH_SECONDS):
+        self._workers = max(1, workers)
+        self.watch_seconds = watch_seconds
+        self._accounts: dict[int, _Watch] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._owner = uuid.uuid4().hex
+        self.polls = 0
+        self.pushes = 0
+        self.errors = 0
+
+    def watch(self, platform_account_id: int, access_token: str, session_id: str | None = None, refresh: bool = False):
+        """
+        Called on the event loop after each Spotify turn: (re)starts polling the account,
+        remembers the session to push to, and with `refresh` polls right away.
+        """
+        if not (platform_account_id and access_token):
+            return
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and events are bound to the loop that created them
+            self._accounts.clear()
+            self._loop = loop
+
+        entry = self._accounts.get(platform_account_id)
+        if entry is None:
+            entry = self._accounts[platform_account_id] = _Watch(access_token=access_token, last_seen=time.monotonic())
+        entry.access_token = access_token
+        entry.last_seen = time.monotonic()
+        if session_id:
+            entry.sessions.add(session_id)
+        if entry.task is None or entry.task.done():
+            entry.task = loop.create_task(self._run(platform_account_id, entry), name=f"playback-poller-{platform_account_id}")
+        elif refresh:
+            entry.wake.set()
+
+    def _claim(self, platform_account_id: int, lease_seconds: float) -> bool:
+        """Takes or extends this process's lease on polling the account."""
+        key = f"spotify:poller:{platform_account_id}"
+        ttl = max(1, int(lease_seconds) + 1)
+        try:
+            if redis_client.set(key, self._owner, nx=True, ex=ttl):
+                return True
+            holder = redis_client.get(key)
+            if holder in (self._owner, self._owner.encode()):
+                redis_client.expire(key, ttl)
+                return True
+            return False
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Playback poller lease failed, polling anyway: {e}")
+            return True
+
+    def _poll_once(self, platform_account_id: int, access_token: str) -> tuple[dict | None, dict]:
+        """Runs in the poller pool. Returns (previous snapshot, new snapshot)."""
+        token = get_cached_access_token("spotify", platform_account_id) or access_token
+        adapter = SpotifyAdapter.for_account(token, platform_account_id)
+        previous = peek_snapshot(platform_account_id)
+        with rate_limit_lane(BACKGROUND):
+            snapshot = snapshot_from_playback(adapter.sp.current_playback())
+        store_snapshot(platform_account_id, snapshot)
+        if snapshot["device_id"]:
+            adapter.remember_device(snapshot["device_id"])
+        return previous, snapshot
+
+    async def _push(self, entry: _Watch, snapshot: dict):
+        payload = {k: v for k, v in snapshot.items() if k != "fetched_at"}
+        for session_id in list(entry.sessions):
+            await sio.emit("now_playing", payload, room=session_room(session_id))
+        self.pushes += 1
+
+    async def _run(self, platform_account_id: int, entry: _Watch):
+        loop = asyncio.get_running_loop()
+        # The turn that started the watch has usually just stored a snapshot
+        snapshot = await loop.run_in_executor(self._pool(), peek_snapshot, platform_account_id)
+        interval = next_poll_interval(snapshot) if snapshot else 0
+        try:
+            while time.monotonic() - entry.last_seen < self.watch_seconds:
+                if interval > 0:
+                    try:
+                        await asyncio.wait_for(entry.wake.wait(), timeout=interval)
+                    except asyncio.TimeoutError:
+                        pass
+                entry.wake.clear()
+
+                claimed = await loop.run_in_executor(
+                    self._pool(), self._claim, platform_account_id, PLAYBACK_POLL_IDLE_SECONDS * 2
+                )
+                if not claimed:
+                    # Another worker polls this account; keep watching in case it stops
+                    snapshot, interval = None, PLAYBACK_POLL_IDLE_SECONDS
+                    continue
+
+                try:
+                    previous, snapshot = await loop.run_in_executor(
+                        self._pool(), self._poll_once, platform_account_id, entry.access_token
+                    )
+                    self.polls += 1
+                    if _state(previous) != _state(snapshot):
+                        await self._push(entry, snapshot)
+                    interval = next_poll_interval(snapshot)
+                except SpotifyException as e:
+                    self.errors += 1
+                    if e.http_status == 401:
+                        logger.info(f"Stopped polling playback for account {platform_account_id}: token rejected")
+                        return
+                    logger.warning(f"Playback poll failed for account {platform_account_id}: {e}")
+                    snapshot, interval = None, PLAYBACK_POLL_IDLE_SECONDS
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Playback poll failed for account {platform_account_id}: {e}")
+                    snapshot, interval = None, PLAYBACK_POLL_IDLE_SECONDS
+        finally:
+            if self._accounts.get(platform_account_id) is entry:
+                del self._accounts[platform_account_id]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="playback-poller")
+        return self._executor
+
+    async def stop(self):
+        """Stops all polling (app shutdown)."""
+        tasks = [entry.task for entry in self._accounts.values() if entry.task and not entry.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._accounts.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info(f"Playback poller stopped | {self.stats()}")
+
+    def stats(self) -> dict:
+        return {"accounts": len(self._accounts), "polls": self.polls, "pushes": self.pushes, "errors": self.errors}
+
+
+playback_poller = PlaybackPoller()
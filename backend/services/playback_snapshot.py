@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import logging
+import redis
+from backend.configurations.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Readers fall back to a live current_playback() call when the snapshot is older than this
+PLAYBACK_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("PLAYBACK_SNAPSHOT_MAX_AGE_SECONDS", 20))
+# Kept in Redis a little longer than it is trusted, so the poller can diff against it
+PLAYBACK_SNAPSHOT_TTL_SECONDS = int(os.getenv("PLAYBACK_SNAPSHOT_TTL_SECONDS", 120))
+
+
+def _key(platform_account_id: int) -> str:
+    return f"spotify:now_playing:{platform_account_id}"
+
+
+def track_from_item(item: dict | None) -> dict | None:
+    """Keeps the fields of a Spotify track object that actions and clients need."""
+    if not item:
+        return None
+    images = (item.get("album") or {}).get("images") or []
+    return {
+        "id": item.get("id"),
+        "uri": item.get("uri"),
+        "name": item.get("name"),
+        "artists": [artist["name"] for artist in item.get("artists", [])],
+        "album_name": (item.get("album") or {}).get("name"),
+        "image": images[0]["url"] if images else None,
+        "duration_ms": item.get("duration_ms", 0),
+    }
+
+
+def snapshot_from_playback(playback: dict | None) -> dict:
+    """Normalizes a current_playback() response (None when nothing is playing)."""
+    playback = playback or {}
+    device = playback.get("device") or {}
+    return {
+        "fetched_at": time.time(),
+        "is_playing": bool(playback.get("is_playing")),
+        "progress_ms": playback.get("progress_ms"),
+        "device_id": device.get("id"),
+        "volume_percent": device.get("volume_percent"),
+        "track": track_from_item(playback.get("item")),
+    }
+
+
+def remaining_ms(snapshot: dict, now: float | None = None) -> float | None:
+    """Estimated time left in the current track, extrapolating progress while it plays."""
+    track = snapshot.get("track")
+    if not track or snapshot.get("progress_ms") is None or not track.get("duration_ms"):
+        return None
+    progress = snapshot["progress_ms"]
+    if snapshot.get("is_playing"):
+        progress += ((now or time.time()) - snapshot["fetched_at"]) * 1000
+    return track["duration_ms"] - progress
+
+
+def is_fresh(snapshot: dict, max_age: float | None = None, now: float | None = None) -> bool:
+    now = now or time.time()
+    if now - snapshot.get("fetched_at", 0) > (PLAYBACK_SNAPSHOT_MAX_AGE_SECONDS if max_age is None else max_age):
+        return False
+    # A playing track that should have ended by now has probably been replaced
+    left = remaining_ms(snapshot, now)
+    return left is None or left > 0
+
+
+def get_snapshot(platform_account_id: int, max_age: float | None = None) -> dict | None:
+    """The account's playback snapshot if it is fresh enough to answer from, else None."""
+    snapshot = peek_snapshot(platform_account_id)
+    if snapshot and is_fresh(snapshot, max_age):
+        return snapshot
+    return None
+
+
+def peek_snapshot(platform_account_id: int) -> dict | None:
+    """The stored snapshot regardless of age (for diffing)."""
+    try:
+        raw = redis_client.get(_key(platform_account_id))
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"Playback snapshot read failed: {e}")
+        return None
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def store_snapshot(platform_account_id: int, snapshot: dict):
+    try:
+        redis_client.set(_key(platform_account_id), json.dumps(snapshot), ex=PLAYBACK_SNAPSHOT_TTL_SECONDS)
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"Playback snapshot write failed: {e}")
+
+
+def update_snapshot(platform_account_id: int, **fields):
+    """
+    Applies the known effect of a command we just sent (e.g. volume_percent, is_playing)
+    to a fresh snapshot; a stale or missing one is left for the next read to replace.
+    """
+    snapshot = get_snapshot(platform_account_id)
+    if not snapshot:
+        return
+    if "is_playing" in fields and bool(fields["is_playing"]) != snapshot.get("is_playing"):
+        # Progress is extrapolated from fetched_at while playing: bring it up to now first
+        left = remaining_ms(snapshot)
+        if left is not None:
+            snapshot["progress_ms"] = snapshot["track"]["duration_ms"] - left
+        snapshot["fetched_at"] = time.time()
+    snapshot.update(fields)
+    store_snapshot(platform_account_id, snapshot)
+
+
+def invalidate_snapshot(platform_account_id: int):
+    try:
+        redis_client.delete(_key(platform_account_id))
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"Playback snapshot invalidation failed: {e}")
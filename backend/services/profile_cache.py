@@ -0,0 +1,76 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable
+from sqlalchemy.orm import Session
+from backend.models.database_models import PlatformAccount
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", 600))
+
+# account_id -> (expires_at monotonic, profile)
+_profiles: dict[int, tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def profile_from_user(user: dict) -> dict:
+    """Keeps the fields of a Spotify /me response that actions need."""
+    return {
+        "id": user.get("id"),
+        "display_name": user.get("display_name") or user.get("name"),
+        "email": user.get("email"),
+    }
+
+
+def _remember(account_id: int, profile: dict):
+    with _lock:
+        _profiles[account_id] = (time.monotonic() + PROFILE_TTL_SECONDS, profile)
+
+
+def store_profile(account: PlatformAccount, user: dict) -> dict:
+    """
+    Writes the profile into account.meta_data (the caller commits) and the in-process layer.
+    Called at OAuth callback and token refresh, so actions never have to ask Spotify.
+    """
+    profile = profile_from_user(user)
+    account.meta_data = {**(account.meta_data or {}), "profile": profile}
+    if account.id is not None:
+        _remember(account.id, profile)
+    return profile
+
+
+def invalidate_profile(account_id: int):
+    with _lock:
+        _profiles.pop(account_id, None)
+
+
+def get_spotify_profile(db: Session, platform_account_id: int, fetch: Callable[[], dict] | None = None) -> dict | None:
+    """
+    Returns {"id", "display_name", "email"} for the account:
+    in-process cache -> PlatformAccount.meta_data -> `fetch()` (one current_user() call, persisted).
+    """
+    with _lock:
+        entry = _profiles.get(platform_account_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    account = db.query(PlatformAccount).filter_by(id=platform_account_id).first()
+    if not account:
+        return None
+
+    meta = account.meta_data or {}
+    profile = meta.get("profile")
+    if not profile and account.platform_user_id:
+        # Accounts connected before profiles were cached still have the id and name from the callback
+        profile = {"id": account.platform_user_id, "display_name": meta.get("display_name"), "email": meta.get("email")}
+
+    if not profile and fetch:
+        logger.info(f"No cached Spotify profile for account {platform_account_id}, fetching it once")
+        profile = store_profile(account, fetch())
+        db.commit()
+
+    if profile:
+        _remember(platform_account_id, profile)
+    return profile
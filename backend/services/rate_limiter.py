@@ -0,0 +1,189 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import contextvars
+from contextlib import contextmanager
+import redis
+from backend.configurations.redis_client import redis_client
+from backend.utils.metrics import record_rate_limit_wait, record_rate_limited
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Spotify limits per app over a rolling window; these bound all processes together
+SPOTIFY_RATE_LIMIT_PER_SECOND = float(os.getenv("SPOTIFY_RATE_LIMIT_PER_SECOND", 10))
+SPOTIFY_RATE_LIMIT_BURST = int(os.getenv("SPOTIFY_RATE_LIMIT_BURST", 20))
+# Background calls only take a token while more than this many are left, so turns never queue behind a sync
+SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE = int(os.getenv("SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE", 10))
+# Longest a call waits for a token (or for a Retry-After to pass) before giving up with a 429
+RATE_LIMIT_MAX_WAIT_SECONDS = {
+    INTERACTIVE: float(os.getenv("RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS", 5)),
+    BACKGROUND: float(os.getenv("RATE_LIMIT_BACKGROUND_MAX_WAIT_SECONDS", 120)),
+}
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("rate_limit_lane", default=INTERACTIVE)
+
+# Takes one token if at least `floor` would remain, else returns the ms until that is possible.
+# Redis' clock is used so processes on different hosts agree on time.
+_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local blocked = tonumber(redis.call('GET', KEYS[2]) or '0')
+if blocked > now then
+    return blocked - now
+end
+local rate, burst, floor = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens >= floor + 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((floor + 1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+# Pushes the shared "blocked until" forward (never back) by Retry-After milliseconds
+_BLOCK = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local until_ms = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if until_ms > current then
+    redis.call('SET', KEYS[1], until_ms, 'PX', tonumber(ARGV[1]))
+end
+return until_ms - now
+"""
+
+
+class RateLimited(Exception):
+    """Raised when a call would have to wait longer than its lane allows."""
+    def __init__(self, message: str = "Rate limited", retry_after: float = 1.0):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+def enter_lane(lane: str) -> contextvars.Token:
+    return _lane.set(lane)
+
+
+def leave_lane(token: contextvars.Token):
+    _lane.reset(token)
+
+
+@contextmanager
+def rate_limit_lane(lane: str):
+    """Runs the block's upstream calls in `lane` (calls are interactive unless stated otherwise)."""
+    token = enter_lane(lane)
+    try:
+        yield
+    finally:
+        leave_lane(token)
+
+
+class RateLimiter:
+    """
+    Token bucket in Redis shared by every web and Celery worker calling one upstream.
+
+    Interactive calls may drain the bucket; background calls stop while only `reserve`
+    tokens are left, so a sync wave slows down instead of starving turns. A 429 from the
+    upstream blocks all lanes in all processes until its Retry-After has passed.
+    If Redis is unreachable calls go through unthrottled.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, reserve: int = 0):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.reserve = min(reserve, max(0, burst - 1))
+        self._bucket_key = f"ratelimit:{name}:bucket"
+        self._blocked_key = f"ratelimit:{name}:blocked_until"
+        self._acquire = redis_client.register_script(_ACQUIRE)
+        self._block = redis_client.register_script(_BLOCK)
+
+    def _try(self, lane: str) -> float:
+        """Seconds to wait before a token can be taken; 0 means one was taken."""
+        floor = self.reserve if lane == BACKGROUND else 0
+        wait_ms = self._acquire(
+            keys=[self._bucket_key, self._blocked_key], args=[self.rate, self.burst, floor], client=redis_client
+        )
+        return int(wait_ms) / 1000
+
+    def acquire(self, lane: str | None = None, max_wait: float | None = None) -> float:
+        """Blocks until a token is taken; returns the seconds waited. Raises RateLimited past `max_wait`."""
+        lane = lane or current_lane()
+        max_wait = RATE_LIMIT_MAX_WAIT_SECONDS.get(lane, RATE_LIMIT_MAX_WAIT_SECONDS[INTERACTIVE]) if max_wait is None else max_wait
+        start = time.monotonic()
+        waited = 0.0
+        while True:
+            try:
+                wait = self._try(lane)
+            except redis.exceptions.RedisError as e:
+                logger.warning(f"{self.name} rate limiter unavailable, not throttling: {e}")
+                return waited
+            if wait <= 0:
+                if waited > 0:
+                    record_rate_limit_wait(self.name, lane, waited)
+                return waited
+            if waited + wait > max_wait:
+                record_rate_limited(self.name, lane, "gave_up")
+                raise RateLimited(f"{self.name} rate limit: would wait {waited + wait:.1f}s", retry_after=wait)
+            # A little jitter so waiting workers do not all retry on the same millisecond
+            time.sleep(wait * (1 + random.random() * 0.1))
+            waited = time.monotonic() - start
+
+    async def acquire_async(self, lane: str | None = None, max_wait: float | None = None) -> float:
+        """
+        acquire() for the event loop: the Redis round trip runs on the default executor and
+        waits use asyncio.sleep, so the loop is never blocked.
+        """
+        lane = lane or current_lane()
+        max_wait = RATE_LIMIT_MAX_WAIT_SECONDS.get(lane, RATE_LIMIT_MAX_WAIT_SECONDS[INTERACTIVE]) if max_wait is None else max_wait
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        waited = 0.0
+        while True:
+            try:
+                wait = await loop.run_in_executor(None, self._try, lane)
+            except redis.exceptions.RedisError as e:
+                logger.warning(f"{self.name} rate limiter unavailable, not throttling: {e}")
+                return waited
+            if wait <= 0:
+                if waited > 0:
+                    record_rate_limit_wait(self.name, lane, waited)
+                return waited
+            if waited + wait > max_wait:
+                record_rate_limited(self.name, lane, "gave_up")
+                raise RateLimited(f"{self.name} rate limit: would wait {waited + wait:.1f}s", retry_after=wait)
+            await asyncio.sleep(wait * (1 + random.random() * 0.1))
+            waited = time.monotonic() - start
+
+    def block(self, retry_after: float):
+        """Honors an upstream Retry-After in every process."""
+        record_rate_limited(self.name, current_lane(), "upstream_429")
+        try:
+            self._block(keys=[self._blocked_key], args=[max(1, int(retry_after * 1000))], client=redis_client)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"{self.name} rate limiter could not record Retry-After: {e}")
+
+
+spotify_rate_limiter = RateLimiter(
+    "spotify",
+    rate=SPOTIFY_RATE_LIMIT_PER_SECOND,
+    burst=SPOTIFY_RATE_LIMIT_BURST,
+    reserve=SPOTIFY_RATE_LIMIT_BACKGROUND_RESERVE,
+)
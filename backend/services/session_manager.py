@@ -73,8 +73,18 @@ class SessionManager:
         """
         hk = SessionManager._history_key(session_id)
         raw = redis_client.lrange(hk, -limit, -1) or []
+        return SessionManager._decode_history(raw)
+
+    @staticmethod
+    def clear_turn_history(session_id: str):
+        hk = SessionManager._history_key(session_id)
+        redis_client.delete(hk)
+
+    # ---------- Batched per-turn access (one round trip each) ----------
+    @staticmethod
+    def _decode_history(raw: list) -> list:
         history = []
-        for item in raw:
+        for item in raw or []:
             try:
                 s = item.decode("utf-8") if isinstance(item, (bytes, bytearray)) else item
                 history.append(json.loads(s))
@@ -83,6 +93,44 @@ class SessionManager:
         return history
 
     @staticmethod
-    def clear_turn_history(session_id: str):
+    def load_turn_context(session_id: str, limit: int = MAX_HISTORY_MESSAGES) -> tuple[dict | None, list]:
+        """
+        Everything a turn needs to start, in a single MULTI/EXEC round trip:
+        reads and clears the pending context and reads the last `limit` history messages.
+        Returns (pending_context or None, history).
+        """
+        key = f"session:{session_id}"
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.get(key)
+        pipe.delete(key)
+        pipe.lrange(SessionManager._history_key(session_id), -limit, -1)
+        value, _, raw_history = pipe.execute()
+
+        pending = None
+        state = json.loads(value) if value else {}
+        if "pending_action" in state and "pending_parameters" in state:
+            pending = {"pending_action": state["pending_action"], "pending_parameters": state["pending_parameters"], "missing_params": state.get("missing_params", [])}
+        return pending, SessionManager._decode_history(raw_history)
+
+    @staticmethod
+    def commit_turn(session_id: str, messages: list[tuple[str, str]], pending: dict | None = None):
+        """
+        Writes the outcome of a turn in a single MULTI/EXEC round trip:
+        appends the (role, text) messages to the history (trimmed, TTL refreshed) and
+        saves the pending context when the turn is waiting for a missing parameter.
+        """
         hk = SessionManager._history_key(session_id)
-        redis_client.delete(hk)
\ No newline at end of file
+        pipe = redis_client.pipeline(transaction=True)
+        if messages:
+            pipe.rpush(hk, *[json.dumps({"role": role, "text": text}) for role, text in messages])
+            pipe.ltrim(hk, -MAX_HISTORY_MESSAGES, -1)
+            pipe.expire(hk, SESSION_TTL_SECONDS)
+        if pending:
+            state = {
+                "pending_action": pending["pending_action"],
+                "pending_parameters": pending["pending_parameters"],
+                "missing_params": pending.get("missing_params") or []
+            }
+            pipe.setex(f"session:{session_id}", SESSION_TTL_SECONDS, json.dumps(state))
+        pipe.execute()
+
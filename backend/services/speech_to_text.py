@@ -1,12 +1,35 @@
 import requests
+import httpx
 import os
+import uuid
 import logging
+from typing import AsyncIterator
 from dotenv import load_dotenv
+from backend.utils.custom_exceptions import AudioTooLargeError
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+GROQ_STT_URL = f"{GROQ_API_BASE}/audio/transcriptions"
+STT_MAX_UPLOAD_BYTES = int(os.getenv("STT_MAX_UPLOAD_BYTES", 25 * 1024 * 1024))
+
+# English-only prompt enforcement
+STT_PROMPT = (
+    "The transcript is in English alphabets only. "
+    "Even foreign words (like Telugu, Tamil, Hindi) are written strictly in English script (transliterated). "
+    "Example: Play nuvvu nenantu, play manasu palike. No native scripts."
+)
+
+STT_FORM_FIELDS = {
+    "model": "whisper-large-v3",
+    "temperature": "0",
+    "response_format": "json",
+    "language": "en",
+    "prompt": STT_PROMPT
+}
+
 class SpeechToTextService:
     @staticmethod
     def transcribe_audio(file_obj) -> str:
@@ -17,14 +40,7 @@ class SpeechToTextService:
         if not GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY is missing. Please get a free key from https://console.groq.com/keys and add it to your .env file.")
 
-        url = "https://api.groq.com/openai/v1/audio/transcriptions"
-        
-        # English-only prompt enforcement
-        prompt_text = (
-            "The transcript is in English alphabets only. "
-            "Even foreign words (like Telugu, Tamil, Hindi) are written strictly in English script (transliterated). "
-            "Example: Play nuvvu nenantu, play manasu palike. No native scripts."
-        )
+        url = GROQ_STT_URL
 
         headers = {
             "Authorization": f"Bearer {GROQ_API_KEY}"
@@ -39,13 +55,7 @@ class SpeechToTextService:
             files = {
                 "file": ("audio.wav", file_obj, "audio/wav")
             }
-            data = {
-                "model": "whisper-large-v3",
-                "temperature": "0",
-                "response_format": "json",
-                "language": "en",
-                "prompt": prompt_text
-            }
+            data = dict(STT_FORM_FIELDS)
             
             # Use a session with retry logic
             from requests.adapters import HTTPAdapter
@@ -76,3 +86,78 @@ class SpeechToTextService:
         except Exception as e:
             logger.error(f"Groq STT failed: {str(e)}", exc_info=True)
             raise e
+
+
+    @staticmethod
+    async def _multipart_body(
+        chunks: AsyncIterator[bytes],
+        boundary: str,
+        filename: str,
+        content_type: str,
+        max_bytes: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields a multipart/form-data body with the audio part streamed straight from `chunks`.
+        Raises AudioTooLargeError as soon as more than `max_bytes` of audio have been seen.
+        """
+        for name, value in STT_FORM_FIELDS.items():
+            yield (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode()
+
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+
+        total = 0
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise AudioTooLargeError(f"Audio exceeds the {max_bytes // (1024 * 1024)} MB transcription limit.")
+            yield chunk
+
+        yield f"\r\n--{boundary}--\r\n".encode()
+        logger.info(f"Streamed {total} audio bytes to Groq STT")
+
+    @staticmethod
+    async def transcribe_stream(
+        chunks: AsyncIterator[bytes],
+        filename: str = "audio.wav",
+        content_type: str = "audio/wav",
+        max_bytes: int = STT_MAX_UPLOAD_BYTES,
+        client: httpx.AsyncClient | None = None
+    ) -> str:
+        """
+        Transcribes audio without buffering it: each incoming chunk is forwarded into the
+        outbound multipart request as it arrives, so memory stays bounded by the chunk size.
+        The body can only be sent once, so unlike transcribe_audio there is no retry.
+        """
+        if not GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY is missing. Please get a free key from https://console.groq.com/keys and add it to your .env file.")
+
+        boundary = uuid.uuid4().hex
+        headers = {
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": f"multipart/form-data; boundary={boundary}"
+        }
+        body = SpeechToTextService._multipart_body(chunks, boundary, filename, content_type, max_bytes)
+
+        owns_client = client is None
+        client = client or httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0))
+        try:
+            response = await client.post(GROQ_STT_URL, headers=headers, content=body)
+        finally:
+            if owns_client:
+                await client.aclose()
+
+        if response.status_code != 200:
+            logger.error(f"Groq STT Error: {response.text}")
+            raise Exception(f"Groq STT API Failed: {response.status_code} - {response.text}")
+
+        transcript = response.json().get("text", "").strip()
+        logger.info(f"Groq Transcription (streamed): {transcript}")
+        return transcript
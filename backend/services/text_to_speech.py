@@ -6,6 +6,7 @@ import logging
 load_dotenv()
 logger = logging.getLogger(__name__)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
 
 class TextToSpeechService:
     @staticmethod
@@ -18,7 +19,7 @@ class TextToSpeechService:
             raise ValueError("GROQ_API_KEY is missing. Please ensure it is set in your .env file.")
 
         # Groq TTS Endpoint (OpenAI compatible)
-        url = "https://api.groq.com/openai/v1/audio/speech"
+        url = f"{GROQ_API_BASE}/audio/speech"
         
         headers = {
             "Authorization": f"Bearer {GROQ_API_KEY}",
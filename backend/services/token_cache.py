@@ -0,0 +1,59 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Tokens are treated as expired this many seconds early, so a turn never starts with a token about to die
+TOKEN_EXPIRY_MARGIN_SECONDS = int(os.getenv("TOKEN_CACHE_EXPIRY_MARGIN_SECONDS", 60))
+
+# (platform, account_id) -> (access_token, expires_at epoch seconds)
+_tokens: dict[tuple[str, int], tuple[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _to_epoch(expires_at) -> float | None:
+    if expires_at is None:
+        return None
+    if isinstance(expires_at, (int, float)):
+        return float(expires_at)
+    if isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+def cache_access_token(platform: str, account_id: int, access_token: str, expires_at):
+    """Remembers a decrypted access token until `expires_at` (datetime, ISO string or epoch seconds)."""
+    if not (access_token and account_id):
+        return
+    try:
+        expires = _to_epoch(expires_at)
+    except (TypeError, ValueError):
+        return
+    if expires is None:
+        return
+    with _lock:
+        _tokens[(platform, account_id)] = (access_token, expires)
+
+
+def get_cached_access_token(platform: str, account_id: int) -> str | None:
+    """Returns the decrypted access token if it is cached and not about to expire."""
+    with _lock:
+        entry = _tokens.get((platform, account_id))
+    if not entry:
+        return None
+    access_token, expires = entry
+    if time.time() + TOKEN_EXPIRY_MARGIN_SECONDS >= expires:
+        return None
+    return access_token
+
+
+def invalidate_access_token(platform: str, account_id: int):
+    """Called on refresh failure and on 401s, so the next turn goes back to the DB."""
+    with _lock:
+        if _tokens.pop((platform, account_id), None):
+            logger.info(f"Dropped cached {platform} access token for account {account_id}")
@@ -0,0 +1,172 @@
+import io
+import time
+import wave
+import asyncio
+import logging
+from backend.configurations.database import SessionLocal
+from backend.services.dialog_manager import DialogManager
+from backend.services.speech_to_text import SpeechToTextService
+from backend.services.audio_preprocessing import transcribe_upload
+from backend.utils.voice_activity import EnergyVAD, pcm16_to_float
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ENCODINGS = ("pcm_s16le",)
+# The VAD and the resampler divide by the sample rate; anything outside this range is a bad client
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+BYTES_PER_SAMPLE = 2
+PRE_ROLL_MS = 300          # audio kept before detected speech start so the first word is not clipped
+TAIL_MS = 200              # audio kept after the last voiced frame
+MAX_UTTERANCE_SECONDS = 30 # force an endpoint on very long utterances
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    """Wraps raw 16-bit PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(BYTES_PER_SAMPLE)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class VoiceStream:
+    """
+    Per-connection state of a streaming voice turn: buffered PCM plus the VAD that
+    decides when the user stopped talking.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        platform: str,
+        platform_account_id: int,
+        sample_rate: int = 16000,
+        encoding: str = "pcm_s16le",
+    ):
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(f"Unsupported audio encoding '{encoding}'. Supported: {', '.join(SUPPORTED_ENCODINGS)}")
+        try:
+            sample_rate = int(sample_rate)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid sample_rate '{sample_rate}'. Expected an integer in Hz.")
+        if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            raise ValueError(f"Unsupported sample_rate {sample_rate}. Supported: {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz")
+
+        self.session_id = session_id
+        self.platform = platform.strip().lower()
+        self.platform_account_id = platform_account_id
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.vad = EnergyVAD(sample_rate=self.sample_rate)
+        self.turn_lock = asyncio.Lock()
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self.vad.reset()
+        self.buffer = bytearray()
+        self.buffer_offset = 0     # absolute sample index of buffer[0]
+        self.samples_seen = 0
+        self.last_voice_at = None  # perf_counter() when the last voiced frame arrived
+
+    def feed(self, pcm: bytes) -> bool:
+        """
+        Appends a PCM frame. Returns True when the utterance is complete and should be
+        taken with take_utterance().
+        """
+        if len(pcm) % BYTES_PER_SAMPLE:
+            pcm = pcm[:-1]
+        if not pcm:
+            return False
+
+        previous_voiced = self.vad.last_voiced_frame
+        ended = self.vad.feed(pcm16_to_float(pcm))
+        if self.vad.last_voiced_frame != previous_voiced:
+            self.last_voice_at = time.perf_counter()
+
+        self.buffer.extend(pcm)
+        self.samples_seen += len(pcm) // BYTES_PER_SAMPLE
+
+        if not self.vad.speech_started:
+            # Nobody is talking yet: only keep the pre-roll window
+            keep = int(self.sample_rate * PRE_ROLL_MS / 1000)
+            excess = len(self.buffer) // BYTES_PER_SAMPLE - keep
+            if excess > 0:
+                del self.buffer[: excess * BYTES_PER_SAMPLE]
+                self.buffer_offset += excess
+
+        if not ended and self.vad.speech_started:
+            if len(self.buffer) // BYTES_PER_SAMPLE >= self.sample_rate * MAX_UTTERANCE_SECONDS:
+                logger.info("Voice stream %s hit max utterance length, forcing endpoint", self.session_id)
+                ended = True
+
+        return ended
+
+    @property
+    def has_speech(self) -> bool:
+        return self.vad.speech_started
+
+    def take_utterance(self) -> tuple[bytes, dict]:
+        """
+        Returns (wav_bytes, info) for the detected speech region and resets the stream
+        for the next utterance.
+        """
+        frame = self.vad.frame_size
+        pre_roll = int(self.sample_rate * PRE_ROLL_MS / 1000)
+        tail = int(self.sample_rate * TAIL_MS / 1000)
+
+        start = (self.vad.speech_start_frame or 0) * frame - pre_roll
+        end = ((self.vad.last_voiced_frame or 0) + 1) * frame + tail
+        start = max(start - self.buffer_offset, 0)
+        end = min(end - self.buffer_offset, len(self.buffer) // BYTES_PER_SAMPLE)
+
+        pcm = bytes(self.buffer[start * BYTES_PER_SAMPLE: end * BYTES_PER_SAMPLE])
+        info = {
+            "speech_seconds": round(len(pcm) / BYTES_PER_SAMPLE / self.sample_rate, 3),
+            "last_voice_at": self.last_voice_at,
+            "endpoint_at": time.perf_counter(),
+        }
+        self._reset_buffer()
+        return pcm16_to_wav(pcm, self.sample_rate), info
+
+
+async def process_utterance(stream: VoiceStream, wav_bytes: bytes, info: dict) -> dict:
+    """
+    Transcribes an endpointed utterance and hands the transcript straight to the DialogManager.
+    Returns the dialog result plus a 'latency' block measured from the last spoken word.
+    """
+    stt_start = time.perf_counter()
+    transcribed_text = await transcribe_upload(wav_bytes, SpeechToTextService.transcribe_audio)
+    stt_done = time.perf_counter()
+
+    result = {}
+    if transcribed_text:
+        db = SessionLocal()
+        try:
+            dialog_manager = DialogManager(db, stream.session_id, stream.platform, platform_account_id=stream.platform_account_id)
+            result = await dialog_manager.process_request(transcribed_text)
+        finally:
+            db.close()
+    action_done = time.perf_counter()
+
+    last_voice_at = info.get("last_voice_at") or info["endpoint_at"]
+    latency = {
+        "endpoint_ms": round((info["endpoint_at"] - last_voice_at) * 1000, 1),
+        "stt_ms": round((stt_done - stt_start) * 1000, 1),
+        "dialog_ms": round((action_done - stt_done) * 1000, 1),
+        "speech_end_to_action_ms": round((action_done - last_voice_at) * 1000, 1),
+    }
+    logger.info(
+        "Streaming voice turn | session=%s | speech=%ss | endpoint=%sms | stt=%sms | dialog=%sms | speech_end_to_action=%sms",
+        stream.session_id, info.get("speech_seconds"), latency["endpoint_ms"], latency["stt_ms"],
+        latency["dialog_ms"], latency["speech_end_to_action_ms"]
+    )
+
+    return {
+        "session_id": stream.session_id,
+        "input_text": transcribed_text,
+        **result,
+        "latency": latency,
+    }
@@ -1,27 +1,97 @@
+import os
 import socketio
 import logging
+from urllib.parse import parse_qs
+from backend.utils.feature_flags import is_socketio_redis_manager_enabled
 
 logger = logging.getLogger(__name__)
 
+
+def _redis_url() -> str:
+    url = os.getenv("SOCKETIO_REDIS_URL") or os.getenv("REDIS_URL")
+    if url:
+        return url
+    return f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/0"
+
+
+def _client_manager():
+    """
+    With several uvicorn workers each process only knows its own sockets, so emits
+    go through Redis pub/sub to reach clients connected to the other workers.
+    """
+    if not is_socketio_redis_manager_enabled():
+        return None
+    logger.info("Socket.IO using AsyncRedisManager for cross-worker emits")
+    return socketio.AsyncRedisManager(_redis_url())
+
+
 # Create a Socket.IO server
 # async_mode='asgi' is important for FastAPI interaction
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', client_manager=_client_manager())
 
 # Create an ASGI application
 socket_app = socketio.ASGIApp(sio)
 
+
+def session_room(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def _session_id_from(environ: dict, auth) -> str | None:
+    if isinstance(auth, dict) and auth.get("session_id"):
+        return str(auth["session_id"])
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    values = query.get("session_id")
+    return values[0] if values else None
+
+
+async def join_session(sid: str, session_id: str):
+    """Moves a connection into the room of a chat session (leaving its previous one)."""
+    if not sio.manager.is_connected(sid, "/"):
+        # Disconnected while the handler was running
+        return
+    room = session_room(session_id)
+    current = sio.rooms(sid)
+    if room in current:
+        return
+    for previous in current:
+        if previous.startswith("session:"):
+            await sio.leave_room(sid, previous)
+    await sio.enter_room(sid, room)
+    logger.info(f"Socket {sid} joined session {session_id}")
+
+
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
     logger.info(f"Socket connected: {sid}")
+    # Clients pass their chat session id (auth={"session_id": ...} or ?session_id=) to receive its state updates
+    session_id = _session_id_from(environ, auth)
+    if session_id:
+        await join_session(sid, session_id)
     await sio.emit('status', {'state': 'IDLE', 'message': 'Connected to SAM'}, room=sid)
 
+@sio.on("join_session")
+async def on_join_session(sid, data):
+    session_id = (data or {}).get("session_id") if isinstance(data, dict) else data
+    if not session_id:
+        return {"ok": False, "detail": "session_id is required"}
+    await join_session(sid, str(session_id))
+    return {"ok": True, "session_id": str(session_id)}
+
 @sio.event
-async def disconnect(sid):
+async def disconnect(sid, reason=None):
     logger.info(f"Socket disconnected: {sid}")
+    # Imported lazily: the voice stream handlers import this module to register on `sio`
+    from backend.api.v1.voice_socket import discard_voice_stream
+    discard_voice_stream(sid)
 
-async def emit_state(state: str, message: str = ""):
+async def emit_state(session_id: str | None, state: str, message: str = ""):
     """
-    Helper to emit state changes to all clients.
+    Emits a state change to the clients of one chat session.
     States: IDLE, LISTENING, THINKING, SPEAKING
     """
-    await sio.emit('state_update', {'state': state, 'message': message})
+    if not session_id:
+        # Never broadcast: one user's state must not show up on everyone's UI
+        logger.debug(f"emit_state({state}) without a session id, skipped")
+        return
+    await sio.emit('state_update', {'state': state, 'message': message, 'session_id': session_id}, room=session_room(session_id))
@@ -15,6 +15,11 @@ def fakeredis_patch(monkeypatch):
     monkeypatch.setattr('backend.services.session_manager.redis_client', fake_client)
     yield
 
+# Tests never poll Spotify in the background
+@pytest.fixture(autouse=True)
+def no_playback_poller(monkeypatch):
+    monkeypatch.setenv("ENABLE_PLAYBACK_POLLER", "false")
+
 @pytest.fixture
 def platform_account_fixture(test_db):
     """
@@ -0,0 +1,87 @@
+import io
+import wave
+import numpy as np
+import pytest
+from backend.services.audio_preprocessing import preprocess_audio, preprocess_wav, TARGET_SAMPLE_RATE
+
+# Fixture corpus: each "word" is a short tone burst at its own frequency, so a tiny
+# tone decoder can stand in for Whisper and tell whether the words survive preprocessing.
+WORD_FREQS = {"play": 300, "shape": 500, "of": 700, "you": 900, "pause": 1100, "skip": 1300, "song": 1500}
+CORPUS = ["play shape of you", "pause", "skip song", "play song"]
+
+
+def synth_wav(sentence: str, rate: int = 48000, channels: int = 2, lead_s: float = 1.5, trail_s: float = 2.0) -> bytes:
+    rng = np.random.default_rng(42)
+    parts = [rng.normal(0, 0.0005, int(rate * lead_s))]
+    for word in sentence.split():
+        t = np.arange(int(rate * 0.25)) / rate
+        parts.append(0.4 * np.sin(2 * np.pi * WORD_FREQS[word] * t))
+        parts.append(np.zeros(int(rate * 0.12)))
+    parts.append(rng.normal(0, 0.0005, int(rate * trail_s)))
+    mono = np.concatenate(parts)
+    frames = np.repeat(mono[:, None], channels, axis=1) if channels > 1 else mono
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((frames * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def fake_transcribe(wav_bytes: bytes) -> str:
+    """Decodes the tone-burst words back into text."""
+    with wave.open(io.BytesIO(wav_bytes)) as wav:
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768.0
+    samples = samples.reshape(-1, channels).mean(axis=1)
+
+    frame = rate // 100
+    energy = np.sqrt(np.mean(samples[: len(samples) // frame * frame].reshape(-1, frame) ** 2, axis=1))
+    voiced = energy > 0.05
+    words, start = [], None
+    for i, v in enumerate(np.append(voiced, False)):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            segment = samples[start * frame: i * frame]
+            peak = np.fft.rfftfreq(len(segment), 1 / rate)[np.argmax(np.abs(np.fft.rfft(segment)))]
+            words.append(min(WORD_FREQS, key=lambda w: abs(WORD_FREQS[w] - peak)))
+            start = None
+    return " ".join(words)
+
+
+@pytest.mark.parametrize("sentence", CORPUS)
+def test_preprocessing_preserves_transcript_and_shrinks_upload(sentence):
+    original = synth_wav(sentence)
+    processed, stats = preprocess_audio(original)
+
+    assert fake_transcribe(original) == sentence
+    assert fake_transcribe(processed) == sentence
+
+    with wave.open(io.BytesIO(processed)) as wav:
+        assert wav.getnchannels() == 1
+        assert wav.getframerate() == TARGET_SAMPLE_RATE
+        duration = wav.getnframes() / wav.getframerate()
+
+    speech_seconds = len(sentence.split()) * 0.37
+    assert duration < speech_seconds + 0.6  # leading/trailing silence is gone
+    assert stats["preprocessed"] is True
+    assert stats["bytes_out"] < stats["bytes_in"] / 10
+
+
+def test_non_wav_audio_is_uploaded_untouched():
+    webm = b"\x1aE\xdf\xa3" + b"\x00" * 2048
+    assert preprocess_wav(webm) is None
+
+    output, stats = preprocess_audio(io.BytesIO(webm))
+    assert output == webm
+    assert stats["preprocessed"] is False
+
+
+def test_preprocessing_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("ENABLE_AUDIO_PREPROCESSING", "false")
+    original = synth_wav("pause")
+    output, stats = preprocess_audio(original)
+    assert output == original
+    assert stats["bytes_out"] == stats["bytes_in"]
@@ -0,0 +1,90 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from backend.adapters import spotify_adapter
+from backend.adapters.client_pool import ClientPool
+from backend.adapters.spotify_adapter import SpotifyAdapter
+
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like api.spotify.com
+    connections = 0
+
+    def setup(self):
+        FakeSpotifyHandler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        body = {"/v1/me": {"id": "user1"}, "/v1/me/player/devices": {"devices": [{"id": "d1", "is_active": True, "name": "Phone"}]}}
+        payload = json.dumps(body.get(self.path.split("?")[0], {})).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_spotify():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSpotifyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeSpotifyHandler.connections = 0
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/"
+    server.shutdown()
+
+
+def run_turn(get_adapter, prefix):
+    # One multi-action turn: profile lookup plus three device-dependent actions
+    for _ in range(4):
+        adapter = get_adapter()
+        adapter.sp.prefix = prefix
+        adapter.sp.current_user()
+        adapter.sp.devices()
+
+
+def test_pooled_adapters_reuse_connections(monkeypatch, fake_spotify):
+    run_turn(lambda: SpotifyAdapter("tok"), fake_spotify)
+    per_action = FakeSpotifyHandler.connections
+
+    FakeSpotifyHandler.connections = 0
+    monkeypatch.setattr(spotify_adapter, "spotify_client_pool", ClientPool(SpotifyAdapter, max_size=4))
+    for _ in range(3):  # three turns
+        run_turn(lambda: SpotifyAdapter.for_account("tok", 7), fake_spotify)
+    pooled = FakeSpotifyHandler.connections
+
+    assert per_action == 4
+    assert pooled == 1  # one handshake for the whole process lifetime of the account
+
+
+def test_pool_evicts_rotated_tokens_and_bounds_size():
+    pool = ClientPool(lambda token, account_id: object(), max_size=2)
+    first = pool.get("tok-a", 1)
+    assert pool.get("tok-a", 1) is first
+
+    rotated = pool.get("tok-b", 1)
+    assert rotated is not first
+    assert pool.get("tok-b", 1) is rotated
+
+    pool.get("tok-c", 2)
+    pool.get("tok-d", 3)  # evicts account 1, the least recently used
+    assert len(pool) == 2
+    assert pool.get("tok-b", 1) is not rotated
+
+    pool.invalidate(3)
+    assert pool.stats()["size"] == 1
+
+
+def test_pooled_adapters_are_bound_to_their_account(monkeypatch):
+    monkeypatch.setattr(spotify_adapter, "spotify_client_pool", ClientPool(SpotifyAdapter, max_size=4))
+
+    first = SpotifyAdapter.for_account("tok", 7)
+    other = SpotifyAdapter.for_account("tok", 8)
+
+    assert first is not other
+    assert (first.platform_account_id, other.platform_account_id) == (7, 8)
+    assert SpotifyAdapter.for_account("tok", 7) is first
+    assert SpotifyAdapter.for_account("tok").platform_account_id is None
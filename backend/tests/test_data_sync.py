@@ -1,15 +1,22 @@
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock
+from backend.adapters.spotify_adapter import SpotifyAdapter
+from backend.services.rate_limiter import rate_limit_lane, current_lane, BACKGROUND
 from backend.services.library_sync_service import sync_user_library
 from backend.models.database_models import PlatformAccount, UserLikedSong, UserPlaylist
 
 @pytest.fixture
-def mock_platform_account():
-    return PlatformAccount(
+def mock_platform_account(test_db):
+    yield PlatformAccount(
         id=1,
         refresh_token="fake_token",
         last_synced=None
     )
+    test_db.query(UserLikedSong).filter_by(platform_account_id=1).delete()
+    test_db.query(UserPlaylist).filter_by(platform_account_id=1).delete()
+    test_db.commit()
 
 @pytest.fixture
 def mock_spotify_adapter(monkeypatch):
@@ -18,6 +25,7 @@ def mock_spotify_adapter(monkeypatch):
         {"uri": "spotify:track:123", "meta_data": {"track_name": "Song A"}},
         {"uri": "spotify:track:456", "meta_data": {"track_name": "Song B"}},
     ]
+    mock_instance.iter_liked_track_pages.return_value = [mock_instance.fetch_liked_tracks.return_value]
     mock_instance.fetch_user_playlists.return_value = [
         {"id": "playlist_1", "name": "My Playlist", "description": "Test Desc", "owner": {"display_name": "User1"}, "tracks": {"total": 5}},
         {"id": "playlist_2", "name": "Road Trip", "description": "Another Desc", "owner": {"display_name": "User2"}, "tracks": {"total": 10}},
@@ -49,3 +57,139 @@ def test_sync_user_library_inserts_only_new_data(test_db, mock_platform_account,
     assert len(new_liked_songs) == 1
     assert len(new_playlists) == 1
     assert mock_platform_account.last_synced is not None
+
+
+class FakeSavedTracks:
+    """current_user_saved_tracks over `total` liked songs, tracking how many calls overlap."""
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+        self.lanes = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def current_user_saved_tracks(self, limit=20, offset=0):
+        with self._lock:
+            self.offsets.append(offset)
+            self.lanes.add(current_lane())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        items = [
+            {"track": {
+                "id": f"t{i}", "name": f"Song {i}", "uri": f"spotify:track:sync{i}", "duration_ms": 1000,
+                "artists": [{"name": "Artist"}], "album": {"name": "Album"},
+            }}
+            for i in range(offset, min(offset + limit, self.total))
+        ]
+        return {"items": items, "total": self.total, "limit": limit, "offset": offset}
+
+    def current_user_playlists(self, limit=50, offset=0):
+        return {"items": [], "next": None}
+
+
+@pytest.fixture
+def saved_tracks_adapter():
+    adapter = SpotifyAdapter("token")
+    adapter.sp = FakeSavedTracks(total=230)
+    return adapter
+
+
+def test_liked_tracks_are_paged_concurrently_after_the_first_page(saved_tracks_adapter):
+    with rate_limit_lane(BACKGROUND):
+        pages = list(saved_tracks_adapter.iter_liked_track_pages(concurrency=3))
+
+    fake = saved_tracks_adapter.sp
+    assert fake.offsets[0] == 0
+    assert sorted(fake.offsets) == [0, 50, 100, 150, 200]
+    assert sum(len(page) for page in pages) == 230
+    assert 1 < fake.max_in_flight <= 3
+    # Page fetches in the pool keep the caller's rate-limit lane
+    assert fake.lanes == {BACKGROUND}
+
+
+def test_fetch_liked_tracks_limit_stops_after_the_first_page(saved_tracks_adapter):
+    assert len(saved_tracks_adapter.fetch_liked_tracks(limit=50)) == 50
+    assert saved_tracks_adapter.sp.offsets == [0]
+
+
+def test_sync_stores_every_liked_song(test_db, saved_tracks_adapter):
+    account = PlatformAccount(id=2, refresh_token="fake_token", last_synced=None)
+    test_db.add(UserLikedSong(platform_account_id=2, track_uri="spotify:track:sync7", meta_data={}))
+    test_db.commit()
+
+    sync_user_library(test_db, account, saved_tracks_adapter)
+
+    uris = {uri for (uri,) in test_db.query(UserLikedSong.track_uri).filter(UserLikedSong.track_uri.like("spotify:track:sync%"))}
+    assert len(uris) == 230
+
+
+def liked_pages_adapter(*uris, added_at=None):
+    adapter = MagicMock()
+    adapter.iter_liked_track_pages.return_value = [[
+        {"uri": uri, "meta_data": {"track_name": uri, "added_at": added_at}} for uri in uris
+    ]]
+    adapter.fetch_user_playlists.return_value = []
+    return adapter
+
+
+@pytest.fixture
+def liked_accounts(test_db):
+    accounts = [PlatformAccount(id=account_id, refresh_token="fake_token", last_synced=None) for account_id in (31, 32)]
+    yield accounts
+    test_db.query(UserLikedSong).filter(UserLikedSong.platform_account_id.in_([31, 32])).delete()
+    test_db.commit()
+
+
+def liked_uris(test_db, account):
+    return {uri for (uri,) in test_db.query(UserLikedSong.track_uri).filter_by(platform_account_id=account.id)}
+
+
+def test_accounts_sharing_a_song_both_keep_it(test_db, liked_accounts):
+    first, second = liked_accounts
+    sync_user_library(test_db, first, liked_pages_adapter("spotify:track:shared1", "spotify:track:shared2"))
+    sync_user_library(test_db, second, liked_pages_adapter("spotify:track:shared1", "spotify:track:shared3"))
+
+    assert liked_uris(test_db, first) == {"spotify:track:shared1", "spotify:track:shared2"}
+    assert liked_uris(test_db, second) == {"spotify:track:shared1", "spotify:track:shared3"}
+
+
+def test_sync_drops_unliked_songs_and_backfills_like_dates(test_db, liked_accounts):
+    first, second = liked_accounts
+    test_db.add_all([
+        UserLikedSong(platform_account_id=first.id, track_uri="spotify:track:kept", meta_data={"track_name": "Kept"}),
+        UserLikedSong(platform_account_id=first.id, track_uri="spotify:track:unliked", meta_data={}),
+        UserLikedSong(platform_account_id=second.id, track_uri="spotify:track:unliked", meta_data={}),
+    ])
+    test_db.commit()
+
+    sync_user_library(test_db, first, liked_pages_adapter("spotify:track:kept", added_at="2024-02-01T00:00:00Z"))
+
+    assert liked_uris(test_db, first) == {"spotify:track:kept"}
+    # Another account's copy of the song is untouched
+    assert liked_uris(test_db, second) == {"spotify:track:unliked"}
+    kept = test_db.query(UserLikedSong).filter_by(platform_account_id=first.id).one()
+    test_db.refresh(kept)
+    assert kept.meta_data == {"track_name": "Kept", "added_at": "2024-02-01T00:00:00Z"}
+
+
+def test_failed_page_fetch_keeps_the_synced_library(test_db, liked_accounts):
+    first, _ = liked_accounts
+    test_db.add(UserLikedSong(platform_account_id=first.id, track_uri="spotify:track:kept", meta_data={}))
+    test_db.commit()
+
+    def pages():
+        yield [{"uri": "spotify:track:new", "meta_data": {}}]
+        raise RuntimeError("page 2 failed")
+
+    adapter = liked_pages_adapter()
+    adapter.iter_liked_track_pages.side_effect = pages
+    with pytest.raises(RuntimeError):
+        sync_user_library(test_db, first, adapter)
+    test_db.rollback()
+
+    assert liked_uris(test_db, first) == {"spotify:track:kept"}
@@ -93,3 +93,51 @@ async def test_history_is_logged(monkeypatch, dialog):
     hist = SessionManager.get_turn_history("sess1")
     assert hist[-1]["role"] == "assistant"
     assert "Okay" in hist[-1]["text"]
+
+
+def test_plan_action_batches_keeps_playback_order():
+    from backend.utils.action_dependencies import plan_action_batches
+    steps = [
+        ("like_song", {}),
+        ("add_to_playlist", {"song_name": "x", "playlist_name": "Gym"}),
+        ("increase_volume", {}),
+        ("create_playlist", {"playlist_name": "Run"}),
+        ("add_to_playlist", {"song_name": "y", "playlist_name": "run"}),
+        ("skip_song", {}),
+        ("get_current_song", {}),
+    ]
+    # create + add on the same playlist must not overlap; playback changes are barriers
+    assert plan_action_batches(steps) == [[0, 1], [2], [3], [4], [5], [6]]
+
+
+@pytest.mark.asyncio
+async def test_independent_actions_run_concurrently(monkeypatch, dialog):
+    import time
+    actions = [
+        {"action": "like_song", "parameters": {}},
+        {"action": "add_to_playlist", "parameters": {"song_name": "current", "playlist_name": "Gym"}},
+        {"action": "get_current_song", "parameters": {}},
+    ]
+    monkeypatch.setattr("backend.services.dialog_manager.call_llm_agent",
+                        lambda *a, **k: {"actions": actions, "reply": "Done"})
+    monkeypatch.setattr("backend.services.dialog_manager.TextToSpeechService.synthesize_speech", lambda text: None)
+    monkeypatch.setattr(DialogManager, "_get_platform_credentials",
+                        lambda self, db=None: {"platform": "spotify", "credentials": {"access_token": "tok"}})
+
+    def slow_action(action, platform, params):
+        time.sleep(0.2)  # one upstream round trip
+        if action == "add_to_playlist":
+            raise RuntimeError("playlist not found")
+        return {"action": action}
+
+    monkeypatch.setattr("backend.services.dialog_manager.MusicActionService.perform_music_action", staticmethod(slow_action))
+
+    start = time.perf_counter()
+    resp = await dialog.process_request("like this, add it to gym and tell me what's playing")
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.4  # three serial round trips would take 0.6s
+    # Results and errors are merged in the order the user asked for them
+    assert resp["action_data"] == [{"action": "like_song"}, {"action": "get_current_song"}]
+    assert resp["reply"] == "I encountered an error: playlist not found"
+    assert resp["command"]["type"] == "get_current_song"
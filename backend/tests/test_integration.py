@@ -84,7 +84,7 @@ def test_graceful_failure_on_spotify(monkeypatch):
     monkeypatch.setattr("backend.services.dialog_manager.call_llm_agent", fake_llm)
 
     # Mock MusicActionService to raise exception during action execution
-    async def failing_action_handler(self, action, params):
+    async def failing_action_handler(self, action, params, db=None):
         raise Exception("Spotify API is down")
     
     monkeypatch.setattr("backend.services.dialog_manager.DialogManager._handle_music_action", failing_action_handler)
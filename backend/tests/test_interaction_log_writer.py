@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from sqlalchemy import event
+from backend.models.database_models import InteractionLog
+from backend.services.interaction_log_writer import InteractionLogWriter
+from backend.tests.conftest import TestingSessionLocal, engine
+
+
+@pytest.fixture
+def clean_logs(test_db):
+    yield
+    test_db.query(InteractionLog).filter(InteractionLog.session_id.like("writer-%")).delete(synchronize_session=False)
+    test_db.commit()
+
+
+@pytest.fixture
+def insert_statements():
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO INTERACTION_LOGS"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_batches(test_db, clean_logs, insert_statements):
+    writer = InteractionLogWriter(session_factory=TestingSessionLocal, max_queue=1000, batch_size=50, flush_interval=0.05)
+
+    for i in range(120):
+        assert writer.submit(1, "writer-batch", f"play song {i}", {"action": "play_song"}, "play_song")
+
+    # Two full batches go out on size, the remaining 20 on the time trigger
+    for _ in range(100):
+        if writer.written == 120:
+            break
+        await asyncio.sleep(0.02)
+    await writer.stop()
+
+    assert writer.stats()["written"] == 120
+    assert writer.batches == 3
+    # One multi-row INSERT per batch, not one statement per row
+    assert len(insert_statements) == 3
+
+    rows = test_db.query(InteractionLog).filter_by(session_id="writer-batch").order_by(InteractionLog.id).all()
+    assert [r.user_input for r in rows] == [f"play song {i}" for i in range(120)]
+    assert rows[0].llm_response == {"action": "play_song"}
+    assert all(r.timestamp is not None for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_and_stop_flushes_the_rest(test_db, clean_logs):
+    writer = InteractionLogWriter(session_factory=TestingSessionLocal, max_queue=5, batch_size=100, flush_interval=10)
+
+    # Submitted without yielding to the loop, so the drain task cannot keep up
+    accepted = [writer.submit(1, "writer-full", f"turn {i}", None, None) for i in range(8)]
+
+    assert accepted == [True] * 5 + [False] * 3
+    assert writer.dropped == 3
+
+    # Long flush interval: nothing would be written before shutdown without the final flush
+    await writer.stop()
+    assert writer.written == 5
+    assert test_db.query(InteractionLog).filter_by(session_id="writer-full").count() == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_counted_not_raised(monkeypatch):
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            raise RuntimeError("db is down")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    writer = InteractionLogWriter(session_factory=BrokenSession, batch_size=10, flush_interval=0.01)
+    writer.submit(1, "writer-broken", "pause", None, "pause_song")
+    await writer.stop()
+
+    assert writer.failed == 1
+    assert writer.written == 0
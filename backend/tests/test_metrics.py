@@ -0,0 +1,108 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from backend.main import app
+from backend.services.session_manager import SessionManager
+from backend.utils import metrics
+from backend.utils.tracing import trace_turn
+
+client = TestClient(app)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def upstream_server(monkeypatch):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = 429 if "limited" in self.path else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Pretend the local server is Spotify so calls are labelled like production ones
+    monkeypatch.setitem(metrics.UPSTREAM_HOSTS, "127.0.0.1", "spotify")
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_endpoint_label_collapses_ids():
+    assert metrics.endpoint_label("/v1/playlists/37i9dQZF1DXcBWIGoYBM5M/tracks") == "/v1/playlists/{id}/tracks"
+    assert metrics.endpoint_label("/tracks/123456/favoriters") == "/tracks/{id}/favoriters"
+    assert metrics.endpoint_label("/me/likes/tracks/soundcloud:tracks:42") == "/me/likes/tracks/{id}"
+    assert metrics.endpoint_label("/openai/v1/chat/completions") == "/openai/v1/chat/completions"
+
+
+def test_request_latency_is_labelled_by_route_template():
+    before = sample("sam_http_request_duration_seconds_count", method="GET", route="/", status="200")
+    before_unmatched = sample("sam_http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+
+    assert client.get("/").status_code == 200
+    assert client.get("/no/such/path/123").status_code == 404
+
+    assert sample("sam_http_request_duration_seconds_count", method="GET", route="/", status="200") == before + 1
+    assert sample("sam_http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == before_unmatched + 1
+
+
+def test_upstream_calls_are_counted_for_requests_and_httpx(upstream_server):
+    endpoint = "/v1/playlists/{id}/tracks"
+    ok = sample("sam_upstream_requests_total", service="spotify", endpoint=endpoint, status="200")
+    limited = sample("sam_upstream_requests_total", service="spotify", endpoint="/v1/limited", status="429")
+    timed = sample("sam_upstream_request_duration_seconds_count", service="spotify", endpoint=endpoint)
+
+    requests.get(f"{upstream_server}/v1/playlists/37i9dQZF1DXcBWIGoYBM5M/tracks", timeout=5)
+    httpx.get(f"{upstream_server}/v1/playlists/5ABHKGoOzxkaa28ttQV9sE/tracks", timeout=5)
+    requests.get(f"{upstream_server}/v1/limited", timeout=5)
+
+    assert sample("sam_upstream_requests_total", service="spotify", endpoint=endpoint, status="200") == ok + 2
+    assert sample("sam_upstream_requests_total", service="spotify", endpoint="/v1/limited", status="429") == limited + 1
+    assert sample("sam_upstream_request_duration_seconds_count", service="spotify", endpoint=endpoint) == timed + 2
+
+
+def test_redis_round_trips_are_observed_per_turn():
+    count = sample("sam_turn_redis_round_trips_count", route="metrics-test")
+    total = sample("sam_turn_redis_round_trips_sum", route="metrics-test")
+    # Opens the pooled connection (its handshake commands are not part of a turn)
+    SessionManager.get_turn_history("sess-metrics")
+
+    with trace_turn("metrics-test") as trace:
+        SessionManager.load_turn_context("sess-metrics")
+        SessionManager.commit_turn("sess-metrics", [("user", "pause"), ("assistant", "Paused")])
+
+    assert trace.counters["redis_round_trips"] == 2
+    assert sample("sam_turn_redis_round_trips_count", route="metrics-test") == count + 1
+    assert sample("sam_turn_redis_round_trips_sum", route="metrics-test") == total + 2
+
+
+def test_metrics_endpoint_exposes_all_families():
+    metrics.record_search_cache("spotify", "fuzzy", hit=True)
+    metrics.record_search_api_fallback("soundcloud")
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    for family in (
+        "sam_http_request_duration_seconds",
+        "sam_upstream_requests_total",
+        "sam_search_cache_lookups_total",
+        "sam_search_api_fallbacks_total",
+        "sam_executor_queue_depth",
+        "sam_turn_redis_round_trips",
+        "sam_celery_task_duration_seconds",
+    ):
+        assert family in body
+    assert 'sam_search_cache_lookups_total{platform="spotify",result="hit",tier="fuzzy"}' in body
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import fakeredis
+import pytest
+from backend.adapters import spotify_adapter
+from backend.services import playback_poller, playback_snapshot
+from backend.services.playback_poller import PlaybackPoller, next_poll_interval
+from backend.services.playback_snapshot import snapshot_from_playback
+
+
+def playback(uri, progress_ms=30000, duration_ms=200000, is_playing=True):
+    return {
+        "is_playing": is_playing,
+        "progress_ms": progress_ms,
+        "device": {"id": "phone", "volume_percent": 50},
+        "item": {"id": uri, "uri": uri, "name": uri, "duration_ms": duration_ms, "artists": [], "album": {"images": []}},
+    }
+
+
+class RecordingRedis(fakeredis.FakeStrictRedis):
+    """Records the thread every Redis command runs on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def execute_command(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().execute_command(*args, **kwargs)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = RecordingRedis()
+    for module in (spotify_adapter, playback_snapshot, playback_poller):
+        monkeypatch.setattr(module, "redis_client", client)
+    return client
+
+
+def test_poll_interval_adapts_to_playback():
+    assert next_poll_interval(None) == playback_poller.PLAYBACK_POLL_IDLE_SECONDS
+    assert next_poll_interval(snapshot_from_playback(playback("a", is_playing=False))) == playback_poller.PLAYBACK_POLL_IDLE_SECONDS
+    assert next_poll_interval(snapshot_from_playback(playback("a", progress_ms=30000))) == playback_poller.PLAYBACK_POLL_SECONDS
+    assert next_poll_interval(snapshot_from_playback(playback("a", progress_ms=195000))) == playback_poller.PLAYBACK_POLL_FAST_SECONDS
+    # Just before the near-end window the next poll lands where the window opens
+    assert next_poll_interval(snapshot_from_playback(playback("a", progress_ms=187000))) == pytest.approx(3.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_poller_stores_snapshots_and_pushes_changes(monkeypatch, fake_redis):
+    states = [playback("spotify:track:a"), playback("spotify:track:a", progress_ms=31000), playback("spotify:track:b")]
+
+    class FakeSp:
+        def current_playback(self):
+            return states.pop(0)
+
+    class FakeAdapter:
+        sp = FakeSp()
+
+        def remember_device(self, device_id):
+            fake_redis.set("spotify:device:7", device_id)
+
+    monkeypatch.setattr(playback_poller.SpotifyAdapter, "for_account", lambda token, account_id: FakeAdapter())
+    emitted = []
+
+    async def emit(event, data, room=None):
+        emitted.append((event, data["track"]["uri"], room))
+
+    monkeypatch.setattr(playback_poller.sio, "emit", emit)
+    poller = PlaybackPoller(workers=1)
+
+    async def polls(n):
+        while poller.polls < n:
+            await asyncio.sleep(0.01)
+
+    poller.watch(7, "token", session_id="sess-1")  # no snapshot yet: polls right away
+    await asyncio.wait_for(polls(1), 2)
+    for n in (2, 3):
+        poller.watch(7, "token", session_id="sess-1", refresh=True)
+        await asyncio.wait_for(polls(n), 2)
+    await poller.stop()
+    # The lease and snapshot reads ran on the poller pool, never on the loop
+    assert fake_redis.threads and threading.get_ident() not in fake_redis.threads
+
+    # Progress alone is not pushed
+    assert emitted == [("now_playing", "spotify:track:a", "session:sess-1"), ("now_playing", "spotify:track:b", "session:sess-1")]
+    assert playback_snapshot.get_snapshot(7)["track"]["uri"] == "spotify:track:b"
+    assert fake_redis.get("spotify:device:7") == b"phone"
+    assert poller.stats()["accounts"] == 0
+
+
+def test_only_one_worker_polls_an_account(fake_redis):
+    first, second = PlaybackPoller(), PlaybackPoller()
+
+    assert first._claim(7, 30) is True
+    assert second._claim(7, 30) is False
+    assert first._claim(7, 30) is True
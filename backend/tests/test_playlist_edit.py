@@ -0,0 +1,132 @@
+import threading
+import time
+import pytest
+from backend.adapters.spotify_adapter import SpotifyAdapter
+from backend.services.dialog_manager import DialogManager
+from backend.services.music_action_service import MusicActionService
+from backend.models.database_models import SearchCache, UserPlaylist
+
+ACCOUNT_ID = 48
+
+
+class FakePlaylistSpotify:
+    """Searches and playlist writes, tracking how many searches overlap."""
+
+    def __init__(self, unknown=()):
+        self.unknown = set(unknown)
+        self.searches = []
+        self.writes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def search(self, q, type="track", limit=1):
+        with self._lock:
+            self.searches.append(q)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        if q in self.unknown:
+            return {"tracks": {"items": []}}
+        track = {
+            "name": q, "uri": f"spotify:track:{q.replace(' ', '')}", "duration_ms": 1000,
+            "artists": [{"name": "Artist"}], "album": {"name": "Album", "images": [{"url": "http://img"}]},
+        }
+        return {"tracks": {"items": [track]}}
+
+    def playlist_add_items(self, playlist_id, items):
+        self.writes.append(("add", playlist_id, list(items)))
+
+    def playlist_remove_all_occurrences_of_items(self, playlist_id, items):
+        self.writes.append(("remove", playlist_id, list(items)))
+
+
+@pytest.fixture
+def playlist(test_db):
+    test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.query(UserPlaylist).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.add(UserPlaylist(platform_account_id=ACCOUNT_ID, playlist_id="roadtrip", name="Road Trip", meta_data={}))
+    test_db.commit()
+    yield
+    test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.query(UserPlaylist).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.commit()
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = SpotifyAdapter("token")
+    adapter.sp = FakePlaylistSpotify(unknown={"no such song"})
+    monkeypatch.setattr(SpotifyAdapter, "for_account", classmethod(lambda cls, token, account_id=None: adapter))
+    return adapter
+
+
+def edit(test_db, action, **parameters):
+    return MusicActionService.perform_music_action(action, "spotify", {
+        "access_token": "token", "db_session": test_db, "platform_account_id": ACCOUNT_ID, **parameters,
+    })
+
+
+def test_songs_are_searched_concurrently_and_cached_with_one_commit(test_db, playlist, adapter, monkeypatch):
+    commits = []
+    real_commit = test_db.commit
+    monkeypatch.setattr(test_db, "commit", lambda: (commits.append(1), real_commit()))
+    songs = [f"song {i}" for i in range(20)]
+
+    playlist_id, uris, missing = adapter.resolve_playlist_edit(test_db, ACCOUNT_ID, "road trip", songs)
+
+    assert playlist_id == "roadtrip"
+    assert uris == [f"spotify:track:song{i}" for i in range(20)]
+    assert missing == []
+    assert 1 < adapter.sp.max_in_flight <= 8
+    assert len(commits) == 1
+    assert test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).count() == 20
+
+
+def test_cached_songs_skip_the_search_api(test_db, playlist, adapter):
+    test_db.add(SearchCache(
+        platform_account_id=ACCOUNT_ID, normalized_query="levitating", track_uri="spotify:track:cached",
+        meta_data={"track_name": "Levitating", "image": "http://img"},
+    ))
+    test_db.commit()
+
+    _, uris, _ = adapter.resolve_playlist_edit(test_db, ACCOUNT_ID, "road trip", ["levitating", "song 1"])
+
+    assert uris == ["spotify:track:cached", "spotify:track:song1"]
+    assert adapter.sp.searches == ["song 1"]
+
+
+def test_large_edits_are_written_in_chunks_of_100(test_db, playlist, adapter):
+    uris = [f"spotify:track:{i}" for i in range(250)]
+
+    adapter.add_tracks_to_playlist(test_db, ACCOUNT_ID, "roadtrip", uris)
+
+    assert [len(items) for _, _, items in adapter.sp.writes] == [100, 100, 50]
+    assert [uri for _, _, items in adapter.sp.writes for uri in items] == uris
+
+
+def test_add_reports_the_songs_it_could_not_find(test_db, playlist, adapter):
+    reply = edit(test_db, "add_to_playlist", playlist_name="road trip", song_names=["song 1", "no such song", "song 2"])
+
+    assert adapter.sp.writes == [("add", "roadtrip", ["spotify:track:song1", "spotify:track:song2"])]
+    assert "no such song" in reply
+
+
+def test_fully_resolved_edit_keeps_the_assistant_reply(test_db, playlist, adapter):
+    assert edit(test_db, "remove_from_playlist", playlist_name="road trip", song_name="song 3") is None
+    assert adapter.sp.writes == [("remove", "roadtrip", ["spotify:track:song3"])]
+
+
+def test_edit_with_no_song_found_fails(test_db, playlist, adapter):
+    with pytest.raises(ValueError):
+        edit(test_db, "add_to_playlist", playlist_name="road trip", song_names=["no such song"])
+    assert adapter.sp.writes == []
+
+
+def test_song_names_satisfy_the_song_slot():
+    dialog = DialogManager(None, session_id="sess1", platform="spotify", platform_account_id=1)
+
+    assert dialog._check_missing_params("add_to_playlist", {"song_names": ["a", "b"], "playlist_name": "x"}) == []
+    assert dialog._check_missing_params("add_to_playlist", {"song_names": [], "playlist_name": "x"}) == ["song_name"]
@@ -0,0 +1,85 @@
+import pytest
+from backend.models.database_models import PlatformAccount
+from backend.services import profile_cache
+from backend.services.music_action_service import MusicActionService
+
+
+@pytest.fixture
+def account(test_db):
+    acc = PlatformAccount(
+        system_user_id=1,
+        platform_name="spotify",
+        platform_user_id="sp_profile_user",
+        refresh_token="rt",
+        meta_data={"access_token": "at", "profile": {"id": "sp_profile_user", "display_name": "Sam", "email": None}}
+    )
+    test_db.add(acc)
+    test_db.commit()
+    test_db.refresh(acc)
+    yield acc
+    profile_cache.invalidate_profile(acc.id)
+    test_db.delete(acc)
+    test_db.commit()
+
+
+def no_api_call():
+    raise AssertionError("current_user() must not be called when the profile is cached")
+
+
+def test_create_playlist_uses_cached_profile(monkeypatch, test_db, account):
+    created = {}
+
+    class FakeAdapter:
+        class sp:
+            current_user = staticmethod(no_api_call)
+
+        def create_playlist(self, db, platform_account_id, user_id, name, user_display_name=None):
+            created.update(user_id=user_id, name=name, owner=user_display_name)
+            return f"Created playlist '{name}'."
+
+    monkeypatch.setattr(MusicActionService, "_get_spotify_adapter", staticmethod(lambda params: FakeAdapter()))
+
+    params = {"db_session": test_db, "platform_account_id": account.id, "access_token": "at", "playlist_name": "Gym"}
+    assert MusicActionService.perform_music_action("create_playlist", "spotify", params) == "Created playlist 'Gym'."
+    assert created == {"user_id": "sp_profile_user", "name": "Gym", "owner": "Sam"}
+
+
+def test_profile_is_served_from_memory_once_loaded(test_db, account):
+    assert profile_cache.get_spotify_profile(test_db, account.id, fetch=no_api_call)["id"] == "sp_profile_user"
+
+    class NoQueries:
+        def query(self, *args):
+            raise AssertionError("warm profile lookups must not hit the DB")
+
+    assert profile_cache.get_spotify_profile(NoQueries(), account.id)["display_name"] == "Sam"
+
+
+def test_legacy_account_without_profile_fetches_once(test_db, account):
+    account.meta_data = {"access_token": "at"}
+    account.platform_user_id = None
+    test_db.commit()
+    profile_cache.invalidate_profile(account.id)
+
+    calls = []
+    def fetch():
+        calls.append(1)
+        return {"id": "fetched_id", "display_name": "Fetched"}
+
+    assert profile_cache.get_spotify_profile(test_db, account.id, fetch=fetch)["id"] == "fetched_id"
+    profile_cache.invalidate_profile(account.id)
+    assert profile_cache.get_spotify_profile(test_db, account.id, fetch=fetch)["id"] == "fetched_id"
+    assert len(calls) == 1  # persisted into meta_data
+
+
+def test_spotify_401_drops_the_cached_profile(test_db, account):
+    from spotipy.exceptions import SpotifyException
+
+    profile_cache.get_spotify_profile(test_db, account.id)
+    assert account.id in profile_cache._profiles
+
+    MusicActionService._action_error(
+        SpotifyException(401, -1, "token expired"), "pause_song", "spotify",
+        {"db_session": test_db, "platform_account_id": account.id},
+    )
+
+    assert account.id not in profile_cache._profiles
@@ -0,0 +1,113 @@
+import io
+import time
+import fakeredis
+import pytest
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+from spotipy.exceptions import SpotifyException
+from backend.adapters import spotify_adapter
+from backend.services import rate_limiter
+from backend.services.rate_limiter import RateLimiter, RateLimited, INTERACTIVE, BACKGROUND, rate_limit_lane, current_lane
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeStrictRedis()
+    monkeypatch.setattr(rate_limiter, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def limiter(fake_redis):
+    return RateLimiter("test", rate=50, burst=4, reserve=2)
+
+
+def test_burst_is_granted_then_calls_wait_for_refill(limiter):
+    assert [limiter.acquire(INTERACTIVE) for _ in range(4)] == [0.0] * 4
+
+    waited = limiter.acquire(INTERACTIVE)
+
+    # One token refills in 20ms at 50/s
+    assert 0.01 <= waited < 0.2
+
+
+def test_background_lane_leaves_the_reserve_to_interactive_calls(limiter):
+    limiter.acquire(BACKGROUND)
+    limiter.acquire(BACKGROUND)
+
+    with pytest.raises(RateLimited):
+        limiter.acquire(BACKGROUND, max_wait=0)
+    # The reserved tokens are still there for a turn
+    assert limiter.acquire(INTERACTIVE, max_wait=0) == 0.0
+    assert limiter.acquire(INTERACTIVE, max_wait=0) == 0.0
+
+
+def test_retry_after_blocks_every_limiter_on_the_same_redis(limiter):
+    other_worker = RateLimiter("test", rate=50, burst=4)
+
+    limiter.block(0.3)
+
+    with pytest.raises(RateLimited) as exc:
+        other_worker.acquire(INTERACTIVE, max_wait=0.1)
+    assert 0.1 < exc.value.retry_after <= 0.3
+    assert other_worker.acquire(INTERACTIVE, max_wait=1) >= 0.2
+
+
+def test_limiter_fails_open_without_redis(limiter, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise redis.exceptions.ConnectionError("down")
+
+    monkeypatch.setattr(limiter, "_acquire", unavailable)
+
+    assert limiter.acquire(INTERACTIVE, max_wait=0) == 0.0
+
+
+def test_lane_defaults_to_interactive():
+    assert current_lane() == INTERACTIVE
+    with rate_limit_lane(BACKGROUND):
+        assert current_lane() == BACKGROUND
+    assert current_lane() == INTERACTIVE
+
+
+@pytest.fixture
+def upstream(monkeypatch, fake_redis):
+    """Spotify answers with the queued statuses; the shared limiter is a fast local one."""
+    statuses = []
+    sent = []
+
+    def send(self, request, *args, **kwargs):
+        sent.append(time.monotonic())
+        response = requests.Response()
+        response.status_code = statuses.pop(0) if statuses else 200
+        response.headers["Retry-After"] = "0.2"
+        response.raw = io.BytesIO(b"{}")
+        response.url = request.url
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", send)
+    monkeypatch.setattr(spotify_adapter, "spotify_rate_limiter", RateLimiter("spotify-test", rate=1000, burst=10))
+    return statuses, sent
+
+
+def test_429_is_retried_after_the_shared_retry_after(upstream):
+    statuses, sent = upstream
+    statuses.append(429)
+    session = spotify_adapter.build_spotify_session()
+
+    response = session.get("https://api.spotify.com/v1/me/player")
+
+    assert response.status_code == 200
+    assert len(sent) == 2
+    assert sent[1] - sent[0] >= 0.19
+
+
+def test_interactive_call_gives_up_with_a_429_instead_of_waiting_long(upstream, monkeypatch):
+    statuses, sent = upstream
+    spotify_adapter.spotify_rate_limiter.block(30)
+
+    with pytest.raises(SpotifyException) as exc:
+        spotify_adapter.build_spotify_session().get("https://api.spotify.com/v1/me/player")
+
+    assert exc.value.http_status == 429
+    assert sent == []
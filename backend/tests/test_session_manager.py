@@ -79,3 +79,47 @@ def test_history_ttl_expiry(monkeypatch):
     SessionManager.clear_turn_history(sid)
     assert SessionManager.get_turn_history(sid) == []
 
+
+# ----- Batched turn access -----
+def count_round_trips(monkeypatch):
+    import redis
+    calls = []
+    original = redis.connection.Connection.send_packed_command
+
+    def counting(self, command, check_health=True):
+        calls.append(command)
+        return original(self, command, check_health)
+
+    monkeypatch.setattr(redis.connection.Connection, "send_packed_command", counting)
+    return calls
+
+def test_turn_costs_two_round_trips(monkeypatch):
+    sid = "batched1"
+    SessionManager.clear_turn_history(sid)
+    SessionManager.add_turn_history(sid, "user", "play something")
+    SessionManager.save_pending_context(sid, "play_song", {"artist": "Adele"}, ["song_name"])
+
+    calls = count_round_trips(monkeypatch)
+    pending, history = SessionManager.load_turn_context(sid)
+    SessionManager.commit_turn(sid, [("user", "Hello"), ("assistant", "Playing Hello")])
+    assert len(calls) == 2
+
+    assert pending["pending_action"] == "play_song"
+    assert pending["missing_params"] == ["song_name"]
+    assert [m["text"] for m in history] == ["play something"]
+
+    # pending context is consumed by the load, history holds the committed turn
+    assert SessionManager.get_pending_context(sid) is None
+    assert [m["text"] for m in SessionManager.get_turn_history(sid)] == ["play something", "Hello", "Playing Hello"]
+
+def test_commit_turn_saves_pending_and_trims(monkeypatch):
+    sid = "batched2"
+    SessionManager.clear_turn_history(sid)
+    monkeypatch.setattr("backend.services.session_manager.MAX_HISTORY_MESSAGES", 3)
+    for i in range(3):
+        SessionManager.commit_turn(sid, [("user", f"u{i}"), ("assistant", f"a{i}")])
+    SessionManager.commit_turn(sid, [], pending={"pending_action": "create_playlist", "pending_parameters": {}})
+
+    pending, history = SessionManager.load_turn_context(sid)
+    assert pending == {"pending_action": "create_playlist", "pending_parameters": {}, "missing_params": []}
+    assert [m["text"] for m in history] == ["a1", "u2", "a2"]
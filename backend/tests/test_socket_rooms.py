@@ -0,0 +1,74 @@
+import pytest
+from backend import socket_manager
+from backend.socket_manager import sio, emit_state, join_session
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    packets = []
+
+    async def fake_send(eio_sid, pkt):
+        packets.append((eio_sid, pkt.data))
+
+    monkeypatch.setattr(sio, "_send_eio_packet", fake_send)
+    return packets
+
+
+@pytest.fixture
+def clients():
+    connected = []
+
+    async def connect(eio_sid: str, session_id: str | None = None, query: str = ""):
+        sid = await sio.manager.connect(eio_sid, "/")
+        auth = {"session_id": session_id} if session_id else None
+        await socket_manager.connect(sid, {"QUERY_STRING": query}, auth)
+        connected.append(sid)
+        return sid
+
+    yield connect
+    for sid in connected:
+        sio.manager.basic_disconnect(sid, "/")
+
+
+@pytest.mark.asyncio
+async def test_state_update_reaches_only_its_session(clients, sent):
+    for i in range(200):
+        await clients(f"eio-{i}", session_id=f"sess-{i}")
+    # A second tab of the same session
+    await clients("eio-tab", query="session_id=sess-7")
+    sent.clear()
+
+    await emit_state("sess-7", "THINKING", "Processing intent...")
+
+    assert sorted(eio for eio, _ in sent) == ["eio-7", "eio-tab"]
+    assert '"state":"THINKING"' in sent[0][1] and '"session_id":"sess-7"' in sent[0][1]
+
+
+@pytest.mark.asyncio
+async def test_emit_without_session_is_not_broadcast(clients, sent):
+    await clients("eio-a", session_id="sess-a")
+    await clients("eio-b")
+    sent.clear()
+
+    await emit_state(None, "THINKING")
+
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_join_session_moves_the_connection(clients, sent):
+    sid = await clients("eio-move", session_id="sess-old")
+
+    assert await socket_manager.on_join_session(sid, {"session_id": "sess-new"}) == {"ok": True, "session_id": "sess-new"}
+    sent.clear()
+
+    await emit_state("sess-old", "SPEAKING")
+    assert sent == []
+
+    await emit_state("sess-new", "SPEAKING")
+    assert [eio for eio, _ in sent] == ["eio-move"]
+
+
+@pytest.mark.asyncio
+async def test_join_session_ignores_disconnected_sid():
+    await join_session("not-connected", "sess-x")
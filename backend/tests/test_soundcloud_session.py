@@ -0,0 +1,146 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from prometheus_client import REGISTRY
+from backend.adapters import soundcloud_adapter
+from backend.adapters.soundcloud_adapter import SoundCloudAdapter
+from backend.services.music_action_service import MusicActionService
+from backend.utils import metrics
+from backend.utils.custom_exceptions import ExternalAPIError
+
+
+class FakeSoundCloud(ThreadingHTTPServer):
+    """Keep-alive stand-in that counts connections and can fail, stall or set cookies per path."""
+    daemon_threads = True
+
+    def __init__(self):
+        self.connections = 0
+        self.calls = []
+        self.failures = {}
+        self.stall_seconds = 0.0
+        self.cookies = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                server.calls.append((self.command, self.path))
+                server.cookies.append(self.headers.get("Cookie"))
+                if server.stall_seconds and self.path.startswith("/slow"):
+                    time.sleep(server.stall_seconds)
+                status = 503 if server.failures.get(self.path, 0) > 0 else 200
+                if status == 503:
+                    server.failures[self.path] -= 1
+                body = b'{"id": 1, "collection": []}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Set-Cookie", "sc_session=abc; Path=/")
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+            def log_message(self, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def soundcloud(monkeypatch):
+    server = FakeSoundCloud()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(SoundCloudAdapter, "BASE_API_URL", server.base_url)
+    # A fresh process-wide session per test
+    monkeypatch.setattr(soundcloud_adapter, "_session", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_adapters_share_one_keep_alive_connection(soundcloud):
+    for token in ("a", "b", "c"):
+        assert SoundCloudAdapter(token).validate_token()
+        SoundCloudAdapter(token).fetch_user_playlists()
+
+    assert len(soundcloud.calls) == 6
+    assert soundcloud.connections == 1
+    # Cookies set for one account are never sent with another account's calls
+    assert soundcloud.cookies == [None] * 6
+
+
+def test_calls_without_a_timeout_get_the_default_read_timeout(soundcloud, monkeypatch):
+    monkeypatch.setattr(soundcloud_adapter, "SOUNDCLOUD_READ_TIMEOUT", 0.2)
+    soundcloud.stall_seconds = 1.0
+
+    start = time.monotonic()
+    # requests reports the read timeout that exhausted the retries as a ConnectionError
+    with pytest.raises(requests.exceptions.ConnectionError, match="Read timed out"):
+        soundcloud_adapter.soundcloud_session().get(f"{soundcloud.base_url}/slow")
+
+    # One read retry for an idempotent GET, then it gives up instead of hanging the thread
+    assert soundcloud.calls == [("GET", "/slow"), ("GET", "/slow")]
+    assert time.monotonic() - start < 1.0
+
+
+def test_idempotent_calls_are_retried_on_5xx(soundcloud):
+    soundcloud.failures["/me/playlists"] = 2
+
+    SoundCloudAdapter("a").fetch_user_playlists()
+
+    assert soundcloud.calls == [("GET", "/me/playlists")] * 3
+
+
+def test_posts_are_sent_once(soundcloud):
+    soundcloud.failures["/likes/tracks/42"] = 1
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        SoundCloudAdapter("a").add_track_to_favorites(None, 1, "42")
+
+    assert soundcloud.calls == [("POST", "/likes/tracks/42")]
+
+
+def test_latency_is_recorded_per_endpoint(soundcloud, monkeypatch):
+    metrics._instrument_requests()
+    monkeypatch.setitem(metrics.UPSTREAM_HOSTS, "127.0.0.1", "soundcloud")
+    labels = {"service": "soundcloud", "endpoint": "/me/playlists"}
+    before = REGISTRY.get_sample_value("sam_upstream_request_duration_seconds_count", labels) or 0.0
+
+    SoundCloudAdapter("a").fetch_user_playlists()
+
+    assert REGISTRY.get_sample_value("sam_upstream_request_duration_seconds_count", labels) == before + 1
+
+
+def test_timeouts_become_network_errors():
+    error = MusicActionService._action_error(
+        requests.exceptions.ReadTimeout("read timed out"), "add_to_favorites", "soundcloud", {}
+    )
+
+    assert isinstance(error, ExternalAPIError)
+    assert error.error_code == "network" and error.platform == "soundcloud"
+
+
+def test_liked_pages_raise_instead_of_ending_early(soundcloud, monkeypatch):
+    monkeypatch.setattr(soundcloud_adapter.Retry, "get_backoff_time", lambda self: 0)
+    soundcloud.failures["/me/likes/tracks?limit=50"] = 8
+
+    # The library sync deletes songs missing from the pages, so a failed page must not look like the end
+    with pytest.raises(requests.exceptions.RequestException):
+        list(SoundCloudAdapter("a").iter_liked_track_pages())
+    assert SoundCloudAdapter("a").fetch_liked_tracks() == []
@@ -0,0 +1,185 @@
+import time
+import asyncio
+import threading
+import fakeredis
+import httpx
+import pytest
+from backend.adapters import spotify_adapter, spotify_async_adapter
+from backend.adapters.spotify_async_adapter import AsyncSpotifyAdapter
+from backend.services import rate_limiter, playback_snapshot
+from backend.services.rate_limiter import RateLimiter
+from backend.services.music_action_service import MusicActionService
+from backend.models.database_models import SearchCache
+from backend.utils.custom_exceptions import AuthenticationError, ExternalAPIError
+
+ACCOUNT_ID = 49
+
+
+class FakeWebAPI:
+    """MockTransport handler for the Web API, recording requests and how many overlap."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = []
+        self.statuses = []
+        self.errors = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path, dict(request.url.params)))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.statuses:
+            status = self.statuses.pop(0)
+            return httpx.Response(status, headers={"Retry-After": "0.2"}, json={"error": {"status": status, "message": "nope"}})
+        path = request.url.path
+        if path.endswith("/me/player/devices"):
+            return httpx.Response(200, json={"devices": [{"id": "phone", "is_active": True, "name": "Phone", "volume_percent": 50}]})
+        if path.endswith("/search"):
+            track = {
+                "name": "Levitating", "uri": "spotify:track:lev", "duration_ms": 1000,
+                "artists": [{"name": "Dua Lipa"}], "album": {"name": "Future Nostalgia", "images": [{"url": "http://img"}]},
+            }
+            return httpx.Response(200, json={"tracks": {"items": [track]}})
+        return httpx.Response(204)
+
+
+class RecordingRedis(fakeredis.FakeStrictRedis):
+    """Records the thread every Redis command runs on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def execute_command(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().execute_command(*args, **kwargs)
+
+
+@pytest.fixture
+def web_api(monkeypatch):
+    client = RecordingRedis()
+    monkeypatch.setattr(rate_limiter, "redis_client", client)
+    monkeypatch.setattr(spotify_adapter, "redis_client", client)
+    monkeypatch.setattr(playback_snapshot, "redis_client", client)
+    monkeypatch.setattr(spotify_async_adapter, "spotify_rate_limiter", RateLimiter("spotify-async-test", rate=1000, burst=100))
+
+    api = FakeWebAPI()
+    clients = {}
+
+    def get_async_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(transport=httpx.MockTransport(api), base_url="https://api.spotify.com/v1/")
+        return clients[loop]
+
+    monkeypatch.setattr(spotify_async_adapter, "get_async_client", get_async_client)
+    api.redis = client
+    return api
+
+
+def action(name, db=None, **parameters):
+    return MusicActionService.perform_music_action_async(name, "spotify", {
+        "access_token": "token", "db_session": db, "platform_account_id": ACCOUNT_ID, **parameters,
+    })
+
+
+@pytest.mark.asyncio
+async def test_device_is_looked_up_once_across_commands(web_api):
+    await action("pause_song")
+    await action("resume_song")
+
+    assert [(method, path) for method, path, _ in web_api.requests] == [
+        ("GET", "/v1/me/player/devices"),
+        ("PUT", "/v1/me/player/pause"),
+        ("PUT", "/v1/me/player/play"),
+    ]
+    assert web_api.requests[1][2] == {"device_id": "phone"}
+
+
+@pytest.mark.asyncio
+async def test_play_song_searches_once_and_caches_the_result(web_api, test_db):
+    test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.commit()
+
+    first = await action("play_song", test_db, song_name="levitating")
+    await action("play_song", test_db, song_name="levitating")
+
+    assert first["status"] == "success" and first["track_info"]["title"] == "Levitating"
+    assert [path for _, path, _ in web_api.requests].count("/v1/search") == 1
+    assert [path for _, path, _ in web_api.requests].count("/v1/me/player/play") == 2
+    test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.commit()
+
+
+@pytest.mark.asyncio
+async def test_429_waits_for_the_shared_retry_after(web_api):
+    web_api.statuses.append(429)
+    start = time.monotonic()
+
+    await AsyncSpotifyAdapter("token").sp.pause_playback(device_id="phone")
+
+    assert len(web_api.requests) == 2
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_401_is_translated_like_the_threaded_path(web_api):
+    await action("pause_song")
+    web_api.statuses.append(401)
+
+    with pytest.raises(AuthenticationError):
+        await action("pause_song")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_actions_do_not_wait_for_threads(web_api):
+    web_api.latency = 0.05
+    await action("pause_song")  # warms the device cache
+
+    start = time.monotonic()
+    await asyncio.gather(*(action("pause_song") for _ in range(50)))
+
+    # 50 calls of 50ms each overlap on one thread instead of queueing for executor threads
+    assert web_api.max_in_flight == 50
+    assert time.monotonic() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_redis_and_db_work_stays_off_the_loop(web_api, test_db):
+    from sqlalchemy import event
+
+    test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+    test_db.commit()
+    query_threads = set()
+    record = lambda *args: query_threads.add(threading.get_ident())
+    event.listen(test_db.get_bind(), "before_cursor_execute", record)
+    try:
+        await action("play_song", test_db, song_name="levitating")
+        await action("play_song", test_db, song_name="levitating")
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", record)
+        test_db.query(SearchCache).filter_by(platform_account_id=ACCOUNT_ID).delete()
+        test_db.commit()
+
+    loop_thread = threading.get_ident()
+    assert query_threads and loop_thread not in query_threads
+    assert web_api.redis.threads and loop_thread not in web_api.redis.threads
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_reported_as_network_errors(web_api):
+    await action("pause_song")
+    web_api.errors.append(httpx.ReadTimeout("timed out"))
+
+    with pytest.raises(ExternalAPIError) as error:
+        await action("pause_song")
+
+    assert error.value.error_code == "network" and error.value.platform == "spotify"
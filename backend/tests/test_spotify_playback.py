@@ -0,0 +1,340 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import fakeredis
+import pytest
+from spotipy.exceptions import SpotifyException
+from backend.adapters import spotify_adapter
+from backend.adapters.spotify_adapter import SpotifyAdapter
+from backend.services import playback_snapshot
+from backend.models.database_models import PlatformAccount, UserLikedSong
+
+
+class FakeSpotify:
+    """Records the Web API calls made by the adapter."""
+
+    def __init__(self, devices=None):
+        self.calls = []
+        self.device_list = devices if devices is not None else [{"id": "phone", "is_active": True, "name": "Phone", "volume_percent": 50}]
+        self.reject_devices = set()
+
+    def devices(self):
+        self.calls.append(("devices",))
+        return {"devices": self.device_list}
+
+    def pause_playback(self, device_id=None):
+        self.calls.append(("pause", device_id))
+        if device_id in self.reject_devices:
+            raise SpotifyException(404, -1, "Device not found", reason="NO_ACTIVE_DEVICE")
+
+    def seek_track(self, position_ms, device_id=None):
+        self.calls.append(("seek", device_id))
+
+    def next_track(self, device_id=None):
+        self.calls.append(("next", device_id))
+
+    def previous_track(self, device_id=None):
+        self.calls.append(("previous", device_id))
+
+    def current_playback(self):
+        # Serves the queued playback states in order, then keeps repeating the last one
+        self.calls.append(("playback",))
+        return self.playback_states.pop(0) if len(self.playback_states) > 1 else self.playback_states[0]
+
+
+    def volume(self, volume_percent, device_id=None):
+        self.calls.append(("volume", volume_percent))
+
+    def current_user_saved_tracks_add(self, ids):
+        self.calls.append(("like", ids[0]))
+
+    def start_playback(self, device_id=None, uris=None):
+        self.calls.append(("start", tuple(uris)))
+
+    def current_user_saved_tracks(self, limit=20, offset=0):
+        self.calls.append(("saved_tracks", offset))
+        items = [
+            {"added_at": "2024-01-01T00:00:00Z", "track": {
+                "id": "api1", "name": "api1", "uri": "spotify:track:api1", "duration_ms": 1000,
+                "artists": [{"name": "Artist"}], "album": {"name": "Album"},
+            }}
+        ]
+        return {"items": items, "total": 1}
+
+
+def playing(uri, progress_ms=30000, is_playing=True, volume=40):
+    return {
+        "is_playing": is_playing,
+        "progress_ms": progress_ms,
+        "device": {"id": "phone", "volume_percent": volume},
+        "item": {
+            "id": uri.split(":")[-1], "uri": uri, "name": uri.split(":")[-1], "duration_ms": 200000,
+            "artists": [{"name": "Artist"}], "album": {"name": "Album", "images": []},
+        },
+    }
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeStrictRedis()
+    monkeypatch.setattr(spotify_adapter, "redis_client", client)
+    monkeypatch.setattr(playback_snapshot, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def adapter(fake_redis, monkeypatch):
+    monkeypatch.setattr(spotify_adapter, "volume_coalescer", spotify_adapter.VolumeCoalescer(window=0.2))
+    adapter = SpotifyAdapter("token")
+    adapter.sp = FakeSpotify()
+    adapter.platform_account_id = 7
+    return adapter
+
+
+def test_device_is_looked_up_once_across_commands(adapter, fake_redis):
+    adapter.pause()
+    adapter.pause()
+    adapter.restart_current_track()
+
+    assert adapter.sp.calls == [("devices",), ("pause", "phone"), ("pause", "phone"), ("seek", "phone")]
+    assert fake_redis.get("spotify:device:7") == b"phone"
+    assert 0 < fake_redis.ttl("spotify:device:7") <= spotify_adapter.DEVICE_CACHE_TTL_SECONDS
+
+
+def test_stale_cached_device_is_dropped_and_retried_once(adapter, fake_redis):
+    fake_redis.set("spotify:device:7", "old-speaker")
+    adapter.sp.reject_devices = {"old-speaker"}
+
+    adapter.pause()
+
+    assert adapter.sp.calls == [("pause", "old-speaker"), ("devices",), ("pause", "phone")]
+    assert fake_redis.get("spotify:device:7") == b"phone"
+
+
+def test_fresh_lookup_failure_is_not_retried(adapter, fake_redis):
+    adapter.sp.reject_devices = {"phone"}
+
+    with pytest.raises(SpotifyException):
+        adapter.pause()
+
+    assert adapter.sp.calls == [("devices",), ("pause", "phone")]
+
+
+def test_status_check_warms_the_cache(adapter, fake_redis):
+    adapter.sp.device_list = [{"id": "laptop", "is_active": False, "name": "Laptop"}]
+
+    assert adapter.get_active_device()["id"] == "laptop"
+    adapter.pause()
+
+    assert adapter.sp.calls == [("devices",), ("pause", "laptop")]
+
+
+def test_adapter_without_account_is_not_cached(fake_redis):
+    adapter = SpotifyAdapter("token")
+    adapter.sp = FakeSpotify()
+
+    adapter.pause()
+    adapter.pause()
+
+    assert [c[0] for c in adapter.sp.calls] == ["devices", "pause", "devices", "pause"]
+    assert fake_redis.keys("spotify:device:*") == []
+
+
+def test_skip_returns_as_soon_as_the_track_changes(adapter, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(spotify_adapter.time, "sleep", sleeps.append)
+    adapter.sp.playback_states = [playing("spotify:track:a"), playing("spotify:track:a"), playing("spotify:track:a"), playing("spotify:track:b")]
+
+    result = adapter.skip_current_track()
+
+    assert result["track_info"]["title"] == "b"
+    assert result["track_change"]["confirmed"] is True
+    assert result["track_change"]["polls"] == 3
+    # No fixed wait: the first poll is immediate, then the interval doubles
+    assert sleeps == [spotify_adapter.TRACK_CHANGE_FIRST_INTERVAL, spotify_adapter.TRACK_CHANGE_FIRST_INTERVAL * 2]
+
+
+def test_skip_gives_up_at_the_deadline(adapter, monkeypatch):
+    monkeypatch.setattr(spotify_adapter, "TRACK_CHANGE_TIMEOUT_SECONDS", 0.2)
+    adapter.sp.playback_states = [playing("spotify:track:a")]
+
+    result = adapter.skip_current_track()
+
+    assert result["track_info"]["title"] == "a"
+    assert result["track_change"]["confirmed"] is False
+    assert 200 <= result["track_change"]["wait_ms"] < 400
+
+
+def test_previous_accepts_a_restart_of_the_same_track(adapter, monkeypatch):
+    monkeypatch.setattr(spotify_adapter.time, "sleep", lambda seconds: None)
+    adapter.sp.playback_states = [playing("spotify:track:a", 45000), playing("spotify:track:a", 200)]
+
+    result = adapter.previous_track()
+
+    assert result["track_change"]["confirmed"] is True
+    assert result["track_change"]["polls"] == 1
+
+
+def test_playback_reads_share_one_snapshot(adapter):
+    adapter.sp.playback_states = [playing("spotify:track:a", volume=35)]
+
+    assert adapter.get_currently_playing_song()["track_info"]["title"] == "a"
+    assert adapter.get_volume() == 35
+    assert adapter.change_volume(10, "increase") == "Volume set to 45%"
+    # The command's effect is applied to the snapshot instead of being read back
+    assert adapter.get_volume() == 45
+
+    assert [c for c in adapter.sp.calls if c[0] == "playback"] == [("playback",)]
+
+
+def test_like_reads_the_live_track_not_the_snapshot(adapter, test_db):
+    # The song was skipped in the Spotify app after the poller's last read
+    playback_snapshot.store_snapshot(7, playback_snapshot.snapshot_from_playback(playing("spotify:track:skipped")))
+    adapter.sp.playback_states = [playing("spotify:track:liked1")]
+
+    adapter.add_current_to_favorites(test_db, 7)
+
+    assert adapter.sp.calls == [("playback",), ("like", "liked1")]
+    # The live read refreshes the shared snapshot for the reads that follow
+    assert playback_snapshot.get_snapshot(7)["track"]["uri"] == "spotify:track:liked1"
+    test_db.query(UserLikedSong).filter_by(platform_account_id=7).delete()
+    test_db.commit()
+
+
+def test_snapshot_of_a_finished_track_is_not_used(adapter):
+    snapshot = playback_snapshot.snapshot_from_playback(playing("spotify:track:a", progress_ms=199500))
+    snapshot["fetched_at"] -= 5
+    playback_snapshot.store_snapshot(7, snapshot)
+    adapter.sp.playback_states = [playing("spotify:track:b")]
+
+    assert adapter.get_currently_playing_song()["track_info"]["title"] == "b"
+
+
+def test_pause_marks_the_snapshot_paused(adapter):
+    adapter.sp.playback_states = [playing("spotify:track:a")]
+    adapter.get_currently_playing_song()
+
+    adapter.pause()
+
+    snapshot = playback_snapshot.get_snapshot(7)
+    assert snapshot["is_playing"] is False
+    assert snapshot["track"]["uri"] == "spotify:track:a"
+
+
+def test_relative_volume_change_is_one_read_and_one_write(adapter, fake_redis):
+    assert adapter.change_volume(None, "increase") == "Volume set to 60%"
+
+    assert adapter.sp.calls == [("devices",), ("volume", 60)]
+    assert fake_redis.get("spotify:device:7") == b"phone"
+
+
+def test_rapid_volume_changes_merge_into_one_trailing_write(adapter):
+    coalescer = spotify_adapter.volume_coalescer
+
+    replies = [adapter.change_volume(10, "increase") for _ in range(3)]
+
+    # Only the first reply claims the write landed; the merged ones are still pending
+    assert replies == ["Volume set to 60%", "Setting volume to 70%", "Setting volume to 80%"]
+    # The first change goes out at once; the next two only move the pending target
+    assert adapter.sp.calls == [("devices",), ("volume", 60)]
+    deadline = time.monotonic() + 2
+    while coalescer.writes < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert adapter.sp.calls == [("devices",), ("volume", 60), ("volume", 80)]
+    assert (coalescer.writes, coalescer.merged) == (2, 2)
+
+
+def test_failed_trailing_volume_write_is_not_built_on():
+    coalescer = spotify_adapter.VolumeCoalescer(window=0.05)
+    written = []
+    failed = threading.Event()
+
+    def fail(volume):
+        failed.set()
+        raise RuntimeError("device went away")
+
+    coalescer.submit("acc", 50, written.append)
+    assert coalescer.submit("acc", 60, fail) is False
+    assert coalescer.recent_target("acc") == 60
+
+    assert failed.wait(2)
+    deadline = time.monotonic() + 2
+    while "acc" in coalescer._state and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    # 60% never reached Spotify, so the next relative change must read the real volume
+    assert written == [50]
+    assert "acc" not in coalescer._state
+
+
+def test_failed_leading_volume_write_is_not_built_on():
+    coalescer = spotify_adapter.VolumeCoalescer(window=5)
+
+    def fail(volume):
+        raise RuntimeError("device went away")
+
+    with pytest.raises(RuntimeError):
+        coalescer.submit("acc", 70, fail)
+    assert coalescer.recent_target("acc") is None
+
+
+@pytest.fixture
+def liked_library(test_db):
+    account = PlatformAccount(system_user_id=1, platform_name="spotify", platform_user_id="liked-lib", last_synced=datetime.now(timezone.utc))
+    test_db.add(account)
+    test_db.flush()
+    test_db.add_all([
+        UserLikedSong(platform_account_id=account.id, track_uri=f"spotify:track:lib{account.id}-{day}", meta_data={"added_at": f"2024-01-{day:02d}T00:00:00Z"})
+        for day in (3, 1, 2)
+    ])
+    test_db.commit()
+    yield account
+    test_db.query(UserLikedSong).filter_by(platform_account_id=account.id).delete()
+    test_db.delete(account)
+    test_db.commit()
+
+
+def test_liked_songs_play_from_the_synced_library(adapter, test_db, liked_library):
+    adapter.play_liked_songs(test_db, liked_library.id)
+
+    prefix = f"spotify:track:lib{liked_library.id}-"
+    assert adapter.sp.calls[-1] == ("start", (prefix + "3", prefix + "2", prefix + "1"))
+    assert not any(call[0] == "saved_tracks" for call in adapter.sp.calls)
+
+
+def test_liked_songs_shuffle_plays_every_synced_song(adapter, test_db, liked_library):
+    adapter.play_liked_songs(test_db, liked_library.id, shuffle=True)
+
+    assert sorted(adapter.sp.calls[-1][1]) == sorted(f"spotify:track:lib{liked_library.id}-{day}" for day in (1, 2, 3))
+
+
+def test_liked_songs_are_limited_by_the_query(test_db, liked_library):
+    from sqlalchemy import event
+    from backend.services.library_sync_service import local_liked_songs
+
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(test_db.get_bind(), "before_cursor_execute", capture)
+    try:
+        newest = local_liked_songs(test_db, liked_library.id, limit=2)
+        shuffled = local_liked_songs(test_db, liked_library.id, limit=2, shuffle=True)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", capture)
+
+    prefix = f"spotify:track:lib{liked_library.id}-"
+    assert [uri for uri, _ in newest] == [prefix + "3", prefix + "2"]
+    assert len({uri for uri, _ in shuffled}) == 2
+    liked_queries = [sql for sql in statements if "user_liked_songs" in sql]
+    assert len(liked_queries) == 2 and all("LIMIT" in sql for sql in liked_queries)
+    # Undated songs (synced before like dates were stored) sort last on every database
+    assert "NULLS LAST" in liked_queries[0]
+
+
+def test_stale_library_falls_back_to_the_api(adapter, test_db, liked_library):
+    liked_library.last_synced = datetime.now(timezone.utc) - timedelta(days=3)
+    test_db.commit()
+
+    adapter.play_liked_songs(test_db, liked_library.id)
+
+    assert ("saved_tracks", 0) in adapter.sp.calls
+    assert adapter.sp.calls[-1] == ("start", ("spotify:track:api1",))
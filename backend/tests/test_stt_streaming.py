@@ -0,0 +1,93 @@
+import io
+import tracemalloc
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.speech_to_text import SpeechToTextService
+from backend.services import audio_preprocessing
+from backend.utils.custom_exceptions import AudioTooLargeError
+
+CHUNK = 64 * 1024
+
+
+async def audio_chunks(count: int):
+    payload = b"\x1aE\xdf\xa3" + b"\x00" * (CHUNK - 4)
+    for _ in range(count):
+        yield payload
+
+
+class StreamingTransport(httpx.AsyncBaseTransport):
+    """Consumes the request body chunk by chunk, the way a real socket would (MockTransport buffers it)."""
+
+    def __init__(self):
+        self.received = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        total = 0
+        async for chunk in request.stream:
+            total += len(chunk)
+        self.received["bytes"] = total
+        self.received["content_type"] = request.headers["content-type"]
+        return httpx.Response(200, json={"text": " play shape of you "})
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_keeps_memory_bounded(monkeypatch):
+    monkeypatch.setattr("backend.services.speech_to_text.GROQ_API_KEY", "test-key")
+    transport = StreamingTransport()
+    chunk_count = 160  # 10 MB of audio
+
+    tracemalloc.start()
+    async with httpx.AsyncClient(transport=transport) as client:
+        text = await SpeechToTextService.transcribe_stream(
+            audio_chunks(chunk_count), filename="audio.webm", content_type="audio/webm", client=client
+        )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert text == "play shape of you"
+    assert transport.received["bytes"] > chunk_count * CHUNK
+    assert transport.received["content_type"].startswith("multipart/form-data; boundary=")
+    assert peak < 2 * 1024 * 1024  # a handful of chunks in flight, never the whole upload
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_enforces_size_limit(monkeypatch):
+    monkeypatch.setattr("backend.services.speech_to_text.GROQ_API_KEY", "test-key")
+    async with httpx.AsyncClient(transport=StreamingTransport()) as client:
+        with pytest.raises(AudioTooLargeError):
+            await SpeechToTextService.transcribe_stream(audio_chunks(20), max_bytes=CHUNK * 10, client=client)
+
+
+@pytest.mark.asyncio
+async def test_large_non_wav_upload_is_streamed(monkeypatch):
+    streamed = {}
+
+    async def fake_stream(chunks, filename="audio.wav", content_type="audio/wav", **kwargs):
+        streamed["bytes"] = sum([len(c) async for c in chunks])
+        streamed["content_type"] = content_type
+        return "skip song"
+
+    def fail_buffered(audio_bytes):
+        raise AssertionError("large non-WAV uploads must not be buffered")
+
+    monkeypatch.setattr(audio_preprocessing.SpeechToTextService, "transcribe_stream", fake_stream)
+    upload = io.BytesIO(b"\x1aE\xdf\xa3" + b"\x00" * (3 * 1024 * 1024))
+
+    text = await audio_preprocessing.transcribe_upload(upload, fail_buffered, content_type="audio/webm")
+    assert text == "skip song"
+    assert streamed == {"bytes": 3 * 1024 * 1024 + 4, "content_type": "audio/webm"}
+
+
+def test_oversized_upload_is_rejected_before_calling_stt(monkeypatch):
+    monkeypatch.setattr(audio_preprocessing, "STT_MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr("backend.api.v1.voice_routes.STT_MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(SpeechToTextService, "transcribe_audio", lambda audio: pytest.fail("STT must not be called"))
+
+    client = TestClient(app)
+    response = client.post("/v1/voice/stt", files={"audio": ("a.webm", b"\x00" * 4096, "audio/webm")})
+    assert response.status_code == 413
+
+    response = client.post("/v1/voice/stt/stream", content=b"\x00" * 4096, headers={"Content-Type": "audio/webm"})
+    assert response.status_code == 413
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from backend.models.database_models import PlatformAccount
+from backend.services import data_sync_service, token_cache
+from backend.services.dialog_manager import DialogManager
+from backend.utils import encryption
+from backend.utils.encryption import encrypt_token, get_fernet
+
+
+@pytest.fixture
+def spotify_account(test_db, monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_KEY", "2uaPEDqVoqcR3u37nxEgoDoUx1SD5oznv87XKVQOctE=")
+    acc = PlatformAccount(
+        system_user_id=1,
+        platform_name="spotify",
+        platform_user_id="token_cache_user",
+        refresh_token=encrypt_token("rt"),
+        meta_data={
+            "access_token": encrypt_token("at-live"),
+            "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        }
+    )
+    test_db.add(acc)
+    test_db.commit()
+    test_db.refresh(acc)
+    yield acc
+    token_cache.invalidate_access_token("spotify", acc.id)
+    test_db.delete(acc)
+    test_db.commit()
+
+
+def test_fernet_is_built_once(monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_KEY", "2uaPEDqVoqcR3u37nxEgoDoUx1SD5oznv87XKVQOctE=")
+    assert get_fernet() is get_fernet()
+
+
+def test_rotated_keys_still_decrypt(monkeypatch):
+    old_key = "2uaPEDqVoqcR3u37nxEgoDoUx1SD5oznv87XKVQOctE="
+    monkeypatch.setenv("ENCRYPTION_KEY", old_key)
+    legacy = encrypt_token("legacy-token")
+
+    monkeypatch.setenv("ENCRYPTION_KEY", f"{'a' * 43}=,{old_key}")
+    assert encryption.decrypt_token(legacy) == "legacy-token"
+
+
+def test_warm_credentials_skip_db_and_decryption(monkeypatch, test_db, spotify_account):
+    dialog = DialogManager(test_db, "sess-token", "spotify", platform_account_id=spotify_account.id)
+    creds = dialog._get_platform_credentials()
+    assert creds["credentials"]["access_token"] == "at-live"
+
+    class NoQueries:
+        def query(self, *args):
+            raise AssertionError("warm credential resolution must not query the DB")
+
+    def no_decrypt(token):
+        raise AssertionError("warm credential resolution must not decrypt")
+
+    monkeypatch.setattr(data_sync_service, "decrypt_token", no_decrypt)
+    dialog.db = NoQueries()
+    assert dialog._get_platform_credentials()["credentials"]["access_token"] == "at-live"
+
+
+def test_invalidated_token_goes_back_to_db(monkeypatch, test_db, spotify_account):
+    assert data_sync_service.get_valid_spotify_access_token(test_db, spotify_account) == "at-live"
+    token_cache.invalidate_access_token("spotify", spotify_account.id)
+    assert token_cache.get_cached_access_token("spotify", spotify_account.id) is None
+
+    # Nearly expired tokens are not served from the cache
+    token_cache.cache_access_token("spotify", spotify_account.id, "at-old", datetime.now(timezone.utc) + timedelta(seconds=5))
+    assert token_cache.get_cached_access_token("spotify", spotify_account.id) is None
+
+
+@pytest.mark.asyncio
+async def test_cold_credentials_are_resolved_off_the_loop(monkeypatch, test_db, spotify_account):
+    import threading
+    from backend.services import dialog_manager
+
+    threads = []
+
+    def resolve(db, account):
+        threads.append(threading.get_ident())
+        return "at-live"
+
+    monkeypatch.setattr(dialog_manager, "get_valid_spotify_access_token", resolve)
+    monkeypatch.setattr(dialog_manager, "is_async_spotify_adapter_enabled", lambda: False)
+    monkeypatch.setattr(dialog_manager.MusicActionService, "perform_music_action",
+                        staticmethod(lambda action, platform, params: params["access_token"]))
+    dialog = DialogManager(test_db, "sess-cold", "spotify", platform_account_id=spotify_account.id)
+
+    assert await dialog._handle_music_action("pause_song", {}, db=test_db) == "at-live"
+    assert threads and threads[0] != threading.get_ident()
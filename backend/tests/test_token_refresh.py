@@ -0,0 +1,170 @@
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+import redis
+from backend.models.database_models import PlatformAccount, InteractionLog
+from backend.services import data_sync_service, token_cache
+from backend.tests.conftest import TestingSessionLocal
+from backend.utils.encryption import encrypt_token, decrypt_token
+from backend.utils.custom_exceptions import ExternalAPIError
+
+
+def make_account(db, platform: str, expires_in: timedelta, user_id: str) -> PlatformAccount:
+    acc = PlatformAccount(
+        system_user_id=1,
+        platform_name=platform,
+        platform_user_id=user_id,
+        refresh_token=encrypt_token("rt-0"),
+        meta_data={
+            "access_token": encrypt_token("at-0"),
+            "expires_at": (datetime.now(timezone.utc) + expires_in).isoformat(),
+            "profile": {"id": user_id, "display_name": None, "email": None},
+        }
+    )
+    db.add(acc)
+    db.commit()
+    db.refresh(acc)
+    return acc
+
+
+@pytest.fixture
+def cleanup(test_db):
+    created = []
+    yield created
+    for acc in created:
+        token_cache.invalidate_access_token(acc.platform_name, acc.id)
+        test_db.query(InteractionLog).filter_by(platform_account_id=acc.id).delete()
+        test_db.query(PlatformAccount).filter_by(id=acc.id).delete()
+    test_db.commit()
+
+
+def rotating_soundcloud(calls: list):
+    """Fake SoundCloud token endpoint: each refresh token works once and is replaced."""
+    state = {"current": "rt-0", "n": 0}
+    lock = threading.Lock()
+
+    def refresh(refresh_token):
+        time.sleep(0.1)  # OAuth round trip
+        with lock:
+            calls.append(refresh_token)
+            if refresh_token != state["current"]:
+                raise RuntimeError("invalid_grant")
+            state["n"] += 1
+            state["current"] = f"rt-{state['n']}"
+            return {
+                "access_token": f"at-{state['n']}",
+                "refresh_token": state["current"],
+                "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+            }
+    return refresh
+
+
+def test_concurrent_refresh_happens_once(monkeypatch, test_db, cleanup):
+    account = make_account(test_db, "soundcloud", timedelta(minutes=-1), "sc_single_flight")
+    cleanup.append(account)
+    calls = []
+    monkeypatch.setattr(data_sync_service, "refresh_soundcloud_access_token", rotating_soundcloud(calls))
+
+    results, errors = [], []
+
+    def worker():
+        db = TestingSessionLocal()
+        try:
+            acc = db.query(PlatformAccount).filter_by(id=account.id).first()
+            results.append(data_sync_service.get_valid_soundcloud_access_token(db, acc))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert results == ["at-1"] * 5
+    assert calls == ["rt-0"]  # one OAuth round trip; the rotated refresh token was never reused
+
+    test_db.expire_all()
+    stored = test_db.query(PlatformAccount).filter_by(id=account.id).first()
+    assert decrypt_token(stored.refresh_token) == "rt-1"
+
+
+def test_proactive_refresh_renews_only_active_expiring_accounts(monkeypatch, test_db, cleanup):
+    expiring = make_account(test_db, "spotify", timedelta(minutes=3), "sp_expiring")
+    fresh = make_account(test_db, "spotify", timedelta(hours=1), "sp_fresh")
+    idle = make_account(test_db, "spotify", timedelta(minutes=3), "sp_idle")
+    cleanup.extend([expiring, fresh, idle])
+    test_db.add_all([
+        InteractionLog(platform_account_id=expiring.id, session_id="s1", user_input="pause"),
+        InteractionLog(platform_account_id=fresh.id, session_id="s2", user_input="skip"),
+    ])
+    test_db.commit()
+
+    refreshed = []
+    def fake_refresh(refresh_token):
+        refreshed.append(refresh_token)
+        return {"access_token": "at-new", "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()}
+
+    monkeypatch.setattr(data_sync_service, "refresh_spotify_access_token", fake_refresh)
+    monkeypatch.setattr(data_sync_service, "SessionLocal", TestingSessionLocal)
+
+    assert data_sync_service.refresh_expiring_tokens() == 1
+    assert refreshed == ["rt-0"]
+
+    test_db.expire_all()
+    renewed = test_db.query(PlatformAccount).filter_by(id=expiring.id).first()
+    assert decrypt_token(renewed.meta_data["access_token"]) == "at-new"
+
+
+class LockUnavailable:
+    """Redis client whose locks can never be taken."""
+
+    def lock(self, *args, **kwargs):
+        return self
+
+    def acquire(self):
+        raise redis.exceptions.ConnectionError("redis is down")
+
+
+def test_refresh_without_the_lock_spends_no_refresh_token(monkeypatch, test_db, cleanup):
+    account = make_account(test_db, "soundcloud", timedelta(minutes=-1), "sc_no_lock")
+    cleanup.append(account)
+    calls = []
+    monkeypatch.setattr(data_sync_service, "refresh_soundcloud_access_token", rotating_soundcloud(calls))
+    monkeypatch.setattr(data_sync_service, "redis_client", LockUnavailable())
+
+    with pytest.raises(ExternalAPIError) as error:
+        data_sync_service.get_valid_soundcloud_access_token(test_db, account)
+
+    assert error.value.error_code == 503
+    assert calls == []
+    test_db.expire_all()
+    assert decrypt_token(test_db.query(PlatformAccount).filter_by(id=account.id).one().refresh_token) == "rt-0"
+
+
+def test_token_stored_by_another_worker_is_reused_without_the_lock(monkeypatch, test_db, cleanup):
+    account = make_account(test_db, "soundcloud", timedelta(minutes=-1), "sc_no_lock_reuse")
+    cleanup.append(account)
+    calls = []
+    monkeypatch.setattr(data_sync_service, "refresh_soundcloud_access_token", rotating_soundcloud(calls))
+    monkeypatch.setattr(data_sync_service, "redis_client", LockUnavailable())
+
+    # The lock holder finished its refresh after this worker read the account
+    other = TestingSessionLocal()
+    try:
+        stored = other.query(PlatformAccount).filter_by(id=account.id).one()
+        stored.meta_data = {
+            **stored.meta_data,
+            "access_token": encrypt_token("at-other"),
+            "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        }
+        other.commit()
+    finally:
+        other.close()
+
+    assert data_sync_service.get_valid_soundcloud_access_token(test_db, account) == "at-other"
+    assert calls == []
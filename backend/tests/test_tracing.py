@@ -0,0 +1,89 @@
+import json
+import asyncio
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils import tracing
+from backend.utils.tracing import trace_turn, span, latency_snapshot, current_trace
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_samples():
+    latency_snapshot(reset=True)
+    yield
+    latency_snapshot(reset=True)
+
+
+def test_span_outside_a_turn_is_a_noop():
+    with span("llm"):
+        pass
+    assert current_trace() is None
+    assert latency_snapshot() == {}
+
+
+@pytest.mark.asyncio
+async def test_spans_from_concurrent_tasks_land_in_the_turn():
+    async def adapter_call(delay):
+        with span("adapter"):
+            await asyncio.sleep(delay)
+
+    with trace_turn("test") as trace:
+        with span("llm"):
+            await asyncio.sleep(0.01)
+        await asyncio.gather(adapter_call(0.01), adapter_call(0.02))
+
+    assert trace.counts == {"llm": 1, "adapter": 2}
+    assert trace.stages["adapter"] >= 30
+    assert set(trace.timings()) == {"llm", "adapter", "total"}
+    assert current_trace() is None
+
+
+def test_snapshot_percentiles():
+    tracing._record({"llm": 1.0})
+    for ms in range(1, 101):
+        tracing._record({"stt": float(ms)})
+
+    snapshot = latency_snapshot()
+    assert snapshot["stt"]["count"] == 100
+    assert snapshot["stt"]["p50_ms"] == 50.0
+    assert snapshot["stt"]["p95_ms"] == 95.0
+    assert snapshot["stt"]["p99_ms"] == 99.0
+    assert snapshot["llm"]["p99_ms"] == 1.0
+
+
+def test_process_text_returns_timings_and_logs_the_turn(monkeypatch, caplog):
+    monkeypatch.setattr(
+        "backend.services.dialog_manager.call_llm_agent",
+        lambda prompt_input, short_reply=True, action_keys=None: {"actions": [], "reply": "Hi there"}
+    )
+    monkeypatch.setattr("backend.services.dialog_manager.TextToSpeechService.synthesize_speech", lambda text: b"RIFF")
+
+    with caplog.at_level(logging.INFO, logger="backend.utils.tracing"):
+        resp = client.post(
+            "/v1/chat/process_text?platform=spotify&include_timings=true",
+            json={"text": "hello", "session_id": "sess-timings", "platform_account_id": 1}
+        )
+
+    assert resp.status_code == 200
+    timings = resp.json()["timings"]
+    for stage in ("session_load", "llm", "session_commit", "tts", "base64", "total"):
+        assert stage in timings
+    assert timings["total"] >= timings["llm"]
+
+    line = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("turn_trace "))
+    logged = json.loads(line[len("turn_trace "):])
+    assert logged["route"] == "process_text"
+    assert logged["session"] == "sess-timings"
+    assert logged["outcome"] == "ok"
+    assert "serialize" in logged["stages_ms"]
+
+    # Without the flag the response shape is unchanged
+    resp = client.post("/v1/chat/process_text?platform=spotify", json={"text": "hello", "session_id": "sess-timings", "platform_account_id": 1})
+    assert "timings" not in resp.json()
+
+    snapshot = client.get("/v1/chat/timings").json()
+    assert snapshot["total"]["count"] == 2
+    assert snapshot["llm"]["count"] == 2
@@ -39,3 +39,44 @@ def test_stt_endpoint(monkeypatch):
     
     assert response.status_code == 200
     assert response.json()["transcription"] == "Transcribed text"
+
+@pytest.mark.asyncio
+async def test_slow_upstream_does_not_stall_event_loop(monkeypatch):
+    """A slow STT/TTS upstream call must not block other requests on the same worker."""
+    import asyncio
+    import time
+    import httpx
+
+    def slow_transcribe(self, file_obj):
+        time.sleep(0.5)
+        return "slow transcription"
+
+    def slow_synthesize(self, text):
+        time.sleep(0.5)
+        return b"RIFF-fake-audio"
+
+    monkeypatch.setattr("backend.services.speech_to_text.SpeechToTextService.transcribe_audio", slow_transcribe)
+    monkeypatch.setattr("backend.services.text_to_speech.TextToSpeechService.synthesize_speech", slow_synthesize)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        start = time.perf_counter()
+        slow_requests = [
+            asyncio.create_task(ac.post("/v1/voice/stt", files={"audio": ("a.wav", b"fake audio data", "audio/wav")})),
+            asyncio.create_task(ac.post("/v1/voice/tts/stream", params={"text": "Hello"})),
+        ]
+        await asyncio.sleep(0.05)
+
+        # Health check must be served while both upstream calls are still in flight
+        health = await ac.get("/")
+        health_elapsed = time.perf_counter() - start
+
+        stt_resp, tts_resp = await asyncio.gather(*slow_requests)
+        total_elapsed = time.perf_counter() - start
+
+    assert health.status_code == 200
+    assert health_elapsed < 0.4
+    assert stt_resp.json()["transcription"] == "slow transcription"
+    assert tts_resp.content == b"RIFF-fake-audio"
+    # Both slow calls ran concurrently rather than back to back
+    assert total_elapsed < 0.9
@@ -0,0 +1,137 @@
+import io
+import wave
+import asyncio
+import numpy as np
+import pytest
+from backend.utils.voice_activity import EnergyVAD
+from backend.services.voice_stream_service import VoiceStream
+from backend.api.v1 import voice_socket
+
+RATE = 16000
+
+
+def make_pcm(silence_s: float, speech_s: float, trailing_s: float) -> bytes:
+    rng = np.random.default_rng(0)
+    lead = rng.normal(0, 0.001, int(RATE * silence_s))
+    t = np.arange(int(RATE * speech_s)) / RATE
+    speech = 0.3 * np.sin(2 * np.pi * 220 * t)
+    trail = rng.normal(0, 0.001, int(RATE * trailing_s))
+    samples = np.concatenate([lead, speech, trail])
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def chunks(pcm: bytes, ms: int = 20):
+    size = RATE * ms // 1000 * 2
+    for i in range(0, len(pcm), size):
+        yield pcm[i:i + size]
+
+
+def test_vad_detects_end_of_speech():
+    vad = EnergyVAD(sample_rate=RATE)
+    pcm = make_pcm(0.5, 1.0, 1.0)
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+    assert vad.feed(samples) is True
+    assert vad.speech_started
+    assert vad.speech_end_seconds == pytest.approx(1.5, abs=0.05)
+
+
+def test_vad_ignores_background_noise():
+    vad = EnergyVAD(sample_rate=RATE)
+    rng = np.random.default_rng(1)
+    assert vad.feed(rng.normal(0, 0.001, RATE * 2).astype(np.float32)) is False
+    assert not vad.speech_started
+
+
+def test_voice_stream_trims_leading_silence():
+    stream = VoiceStream("sess-vs", "spotify", 1, sample_rate=RATE)
+    ended = False
+    for frame in chunks(make_pcm(2.0, 1.0, 1.0)):
+        ended = stream.feed(frame)
+        if ended:
+            break
+    assert ended
+
+    wav_bytes, info = stream.take_utterance()
+    with wave.open(io.BytesIO(wav_bytes)) as wav:
+        duration = wav.getnframes() / wav.getframerate()
+        assert wav.getframerate() == RATE
+    # 1s of speech plus pre-roll and tail, but none of the 2s of leading silence
+    assert 1.0 <= duration <= 1.6
+    assert info["speech_seconds"] == pytest.approx(duration, abs=0.01)
+
+
+def test_voice_stream_rejects_opus():
+    with pytest.raises(ValueError):
+        VoiceStream("sess-vs", "spotify", 1, encoding="opus")
+
+
+@pytest.mark.parametrize("sample_rate", [0, -16000, 4000, 96000, "fast", None, [16000]])
+def test_voice_stream_rejects_bad_sample_rates(sample_rate):
+    with pytest.raises(ValueError):
+        VoiceStream("sess-vs", "spotify", 1, sample_rate=sample_rate)
+
+
+@pytest.mark.asyncio
+async def test_socket_rejects_a_bad_sample_rate(monkeypatch):
+    emitted = []
+
+    async def fake_emit(event, data=None, room=None, **kwargs):
+        emitted.append((event, data))
+
+    monkeypatch.setattr(voice_socket.sio, "emit", fake_emit)
+    monkeypatch.setattr(voice_socket.sio, "get_environ", lambda sid: {})
+
+    await voice_socket.voice_start("sid-voice-rate", {"platform": "spotify", "platform_account_id": 1, "sample_rate": 0})
+
+    assert [(e, d["code"]) for e, d in emitted] == [("voice_error", "UNSUPPORTED_AUDIO")]
+    assert "sid-voice-rate" not in voice_socket.active_streams
+
+
+@pytest.mark.asyncio
+async def test_socket_voice_turn_reaches_dialog_manager(monkeypatch):
+    emitted = []
+
+    async def fake_emit(event, data=None, room=None, **kwargs):
+        emitted.append((event, data))
+
+    class FakeDialogManager:
+        def __init__(self, db, session_id, platform, platform_account_id=None):
+            self.session_id = session_id
+
+        async def process_request(self, text):
+            return {"reply": f"ok: {text}", "action_outcome": "SUCCESS"}
+
+    class FakeSession:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(voice_socket.sio, "emit", fake_emit)
+    monkeypatch.setattr(voice_socket.sio, "get_environ", lambda sid: {})
+    monkeypatch.setattr("backend.services.voice_stream_service.SpeechToTextService.transcribe_audio", lambda wav: "pause the music")
+    monkeypatch.setattr("backend.services.voice_stream_service.DialogManager", FakeDialogManager)
+    monkeypatch.setattr("backend.services.voice_stream_service.SessionLocal", FakeSession)
+
+    sid = "sid-voice-1"
+    await voice_socket.voice_start(sid, {"session_id": "sess-socket", "platform": "spotify", "platform_account_id": 1})
+    for frame in chunks(make_pcm(0.3, 0.8, 0.8)):
+        await voice_socket.voice_frame(sid, frame)
+
+    for _ in range(50):
+        if any(e == "voice_result" for e, _ in emitted):
+            break
+        await asyncio.sleep(0.02)
+
+    events = [e for e, _ in emitted]
+    assert events[0] == "voice_ready"
+    assert "voice_endpoint" in events
+    result = next(d for e, d in emitted if e == "voice_result")
+    assert result["input_text"] == "pause the music"
+    assert result["reply"] == "ok: pause the music"
+    assert result["latency"]["speech_end_to_action_ms"] >= result["latency"]["endpoint_ms"]
+
+    # The turn task is held until it finishes, then dropped
+    await asyncio.gather(*voice_socket.turn_tasks)
+    assert not voice_socket.turn_tasks
+
+    voice_socket.discard_voice_stream(sid)
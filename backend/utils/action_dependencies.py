@@ -0,0 +1,60 @@
+# Actions that change what is playing (or how loud) act as barriers:
+# everything before them finishes first, everything after them waits.
+PLAYBACK_MUTATING_ACTIONS = {
+    "pause_song", "resume_song", "skip_song", "previous_song", "restart_song",
+    "skip_time", "change_volume", "set_volume", "increase_volume", "decrease_volume",
+    "play_liked_songs",
+}
+
+PLAYLIST_ACTIONS = {
+    "create_playlist", "delete_playlist", "add_to_playlist",
+    "remove_from_playlist", "reorder_playlist",
+}
+
+LIKED_SONG_ACTIONS = {"like_song", "remove_from_liked_songs"}
+
+
+def action_resources(action: str, parameters: dict) -> set:
+    """
+    Library objects an action writes to. Two actions that share a resource
+    (e.g. create_playlist "Gym" + add_to_playlist "Gym") must not run together.
+    """
+    if action in PLAYLIST_ACTIONS:
+        name = str(parameters.get("playlist_name") or "").strip().lower()
+        return {("playlist", name)}
+    if action in LIKED_SONG_ACTIONS:
+        # No song name means "the current song"
+        song = str(parameters.get("song_name") or "").strip().lower()
+        return {("liked", song)}
+    return set()
+
+
+def plan_action_batches(steps: list[tuple[str, dict]]) -> list[list[int]]:
+    """
+    Groups (action, parameters) steps into batches of indices. Batches run one after
+    another in the user's order; the steps inside a batch are independent and can run
+    concurrently.
+    """
+    batches = []
+    current = []
+    claimed = set()
+
+    for index, (action, parameters) in enumerate(steps):
+        if action in PLAYBACK_MUTATING_ACTIONS:
+            if current:
+                batches.append(current)
+            batches.append([index])
+            current, claimed = [], set()
+            continue
+
+        resources = action_resources(action, parameters)
+        if resources & claimed:
+            batches.append(current)
+            current, claimed = [], set()
+
+        current.append(index)
+        claimed |= resources
+
+    if current:
+        batches.append(current)
+    return batches
@@ -1,7 +1,7 @@
 ACTION_REQUIRED_PARAMS = {
     "play_song": ["song_name"],
-    "add_to_playlist": ["song_name", "playlist_name"],
-    "remove_from_playlist": ["song_name", "playlist_name"],
+    "add_to_playlist": ["song_name|song_names", "playlist_name"],
+    "remove_from_playlist": ["song_name|song_names", "playlist_name"],
     "create_playlist": ["playlist_name"],
     "delete_playlist": ["playlist_name"],
     "play_song_by_artist": ["artist"],
@@ -9,6 +9,7 @@ ACTION_REQUIRED_PARAMS = {
     "skip_time": ["seconds"],
     "change_volume": ["volume?", "mode?"],
     "get_volume": [],
+    "play_liked_songs": ["shuffle?"],
 
     "reorder_playlist": ["playlist_name", "range_start", "insert_before"]
 }
\ No newline at end of file
@@ -10,6 +10,12 @@ class DeviceNotFoundException(Exception):
         self.message = message
         super().__init__(self.message)
 
+class AudioTooLargeError(Exception):
+    """Raised when an uploaded or streamed recording exceeds the STT size limit."""
+    def __init__(self, message: str = "Audio upload is too large"):
+        self.message = message
+        super().__init__(self.message)
+
 class ExternalAPIError(Exception):
     """Raised when an external service (Spotify/SoundCloud) fails."""
     def __init__(
@@ -1,25 +1,37 @@
 import os
 import logging
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from cryptography.fernet import Fernet, MultiFernet
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-def get_fernet() -> Fernet | None:
+@lru_cache(maxsize=4)
+def _build_fernet(key: str) -> Fernet | MultiFernet | None:
     """
-    Returns a Fernet instance using the ENCRYPTION_KEY from environment variables.
-    
+    Builds the cipher once per key value. A comma-separated ENCRYPTION_KEY enables key rotation:
+    the first key encrypts, all keys are tried for decryption.
     """
-    key = os.getenv("ENCRYPTION_KEY")
-    if not key:
-        return None
     try:
-        return Fernet(key.encode())
+        keys = [Fernet(k.strip().encode()) for k in key.split(",") if k.strip()]
+        if not keys:
+            return None
+        return keys[0] if len(keys) == 1 else MultiFernet(keys)
     except Exception as e:
         logger.error(f"Invalid ENCRYPTION_KEY: {e}")
         return None
 
+def get_fernet() -> Fernet | MultiFernet | None:
+    """
+    Returns a Fernet (or MultiFernet) instance using the ENCRYPTION_KEY from environment variables.
+    The instance is memoized, so only the environment lookup happens per call.
+    """
+    key = os.getenv("ENCRYPTION_KEY")
+    if not key:
+        return None
+    return _build_fernet(key)
+
 def encrypt_token(token: str) -> str:
     """
     Encrypts a plain text token. 
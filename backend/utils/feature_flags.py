@@ -2,3 +2,18 @@ import os
 
 def is_soundcloud_enabled() -> bool:
     return os.getenv("ENABLE_SOUNDCLOUD", "false").lower() == "true"
+
+def is_audio_preprocessing_enabled() -> bool:
+    return os.getenv("ENABLE_AUDIO_PREPROCESSING", "true").lower() == "true"
+
+def is_socketio_redis_manager_enabled() -> bool:
+    return os.getenv("ENABLE_SOCKETIO_REDIS_MANAGER", "false").lower() == "true"
+
+def is_metrics_enabled() -> bool:
+    return os.getenv("ENABLE_METRICS", "true").lower() == "true"
+
+def is_playback_poller_enabled() -> bool:
+    return os.getenv("ENABLE_PLAYBACK_POLLER", "true").lower() == "true"
+
+def is_async_spotify_adapter_enabled() -> bool:
+    return os.getenv("ENABLE_ASYNC_SPOTIFY_ADAPTER", "false").lower() == "true"
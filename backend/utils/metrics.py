@@ -0,0 +1,315 @@
+"""
+Prometheus metrics for the API process (and the Celery worker).
+
+install() hooks everything up once per process:
+- per-route request latency (ASGI middleware, labelled by route template)
+- upstream HTTP calls to Groq / Spotify / SoundCloud, timed at the transport
+  (requests' HTTPAdapter and httpx transports), so spotipy, the Groq calls and the
+  SoundCloud adapter are all covered without touching each call site
+- Redis round trips per turn and per-stage turn latency (fed by backend.utils.tracing)
+- default thread-executor queue depth, read when /metrics is scraped
+
+Each observation is a dict lookup plus a lock-protected add, so this stays on in production.
+With several workers set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates all of them.
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+import functools
+from urllib.parse import urlsplit
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from backend.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "sam_http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_REQUESTS = Counter(
+    "sam_upstream_requests_total", "Outbound HTTP calls by service, endpoint and status code",
+    ["service", "endpoint", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "sam_upstream_request_duration_seconds", "Outbound HTTP latency (until response headers)",
+    ["service", "endpoint"], buckets=LATENCY_BUCKETS,
+)
+SEARCH_CACHE_LOOKUPS = Counter(
+    "sam_search_cache_lookups_total", "SearchCache lookups by tier (strict, fuzzy, exact) and result",
+    ["platform", "tier", "result"],
+)
+SEARCH_API_FALLBACKS = Counter(
+    "sam_search_api_fallbacks_total", "Track searches that went to the platform API after missing the cache",
+    ["platform"],
+)
+TURN_STAGE_SECONDS = Histogram(
+    "sam_turn_stage_duration_seconds", "Time spent per pipeline stage of a turn",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+TURN_REDIS_ROUND_TRIPS = Histogram(
+    "sam_turn_redis_round_trips", "Redis round trips (commands or pipelines) made during one turn",
+    ["route"], buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "sam_rate_limit_wait_seconds", "Time upstream calls waited for the shared rate limiter",
+    ["service", "lane"], buckets=LATENCY_BUCKETS,
+)
+RATE_LIMITED = Counter(
+    "sam_rate_limited_total", "Upstream 429s honored across workers and calls that gave up waiting",
+    ["service", "lane", "reason"],
+)
+CELERY_TASK_SECONDS = Histogram(
+    "sam_celery_task_duration_seconds", "Celery task run time",
+    ["task", "state"], buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
+
+
+def _default_executor():
+    try:
+        return asyncio.get_running_loop()._default_executor
+    except RuntimeError:
+        return None
+
+
+def _executor_queue_depth() -> float:
+    executor = _default_executor()
+    return executor._work_queue.qsize() if executor is not None else 0
+
+
+def _executor_threads() -> float:
+    executor = _default_executor()
+    return len(executor._threads) if executor is not None else 0
+
+
+EXECUTOR_QUEUE_DEPTH = Gauge("sam_executor_queue_depth", "Jobs waiting for a thread in the default executor")
+EXECUTOR_QUEUE_DEPTH.set_function(_executor_queue_depth)
+EXECUTOR_THREADS = Gauge("sam_executor_threads", "Threads started by the default executor")
+EXECUTOR_THREADS.set_function(_executor_threads)
+
+
+# --- Upstream calls ---
+
+UPSTREAM_HOSTS = {
+    "api.groq.com": "groq",
+    "api.spotify.com": "spotify",
+    "accounts.spotify.com": "spotify",
+    "api.soundcloud.com": "soundcloud",
+    "secure.soundcloud.com": "soundcloud",
+    "api-v2.soundcloud.com": "soundcloud",
+}
+
+# Path segments that identify an object (numeric ids, base62 Spotify ids, URNs) become {id}
+_ID_SEGMENT = re.compile(r"^(\d+|[A-Za-z0-9]{16,}|.*:.*)$")
+
+
+@functools.lru_cache(maxsize=4096)
+def endpoint_label(path: str) -> str:
+    segments = [("{id}" if _ID_SEGMENT.match(part) else part) for part in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def observe_upstream(url: str, status, seconds: float):
+    parts = urlsplit(url)
+    service = UPSTREAM_HOSTS.get(parts.hostname or "", "other")
+    # Unknown hosts (image CDNs, local test servers) are not split by path to keep cardinality bounded
+    endpoint = endpoint_label(parts.path) if service != "other" else "-"
+    UPSTREAM_REQUESTS.labels(service, endpoint, str(status)).inc()
+    UPSTREAM_SECONDS.labels(service, endpoint).observe(seconds)
+
+
+def _instrument_requests():
+    from requests.adapters import HTTPAdapter
+
+    original = HTTPAdapter.send
+    if getattr(original, "_sam_instrumented", False):
+        return
+
+    @functools.wraps(original)
+    def send(self, request, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = original(self, request, *args, **kwargs)
+        except Exception:
+            observe_upstream(request.url, "error", time.perf_counter() - start)
+            raise
+        observe_upstream(request.url, response.status_code, time.perf_counter() - start)
+        return response
+
+    send._sam_instrumented = True
+    HTTPAdapter.send = send
+
+
+def _instrument_httpx():
+    import httpx
+
+    original_sync = httpx.HTTPTransport.handle_request
+    if getattr(original_sync, "_sam_instrumented", False):
+        return
+    original_async = httpx.AsyncHTTPTransport.handle_async_request
+
+    @functools.wraps(original_sync)
+    def handle_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = original_sync(self, request)
+        except Exception:
+            observe_upstream(str(request.url), "error", time.perf_counter() - start)
+            raise
+        observe_upstream(str(request.url), response.status_code, time.perf_counter() - start)
+        return response
+
+    @functools.wraps(original_async)
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = await original_async(self, request)
+        except Exception:
+            observe_upstream(str(request.url), "error", time.perf_counter() - start)
+            raise
+        observe_upstream(str(request.url), response.status_code, time.perf_counter() - start)
+        return response
+
+    handle_request._sam_instrumented = True
+    httpx.HTTPTransport.handle_request = handle_request
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+
+# --- Redis round trips ---
+
+def _instrument_redis():
+    from redis.connection import AbstractConnection
+
+    original = AbstractConnection.send_packed_command
+    if getattr(original, "_sam_instrumented", False):
+        return
+
+    @functools.wraps(original)
+    def send_packed_command(self, command, check_health=True):
+        # One call per command or per pipeline, i.e. one network round trip
+        trace = tracing.current_trace()
+        if trace is not None:
+            trace.incr("redis_round_trips")
+        return original(self, command, check_health)
+
+    send_packed_command._sam_instrumented = True
+    AbstractConnection.send_packed_command = send_packed_command
+
+
+def _observe_turn(trace: tracing.Trace, total_ms: float):
+    for stage, ms in trace.stages.items():
+        TURN_STAGE_SECONDS.labels(stage).observe(ms / 1000)
+    TURN_STAGE_SECONDS.labels("total").observe(total_ms / 1000)
+    TURN_REDIS_ROUND_TRIPS.labels(trace.name).observe(trace.counters.get("redis_round_trips", 0))
+
+
+# --- SearchCache ---
+
+def record_search_cache(platform: str, tier: str, hit: bool):
+    SEARCH_CACHE_LOOKUPS.labels(platform, tier, "hit" if hit else "miss").inc()
+
+
+def record_search_api_fallback(platform: str):
+    SEARCH_API_FALLBACKS.labels(platform).inc()
+
+
+# --- Rate limiting ---
+
+def record_rate_limit_wait(service: str, lane: str, seconds: float):
+    RATE_LIMIT_WAIT_SECONDS.labels(service, lane).observe(seconds)
+
+
+def record_rate_limited(service: str, lane: str, reason: str):
+    RATE_LIMITED.labels(service, lane, reason).inc()
+
+
+# --- API requests ---
+
+class PrometheusMiddleware:
+    """Times every HTTP request; the label is the matched route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners cannot blow up the series count
+            label = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], label, str(status)).observe(time.perf_counter() - start)
+
+
+# --- Celery ---
+
+_task_starts: dict[str, float] = {}
+
+
+def install_celery_metrics():
+    """Observes task durations in the worker; CELERY_METRICS_PORT exposes them over HTTP."""
+    from celery import signals
+
+    @signals.task_prerun.connect(weak=False)
+    def _task_prerun(task_id=None, **kwargs):
+        _task_starts[task_id] = time.perf_counter()
+
+    @signals.task_postrun.connect(weak=False)
+    def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+        start = _task_starts.pop(task_id, None)
+        if start is not None:
+            CELERY_TASK_SECONDS.labels(getattr(task, "name", "unknown"), state or "UNKNOWN").observe(time.perf_counter() - start)
+
+    @signals.worker_ready.connect(weak=False)
+    def _serve_worker_metrics(**kwargs):
+        port = os.getenv("CELERY_METRICS_PORT")
+        if port:
+            from prometheus_client import start_http_server
+            start_http_server(int(port), registry=metrics_registry())
+            logger.info(f"Celery worker metrics served on :{port}/metrics")
+
+
+# --- Exposition ---
+
+_installed = False
+
+
+def install():
+    global _installed
+    if _installed:
+        return
+    _instrument_requests()
+    _instrument_httpx()
+    _instrument_redis()
+    tracing.add_turn_listener(_observe_turn)
+    _installed = True
+    logger.info("Prometheus instrumentation installed")
+
+
+def metrics_registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
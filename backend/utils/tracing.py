@@ -0,0 +1,164 @@
+"""
+Lightweight per-turn latency tracing.
+
+A turn opens a trace with `trace_turn(...)`; code anywhere below it wraps a stage in
+`span("llm")`. The trace lives in a context var, so tasks created during the turn
+(asyncio.create_task / gather copy the context) add to the same trace, and `span()`
+is a no-op when no trace is active (background jobs, tests). Executor work sees the
+trace only when submitted through `in_trace_context()`.
+
+Finished turns feed an in-process sample window per stage, read by latency_snapshot().
+"""
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_SIZE = int(os.getenv("TRACE_SAMPLE_SIZE", 2048))
+
+
+class Trace:
+    def __init__(self, name: str, **fields):
+        self.name = name
+        self.fields = fields
+        self.start = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        # Spans also close in executor threads
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, ms: float):
+        # A stage that runs more than once per turn (e.g. one adapter call per action) is summed
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + ms
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def incr(self, counter: str, amount: int = 1):
+        """Per-turn event counts (e.g. Redis round trips)."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def timings(self) -> dict:
+        """The `timings` block returned to clients: ms per stage plus the total so far."""
+        block = {stage: round(ms, 1) for stage, ms in self.stages.items()}
+        block["total"] = round(self.elapsed_ms(), 1)
+        return block
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+
+# stage -> recent per-turn durations (ms)
+_samples: dict[str, deque] = {}
+_samples_lock = threading.Lock()
+
+# Called with (trace, total_ms) when a turn ends, e.g. to export it as metrics
+_turn_listeners: list[Callable[[Trace, float], None]] = []
+
+
+def add_turn_listener(listener: Callable[[Trace, float], None]):
+    if listener not in _turn_listeners:
+        _turn_listeners.append(listener)
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+def in_trace_context(fn: Callable) -> Callable:
+    """
+    Wraps `fn` for run_in_executor so it runs in a copy of the caller's context
+    (run_in_executor does not propagate context vars to the worker thread).
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+@contextmanager
+def span(stage: str):
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, (time.perf_counter() - start) * 1000)
+
+
+def _record(stages: dict[str, float]):
+    with _samples_lock:
+        for stage, ms in stages.items():
+            window = _samples.get(stage)
+            if window is None:
+                window = _samples[stage] = deque(maxlen=TRACE_SAMPLE_SIZE)
+            window.append(ms)
+
+
+@contextmanager
+def trace_turn(name: str, **fields):
+    """
+    Traces one turn. On exit the stage timings go into the histograms and one
+    structured `turn_trace` log line is written.
+    """
+    trace = Trace(name, **fields)
+    token = _current_trace.set(trace)
+    outcome = "ok"
+    try:
+        yield trace
+    except BaseException as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        _current_trace.reset(token)
+        total = trace.elapsed_ms()
+        _record({**trace.stages, "total": total})
+        for listener in _turn_listeners:
+            try:
+                listener(trace, total)
+            except Exception as e:
+                logger.warning(f"Turn listener failed: {e}")
+        logger.info("turn_trace %s", json.dumps({
+            "route": name,
+            **trace.fields,
+            "outcome": outcome,
+            "total_ms": round(total, 1),
+            "stages_ms": {stage: round(ms, 1) for stage, ms in trace.stages.items()},
+            **({"counters": trace.counters} if trace.counters else {}),
+        }, default=str))
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def latency_snapshot(reset: bool = False) -> dict:
+    """p50/p95/p99 per stage over the last TRACE_SAMPLE_SIZE turns of this process."""
+    with _samples_lock:
+        data = {stage: sorted(window) for stage, window in _samples.items()}
+        if reset:
+            _samples.clear()
+
+    return {
+        stage: {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 50), 1),
+            "p95_ms": round(_percentile(values, 95), 1),
+            "p99_ms": round(_percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1),
+        }
+        for stage, values in sorted(data.items()) if values
+    }
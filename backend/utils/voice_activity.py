@@ -0,0 +1,112 @@
+import numpy as np
+
+PCM16_FULL_SCALE = 32768.0
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """Converts little-endian signed 16-bit PCM bytes into float32 samples in [-1, 1]."""
+    if len(pcm) % 2:
+        pcm = pcm[:-1]
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / PCM16_FULL_SCALE
+
+
+def frame_energy_db(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """
+    Returns the RMS energy (dBFS) of each complete frame of `frame_size` samples.
+    Trailing samples that do not fill a frame are ignored.
+    """
+    n_frames = len(samples) // frame_size
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[: n_frames * frame_size].reshape(n_frames, frame_size)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return (20.0 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+class EnergyVAD:
+    """
+    Energy based voice activity detector with end-of-speech (endpoint) detection.
+
+    Audio is split into fixed frames; a frame is voiced when its energy is above both
+    an absolute floor and an adaptive noise estimate. Speech starts after `min_speech_ms`
+    of voiced audio and ends once `hangover_ms` of unvoiced audio follow it.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold_db: float = -45.0,
+        noise_margin_db: float = 10.0,
+        hangover_ms: int = 600,
+        min_speech_ms: int = 120,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.reset()
+
+    def reset(self):
+        self._remainder = np.empty(0, dtype=np.float32)
+        self.noise_floor_db = self.threshold_db - self.noise_margin_db
+        self.frames_seen = 0
+        self.voiced_run = 0
+        self.unvoiced_run = 0
+        self.speech_started = False
+        self.speech_start_frame = None
+        self.last_voiced_frame = None
+        self.endpoint_detected = False
+
+    def _is_voiced(self, energy_db: float) -> bool:
+        return energy_db > max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+
+    def feed(self, samples: np.ndarray) -> bool:
+        """
+        Feeds float samples into the detector.
+        Returns True once end-of-speech has been detected (sticky until reset()).
+        """
+        if self.endpoint_detected:
+            return True
+
+        samples = np.concatenate([self._remainder, samples]) if len(self._remainder) else samples
+        energies = frame_energy_db(samples, self.frame_size)
+        consumed = len(energies) * self.frame_size
+        self._remainder = samples[consumed:]
+
+        for energy in energies:
+            frame_index = self.frames_seen
+            self.frames_seen += 1
+
+            if self._is_voiced(energy):
+                self.voiced_run += 1
+                self.unvoiced_run = 0
+                self.last_voiced_frame = frame_index
+                if not self.speech_started and self.voiced_run >= self.min_speech_frames:
+                    self.speech_started = True
+                    self.speech_start_frame = frame_index - self.voiced_run + 1
+            else:
+                self.voiced_run = 0
+                self.unvoiced_run += 1
+                # Track background noise slowly while nobody is speaking
+                self.noise_floor_db = 0.95 * self.noise_floor_db + 0.05 * float(energy)
+                if self.speech_started and self.unvoiced_run >= self.hangover_frames:
+                    self.endpoint_detected = True
+                    return True
+
+        return False
+
+    def frame_to_seconds(self, frame_index: int | None) -> float | None:
+        if frame_index is None:
+            return None
+        return frame_index * self.frame_size / self.sample_rate
+
+    @property
+    def speech_end_seconds(self) -> float | None:
+        """Stream offset (seconds) of the end of the last voiced frame."""
+        if self.last_voiced_frame is None:
+            return None
+        return self.frame_to_seconds(self.last_voiced_frame + 1)